@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the display frame encoder.
+Compares FrameEncoder with the per-frame bytearray encoding it replaced and
+checks that both produce the same frames. With --pipeline, also runs the whole
+monitor on simulated hardware against the virtual display and reports the
+frame rate and sensor-to-display latency, and with --history, fills a week of
+samples into the sample history and times window queries over it.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+import timeit
+
+from src.frame import FrameEncoder, encode_temperature
+from src.history import NUMPY_AVAILABLE, MetricHistory
+
+
+def legacy_payload(cpu_temp, gpu_temp) -> bytes:
+    """The original USBDevice._generate_payload."""
+    payload = bytearray([85, 170, 1, 1, 6])
+    payload.extend(encode_temperature(cpu_temp))
+    payload.extend(encode_temperature(gpu_temp))
+    payload.append(sum(payload) & 0xFF)
+    return bytes(payload)
+
+
+def check(samples):
+    """Verify FrameEncoder against the legacy encoding."""
+    encoder = FrameEncoder()
+    mismatches = 0
+    for cpu_temp, gpu_temp in samples:
+        if bytes(encoder.encode(cpu_temp, gpu_temp)) != legacy_payload(
+            cpu_temp, gpu_temp
+        ):
+            mismatches += 1
+    return mismatches
+
+
+def bench(label, encode, samples, number):
+    """Time encode over the samples; prints nanoseconds per frame."""
+
+    def run():
+        for cpu_temp, gpu_temp in samples:
+            encode(cpu_temp, gpu_temp)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    per_frame = best / (number * len(samples)) * 1e9
+    print(f"  {label:<28} {per_frame:8.1f} ns/frame")
+    return per_frame
+
+
+def pipeline(seconds: float, interval: int, scenario: str):
+    """Run the monitor end-to-end on simulated hardware and a virtual display."""
+    import toml
+
+    from main import TemperatureMonitor
+    from src.config import Config
+    from src.sim import Simulation
+
+    config = Config(
+        display_device="virtual",
+        display_keepalive=0,  # every frame reaches the display
+        polling_interval=interval,
+        snapshot_metrics=["temperature", "load", "clock", "power"],
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "config.toml")
+        with open(config_path, "w") as f:
+            toml.dump(config.to_dict(), f)
+
+        with Simulation.scenario(scenario) as simulation:
+            with contextlib.redirect_stdout(io.StringIO()):
+                monitor = TemperatureMonitor(config_path, simulation)
+                stopper = threading.Timer(seconds, monitor.stop)
+                stopper.start()
+                monitor.run()
+            stats = monitor.engine.stats()
+
+    print(f"Pipeline ({scenario} scenario, {interval}ms polling, {seconds:.0f}s):")
+    monitor.print_display_stats(stats["sinks"]["display"])
+    monitor.print_schedule_stats(stats["schedule"])
+
+
+def history(samples: int):
+    """Fill one metric's history at 1 Hz and time queries over windows of it."""
+    rng = random.Random(0)
+    metric = MetricHistory(samples)
+    now = time.time()
+    start = time.perf_counter()
+    temperature = 50.0
+    for i in range(samples):
+        temperature = min(95.0, max(30.0, temperature + rng.uniform(-0.5, 0.5)))
+        metric.append(temperature, now - samples + i + 1)
+    filled = time.perf_counter() - start
+
+    print(
+        f"History ({samples} samples at 1 Hz, "
+        f"{'NumPy' if NUMPY_AVAILABLE else 'pure Python'} queries):"
+    )
+    print(
+        f"  filled in {filled:.2f}s ({filled / samples * 1e6:.1f} us/sample), "
+        f"{metric.nbytes / 1024 / 1024:.1f} MiB"
+    )
+    for label, seconds in (("10 min", 600), ("1 hour", 3600), ("all", None)):
+
+        def query():
+            window = metric.window(seconds, now)
+            window.min(), window.max(), window.mean()
+            window.percentile(95)
+            window.time_above(70.0)
+
+        best = min(timeit.repeat(query, number=1, repeat=5))
+        print(f"  {label:<8} min/max/mean/p95/time-above {best * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the frame encoder")
+    parser.add_argument(
+        "-n", "--number", type=int, default=200, help="Passes over the samples"
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=float,
+        metavar="SECONDS",
+        help="Also run the monitor end-to-end on simulated hardware",
+    )
+    parser.add_argument(
+        "--interval", type=int, default=100, help="Pipeline polling interval (ms)"
+    )
+    parser.add_argument(
+        "--scenario", default="default", help="Pipeline simulation scenario"
+    )
+    parser.add_argument(
+        "--history",
+        type=int,
+        nargs="?",
+        const=604800,
+        metavar="SAMPLES",
+        help="Also benchmark history queries (default: a week at 1 Hz)",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Sensor readings in tenths of a degree, a few of them missing
+    changing = [
+        (round(rng.uniform(30, 95), 1), round(rng.uniform(25, 90), 1))
+        for _ in range(1000)
+    ]
+    changing[::50] = [(None, 40.0)] * len(changing[::50])
+    steady = [(55.5, 61.2)] * 1000
+
+    mismatches = check(changing + steady)
+    print(f"Frames checked against the legacy encoding: {mismatches} mismatches")
+
+    for name, samples in (("changing", changing), ("steady", steady)):
+        print(f"{name.capitalize()} temperatures:")
+        legacy = bench("legacy bytearray", legacy_payload, samples, args.number)
+        encoder = FrameEncoder()
+        fast = bench("FrameEncoder", encoder.encode, samples, args.number)
+        print(f"  speedup: {legacy / fast:.1f}x")
+
+    if args.pipeline:
+        pipeline(args.pipeline, args.interval, args.scenario)
+    if args.history:
+        history(args.history)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,67 +5,55 @@ and displaying them on Antec Flux Pro case display via USB.
 """
 
 import argparse
-import json
 import os
 import signal
+import subprocess
 import sys
-import time
-import toml
-from pathlib import Path
-from typing import Optional
 
-from src.config import Config
-from src.cpu import CPUMonitor
-from src.gpu import GPUMonitor
-from src.usb import USBDevice
+from src.host import MonitorHost
+from src.sinks import ConsoleSink
 
+# Run in a fresh interpreter, so the profiler is running before anything of the
+# monitor is imported
+PROFILE_SCRIPT = """
+import sys
+from src.backends import ImportProfiler, load_backend
 
-class TemperatureMonitor:
-    def __init__(self, config_path: str):
-        self.config_path = Path(config_path)
-        self.running = True
-        self.load_config()
+with ImportProfiler() as profiler:
+    from src.host import MonitorHost
 
-        # Initialize hardware monitors
-        self.cpu_monitor = CPUMonitor(self.config.cpu_device)
-        self.gpu_monitor = GPUMonitor(self.config.gpu_device)
-        self.usb_device = None
+    host = MonitorHost(sys.argv[1])
+    try:
+        load_backend("display", host.config.display_device)
+    finally:
+        host.close()
+print(profiler.report())
+"""
+
+
+class TemperatureMonitor(MonitorHost):
+    def __init__(self, config_path: str, simulation=None):
+        super().__init__(config_path, simulation)
+        self.running = True
 
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
 
-    def load_config(self):
-        """Load configuration from TOML file, create default if not exists."""
-        if not self.config_path.exists():
-            print(f"Config file not found at: {self.config_path}")
-            print("Creating default config file...")
-
-            # Create directory if it doesn't exist
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Write default config
-            default_config = Config()
-            with open(self.config_path, "w") as f:
-                toml.dump(default_config.to_dict(), f)
-
-        # Load config
-        with open(self.config_path, "r") as f:
-            config_data = toml.load(f)
-
-        self.config = Config.from_dict(config_data)
-
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully."""
         print(f"\nReceived signal {signum}, shutting down...")
+        self.stop()
+
+    def stop(self):
+        """Stop the monitoring loop, interrupting the wait for the next update."""
         self.running = False
+        self.engine.stop()
 
     def connect_usb(self) -> bool:
         """Connect to the USB device."""
         try:
-            self.usb_device = USBDevice()
-            print("Connected to Antec Flux Pro display")
-            return True
+            self.usb_device = self.create_display(self.config)
         except Exception as e:
             print(f"Failed to connect to USB device: {e}")
             print("This is normal if:")
@@ -76,9 +64,91 @@ class TemperatureMonitor:
             print("The application will continue in demo mode (no display output)")
             return False
 
+        if not getattr(self.usb_device, "connected", True):
+            return False
+        print("Connected to Antec Flux Pro display")
+        return True
+
+    def print_display_stats(self, stats: dict):
+        """Summarize what reached the display."""
+        disconnects = stats.get("disconnects")
+        print(
+            f"Display frames: {stats['sent']} sent, "
+            f"{stats['suppressed']} suppressed "
+            f"({stats['keepalives']} keepalive refreshes)"
+            + (f", {disconnects} disconnects" if disconnects is not None else "")
+        )
+        if stats.get("time_to_first_frame_ms") is not None:
+            resolution = ""
+            if stats.get("resolution"):
+                resolution = (
+                    f" ({stats['resolution']} USB resolution, "
+                    f"connect {stats['connect_ms']:.0f}ms)"
+                )
+            print(
+                f"First frame {stats['time_to_first_frame_ms']:.0f}ms "
+                f"after start{resolution}"
+            )
+        latency = stats.get("latency")
+        if latency and latency["writes"]:
+            print(
+                f"Display writes: {latency['mean_ms']:.1f}ms mean, "
+                f"{latency['max_ms']:.1f}ms max, "
+                f"{latency['timeouts']} timeouts, "
+                f"{stats['dropped']} stale frames dropped"
+            )
+        sensor_latency = stats.get("sensor_latency")
+        if sensor_latency and sensor_latency["count"]:
+            print(
+                f"Sensor-to-display latency: {sensor_latency['mean_ms']:.1f}ms mean, "
+                f"{sensor_latency['p95_ms']:.1f}ms p95, "
+                f"{sensor_latency['max_ms']:.1f}ms max "
+                f"at {stats['fps']:.2f} frames/s"
+            )
+
+    def print_schedule_stats(self, stats: dict):
+        """Summarize how closely the updates kept to their schedule."""
+        print(
+            f"Display updates: {stats['ticks']} on a {stats['interval_ms']:.0f}ms "
+            f"schedule, {stats['missed']} missed ({stats['policy']} policy), "
+            f"{stats['jitter_mean_ms']:.1f}ms mean / "
+            f"{stats['jitter_max_ms']:.1f}ms max lateness"
+        )
+
+    def print_adaptive_stats(self, sources: dict):
+        """Summarize how the adaptive sources changed their intervals."""
+        for name, source in sources.items():
+            stats = source.get("adaptive")
+            if stats is None:
+                continue
+            print(
+                f"{name.upper()} polling: {stats['interval_ms']}ms now, "
+                f"{stats['speedups']} speed-ups, {stats['backoffs']} back-offs"
+            )
+
+    def print_history_stats(self, seconds: float = 600):
+        """Summarize the temperatures recorded over the last `seconds`."""
+        for name in ("cpu", "gpu"):
+            summary = self.history.window(f"{name}.temperature", seconds).summary()
+            if not summary["count"]:
+                continue
+            print(
+                f"{name.upper()} temperature over the last {seconds / 60:.0f} min: "
+                f"{summary['min']:.1f}-{summary['max']:.1f}°C, "
+                f"{summary['mean']:.1f}°C mean, {summary['p95']:.1f}°C p95 "
+                f"({summary['count']} samples)"
+            )
+        stats = self.history.stats()
+        print(
+            f"History: {stats['samples']} samples of {stats['metrics']} metrics "
+            f"in {stats['bytes'] / 1024:.0f} KiB"
+        )
+
     def run(self):
         """Main monitoring loop."""
         print("Starting Antec Flux Pro Display monitor...")
+        if self.simulation:
+            print(self.simulation.describe())
 
         # Connect to USB device
         usb_connected = self.connect_usb()
@@ -86,44 +156,42 @@ class TemperatureMonitor:
         print(f"CPU monitor: {self.cpu_monitor.get_info()}")
         print(f"GPU monitor: {self.gpu_monitor.get_info()}")
         print(f"Polling interval: {self.config.polling_interval}ms")
+        print(
+            f"Sample intervals: CPU {self.config.sample_interval('cpu')}ms, "
+            f"GPU {self.config.sample_interval('gpu')}ms"
+        )
+        if self.engine.adaptive:
+            print(
+                f"Adaptive polling: {self.config.min_polling_interval}-"
+                f"{self.config.max_polling_interval}ms"
+            )
         if usb_connected:
             print("Press Ctrl+C to stop...")
+        elif self.usb_device:
+            print("Display not connected yet - Press Ctrl+C to stop...")
         else:
             print("Running in demo mode - Press Ctrl+C to stop...")
 
-        try:
-            while self.running:
-                # Get temperatures
-                cpu_temp = self.cpu_monitor.get_temperature()
-                gpu_temp = self.gpu_monitor.get_temperature()
-
-                # Display temperatures
-                if cpu_temp is not None:
-                    print(f"CPU: {cpu_temp:.1f}°C", end="")
-                else:
-                    print("CPU: --°C", end="")
-
-                if gpu_temp is not None:
-                    print(f" | GPU: {gpu_temp:.1f}°C")
-                else:
-                    print(" | GPU: --°C")
-
-                # Send to display
-                if self.usb_device:
-                    self.usb_device.send_temperatures(cpu_temp, gpu_temp)
-
-                # Wait for next poll
-                time.sleep(self.config.polling_interval / 1000.0)
+        self.engine.add_sink(ConsoleSink())
+        self.add_sinks(display_log=print)
+        if self.exporter is not None:
+            host, port = self.exporter.address
+            print(f"Metrics endpoint: http://{host}:{port}/metrics")
 
+        try:
+            self.run_engine()
         except KeyboardInterrupt:
             pass
-
         finally:
-            # Send zero temperatures before exiting
-            if self.usb_device:
-                print("Clearing display...")
-                self.usb_device.send_temperatures(0.0, 0.0)
-                self.usb_device.close()
+            self.close()
+
+        stats = self.engine.stats()
+        if stats["sinks"].get("display"):
+            self.print_display_stats(stats["sinks"]["display"])
+        self.print_schedule_stats(stats["schedule"])
+        self.print_adaptive_stats(stats["sources"])
+        if self.history is not None:
+            self.print_history_stats()
 
         print("Shutdown complete.")
         return 0
@@ -140,11 +208,44 @@ def main():
         help="Path to configuration file",
     )
 
+    parser.add_argument(
+        "--import-profile",
+        action="store_true",
+        help="Report the import time of the configured backends and exit",
+    )
+
+    parser.add_argument(
+        "--simulate",
+        nargs="?",
+        const="default",
+        metavar="SCENARIO",
+        help="Run against simulated sensors and display instead of real hardware "
+        "(scenarios: default, hot, flaky, slow, no-display, replug, burst)",
+    )
+
     args = parser.parse_args()
 
-    monitor = TemperatureMonitor(args.config)
+    if args.import_profile:
+        return import_profile(args.config)
+
+    simulation = None
+    if args.simulate:
+        from src.sim import Simulation
+
+        # Must be installed before any backend imports the hardware libraries
+        simulation = Simulation.scenario(args.simulate).install()
+
+    monitor = TemperatureMonitor(args.config, simulation)
     return monitor.run()
 
 
+def import_profile(config_path: str) -> int:
+    """Initialize the configured backends and print what their imports cost."""
+    return subprocess.run(
+        [sys.executable, "-c", PROFILE_SCRIPT, os.path.abspath(config_path)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).returncode
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -5,7 +5,6 @@ Uses pywin32 for Windows service functionality.
 
 import os
 import sys
-import time
 import win32serviceutil
 import win32service
 import win32event
@@ -17,10 +16,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from src.config import Config
-from src.cpu import CPUMonitor
-from src.gpu import GPUMonitor
-from src.usb import USBDevice
+from src.host import MonitorHost
 
 
 class AfProDisplayService(win32serviceutil.ServiceFramework):
@@ -42,17 +38,17 @@ class AfProDisplayService(win32serviceutil.ServiceFramework):
             / "config.toml"
         )
 
-        # Initialize components
-        self.config = None
-        self.cpu_monitor = None
-        self.gpu_monitor = None
-        self.usb_device = None
+        # Monitors, engine and sinks, built once the service starts
+        self.host = None
 
     def SvcStop(self):
         """Handle service stop request."""
         self.ReportServiceStatus(win32service.SERVICE_STOP_PENDING)
         win32event.SetEvent(self.hWaitStop)
         self.running = False
+        if self.host:
+            # Ends the wait for the next update at once
+            self.host.engine.stop()
 
     def SvcDoRun(self):
         """Main service loop."""
@@ -72,83 +68,59 @@ class AfProDisplayService(win32serviceutil.ServiceFramework):
 
     def _initialize(self):
         """Initialize service components."""
-        # Load configuration
-        self._load_config()
+        # Load configuration, then build the monitors and the engine
+        self.host = MonitorHost(str(self.config_path), log=servicemanager.LogWarningMsg)
 
-        # Initialize monitors
-        self.cpu_monitor = CPUMonitor(self.config.cpu_device)
-        self.gpu_monitor = GPUMonitor(self.config.gpu_device)
-
-        # Connect to USB device
+        # Connect to USB device; a display that is missing or unplugged later
+        # is picked up again once it is connected
         try:
-            self.usb_device = USBDevice()
-            servicemanager.LogInfoMsg("Connected to Antec Flux Pro display")
+            self.host.usb_device = self.host.create_display(self.host.config)
         except Exception as e:
             servicemanager.LogErrorMsg(f"Failed to connect to USB device: {e}")
             raise
+        if getattr(self.host.usb_device, "connected", True):
+            servicemanager.LogInfoMsg("Connected to Antec Flux Pro display")
 
-    def _load_config(self):
-        """Load service configuration."""
-        # Create config directory if it doesn't exist
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Create default config if it doesn't exist
-        if not self.config_path.exists():
-            default_config = Config()
-            import toml
-
-            with open(self.config_path, "w") as f:
-                toml.dump(default_config.to_dict(), f)
-
-        # Load config
-        import toml
-
-        with open(self.config_path, "r") as f:
-            config_data = toml.load(f)
-
-        self.config = Config.from_dict(config_data)
+        # Display, history and the Prometheus endpoint; the service runs
+        # without the endpoint if its port is taken
+        self.host.add_sinks()
 
     def _main_loop(self):
         """Main service monitoring loop."""
-        while self.running:
-            # Check if we should stop
-            if (
-                win32event.WaitForSingleObject(self.hWaitStop, 0)
-                == win32event.WAIT_OBJECT_0
-            ):
-                break
-
-            try:
-                # Get temperatures
-                cpu_temp = self.cpu_monitor.get_temperature()
-                gpu_temp = self.gpu_monitor.get_temperature()
-
-                # Send to display
-                if self.usb_device:
-                    self.usb_device.send_temperatures(cpu_temp, gpu_temp)
-
-                # Wait for next poll (check stop event during wait)
-                if (
-                    win32event.WaitForSingleObject(
-                        self.hWaitStop, self.config.polling_interval
-                    )
-                    == win32event.WAIT_OBJECT_0
-                ):
-                    break
-
-            except Exception as e:
-                servicemanager.LogErrorMsg(f"Monitoring error: {e}")
-                time.sleep(5)  # Wait before retrying
+        if not self.running:
+            self.host.engine.stop()  # stop requested while initializing
+        self.host.run_engine()
 
     def _cleanup(self):
-        """Cleanup resources."""
-        if self.usb_device:
+        """Log what the engine did and close the hardware monitors."""
+        if self.host:
             try:
-                # Clear display
-                self.usb_device.send_temperatures(0.0, 0.0)
-                self.usb_device.close()
+                stats = self.host.engine.stats()
+                display = stats["sinks"].get("display")
+                if display:
+                    servicemanager.LogInfoMsg(
+                        f"Display frames: {display['sent']} sent, "
+                        f"{display['suppressed']} suppressed, "
+                        f"{display.get('dropped', 0)} stale frames dropped, "
+                        f"first frame after "
+                        f"{display.get('time_to_first_frame_ms')}ms"
+                    )
+                schedule = stats["schedule"]
+                servicemanager.LogInfoMsg(
+                    f"Display updates: {schedule['ticks']} on schedule, "
+                    f"{schedule['missed']} missed ({schedule['policy']} policy), "
+                    f"{schedule['jitter_mean_ms']}ms mean / "
+                    f"{schedule['jitter_max_ms']}ms max lateness"
+                )
+                history = stats["sinks"].get("history")
+                if history:
+                    servicemanager.LogInfoMsg(
+                        f"History: {history['samples']} samples of "
+                        f"{history['metrics']} metrics in {history['bytes']} bytes"
+                    )
             except:
                 pass
+            self.host.close()
 
         servicemanager.LogMsg(
             servicemanager.EVENTLOG_INFORMATION_TYPE,
@@ -0,0 +1,102 @@
+"""
+Adaptive polling intervals.
+A source is polled at its minimum interval while its temperature moves
+quickly, and backs off towards its maximum interval while readings are
+stable, so an idle machine is polled rarely without missing load transients.
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+
+class AdaptivePolling:
+    """Picks the next polling interval from the change between readings.
+
+    A reading that moved by at least step_threshold °C, or at a rate of at
+    least rate_threshold °C/s, drops the interval to min_interval. Moves of
+    no more than `resolution` °C are sensor noise (a reading flickering
+    between two whole degrees) and never count as a rate. After
+    stable_readings readings below both thresholds, the interval grows by
+    `backoff` per reading up to max_interval.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        max_interval: float,
+        step_threshold: float = 2.0,
+        rate_threshold: float = 1.0,
+        resolution: float = 1.0,
+        backoff: float = 1.5,
+        stable_readings: int = 3,
+        initial: Optional[float] = None,
+        key: Optional[Callable[[Any], Optional[float]]] = None,
+    ):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError(
+                f"Invalid adaptive polling bounds {min_interval}-{max_interval}s"
+            )
+        self.min_interval = min_interval  # seconds
+        self.max_interval = max_interval  # seconds
+        self.step_threshold = step_threshold  # °C
+        self.rate_threshold = rate_threshold  # °C per second
+        self.resolution = resolution  # °C
+        self.backoff = backoff
+        self.stable_readings = stable_readings
+        self.key = key  # extracts the temperature from a sampled value
+        start = min_interval if initial is None else initial
+        self.interval = min(max_interval, max(min_interval, start))
+        self._last: Optional[float] = None
+        self._last_time = 0.0
+        self._stable = 0
+        self.speedups = 0
+        self.backoffs = 0
+
+    def update(self, value: Any, timestamp: float) -> float:
+        """Account for a reading taken at `timestamp`; returns the next interval."""
+        if value is not None and self.key is not None:
+            value = self.key(value)
+        if value is None:
+            # A missing reading says nothing about the trend
+            return self.interval
+
+        if self._last is not None:
+            step = abs(value - self._last)
+            elapsed = timestamp - self._last_time
+            # At short intervals a one-degree flicker would look like a fast rate
+            rate = step / elapsed if elapsed > 0 and step > self.resolution else 0.0
+            if step >= self.step_threshold or rate >= self.rate_threshold:
+                if self.interval > self.min_interval:
+                    self.speedups += 1
+                self.interval = self.min_interval
+                self._stable = 0
+            else:
+                self._stable += 1
+                if (
+                    self._stable >= self.stable_readings
+                    and self.interval < self.max_interval
+                ):
+                    self.interval = min(self.max_interval, self.interval * self.backoff)
+                    self.backoffs += 1
+
+        self._last = value
+        self._last_time = timestamp
+        return self.interval
+
+    def stats(self) -> Dict[str, Any]:
+        """Current interval and how often it changed, in milliseconds."""
+        return {
+            "interval_ms": round(self.interval * 1000),
+            "min_interval_ms": round(self.min_interval * 1000),
+            "max_interval_ms": round(self.max_interval * 1000),
+            "speedups": self.speedups,
+            "backoffs": self.backoffs,
+        }
+
+
+def temperature_polling(
+    options: Optional[Dict[str, Any]]
+) -> Optional[AdaptivePolling]:
+    """Adaptive polling on snapshot temperatures; None keeps a fixed interval."""
+    if options is None:
+        return None
+    return AdaptivePolling(key=lambda snapshot: snapshot.temperature, **options)
@@ -0,0 +1,207 @@
+"""
+Registry of CPU, GPU and display backends.
+Backends are referenced by "module:attribute" and only imported when they are
+selected, so startup never pays for the import stack of unused backends.
+Third-party packages can add backends through the "af_pro_display.backends"
+entry point group, using names of the form "<kind>.<name>" (e.g. "gpu.amd").
+"""
+
+import builtins
+import importlib
+import importlib.util
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+ENTRY_POINT_GROUP = "af_pro_display.backends"
+
+# kind -> backend name -> "module:attribute" (relative modules resolve in src)
+_BACKENDS: Dict[str, Dict[str, Union[str, Callable[..., Any]]]] = {
+    "cpu": {
+        "auto": ".cpu:CPUMonitor",
+        "wmi": ".cpu:CPUMonitor",
+        "wmi-only": ".cpu:CPUMonitor",
+        "lhm": ".cpu:CPUMonitor",
+        "hwmon": ".cpu:CPUMonitor",
+    },
+    "gpu": {
+        "auto": ".gpu:GPUMonitor",
+        "nvidia": ".gpu:GPUMonitor",
+        "lhm": ".gpu:GPUMonitor",
+        "hwmon": ".gpu:GPUMonitor",
+    },
+    "display": {
+        "usb": ".usb:USBDevice",
+        "virtual": ".virtual:VirtualDisplay",
+    },
+}
+
+# Kinds whose unknown names fall back to a default backend with a warning
+# instead of failing (cpu_device used to accept any value)
+_FALLBACKS = {"cpu": "auto"}
+
+_entry_points_loaded = False
+_load_times: Dict[Tuple[str, str], float] = {}
+
+
+def register_backend(kind: str, name: str, target: Union[str, Callable[..., Any]]):
+    """Register a backend factory, or a "module:attribute" path to import lazily."""
+    _BACKENDS.setdefault(kind, {})[name.lower()] = target
+
+
+def available_backends(kind: str) -> List[str]:
+    """Names of the backends registered for a kind."""
+    _load_entry_points()
+    return sorted(_BACKENDS.get(kind, {}))
+
+
+def load_backend(kind: str, name: Optional[str]) -> Callable[..., Any]:
+    """Resolve a backend factory, importing its module on first use."""
+    key = (name or "auto").lower()
+    backends = _BACKENDS.get(kind, {})
+    if key not in backends:
+        _load_entry_points()
+        backends = _BACKENDS.get(kind, {})
+    if key not in backends and kind in _FALLBACKS:
+        print(
+            f"Warning: Unknown {kind} backend '{name}', using "
+            f"'{_FALLBACKS[kind]}' (available: {', '.join(available_backends(kind))})"
+        )
+        key = _FALLBACKS[kind]
+    if key not in backends:
+        raise ValueError(
+            f"Unknown {kind} backend '{name}'. "
+            f"Available: {', '.join(available_backends(kind))}"
+        )
+
+    target = backends[key]
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(":")
+        started = time.perf_counter()
+        module = importlib.import_module(module_name, __package__)
+        _load_times[(kind, key)] = time.perf_counter() - started
+        target = getattr(module, attribute)
+        backends[key] = target
+    return target
+
+
+def create_backend(kind: str, name: Optional[str], *args, **kwargs) -> Any:
+    """Import (if needed) and instantiate the selected backend."""
+    return load_backend(kind, name)(*args, **kwargs)
+
+
+def _load_entry_points():
+    """Register backends advertised by installed packages, once."""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    try:
+        from importlib.metadata import entry_points
+
+        eps = entry_points()
+        if hasattr(eps, "select"):
+            group = eps.select(group=ENTRY_POINT_GROUP)
+        else:
+            group = eps.get(ENTRY_POINT_GROUP, [])
+    except Exception:
+        return
+
+    for ep in group:
+        kind, _, name = ep.name.partition(".")
+        if name and name.lower() not in _BACKENDS.get(kind, {}):
+            register_backend(kind, name, ep.value)
+
+
+class ImportProfiler:
+    """Measure the wall time spent importing each module for the first time."""
+
+    def __init__(self):
+        self.timings: List[Tuple[int, str, float]] = []  # (depth, module, seconds)
+        self._depth = 0
+        self._original_import = None
+        self._original_import_module = None
+
+    def start(self):
+        """Start recording imports (import statements and importlib.import_module)."""
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        builtins.__import__ = self._import
+        importlib.import_module = self._import_module
+
+    def stop(self):
+        """Stop recording imports."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            importlib.import_module = self._original_import_module
+            self._original_import = None
+            self._original_import_module = None
+
+    def __enter__(self) -> "ImportProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = name
+        if level:
+            # Relative imports are recorded under their absolute name
+            package = (globals or {}).get("__package__") or ""
+            module = importlib.util.resolve_name("." * level + name, package)
+        pending = [] if module in sys.modules else [module]
+        # "from package import submodule" imports the submodules it lacks
+        parent = sys.modules.get(module)
+        if parent is not None and hasattr(parent, "__path__"):
+            pending += [
+                f"{module}.{item}"
+                for item in fromlist or ()
+                if item != "*" and not hasattr(parent, item)
+            ]
+        if not pending:
+            return self._original_import(name, globals, locals, fromlist, level)
+        return self._timed(
+            ", ".join(pending),
+            self._original_import,
+            name,
+            globals,
+            locals,
+            fromlist,
+            level,
+        )
+
+    def _import_module(self, name, package=None):
+        module = importlib.util.resolve_name(name, package) if name[:1] == "." else name
+        if module in sys.modules:
+            return self._original_import_module(name, package)
+        return self._timed(module, self._original_import_module, name, package)
+
+    def _timed(self, label: str, function: Callable[..., Any], *args):
+        depth = self._depth
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self._depth = depth
+            self.timings.append((depth, label, time.perf_counter() - started))
+
+    def report(self, min_ms: float = 1.0) -> str:
+        """Format top-level import timings, slowest first."""
+        top_level = [(name, secs) for depth, name, secs in self.timings if depth == 0]
+        top_level.sort(key=lambda item: item[1], reverse=True)
+        total = sum(secs for _, secs in top_level)
+
+        lines = ["Import profile (first import, inclusive):"]
+        for name, secs in top_level:
+            if secs * 1000 >= min_ms:
+                lines.append(f"  {secs * 1000:8.1f} ms  {name}")
+        lines.append(f"  {total * 1000:8.1f} ms  total")
+
+        if _load_times:
+            lines.append("Backend modules loaded:")
+            for (kind, name), secs in _load_times.items():
+                lines.append(f"  {secs * 1000:8.1f} ms  {kind}.{name}")
+        return "\n".join(lines)
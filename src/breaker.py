@@ -0,0 +1,135 @@
+"""
+Circuit breakers for sensor sources.
+A source that keeps failing is skipped for an exponentially growing, jittered
+delay instead of being retried (and logged) on every tick. When the delay has
+passed, the source is optionally re-initialized and given a single trial read.
+"""
+
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker guarding one source.
+
+    Not thread-safe: each breaker is driven by the single thread (or lock) that
+    reads its source.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        jitter: float = 0.2,
+        reinit: Optional[Callable[[], bool]] = None,
+        log: Callable[[str], None] = print,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff = backoff  # seconds before the first retry
+        self.max_backoff = max_backoff  # seconds
+        self.jitter = jitter  # +/- fraction of the delay
+        self.reinit = reinit
+        self.log = log
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # consecutive failed reads
+        self.trips = 0  # times the breaker opened
+        self.last_error: Optional[str] = None
+        self._consecutive_trips = 0
+        self._retry_at = 0.0
+
+    @property
+    def closed(self) -> bool:
+        """Whether reads pass through normally."""
+        return self.state == CLOSED
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker allows a trial read."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._retry_at - self.clock())
+
+    def allow(self) -> bool:
+        """Whether the source may be read now, moving open -> half-open when due."""
+        if self.state != OPEN:
+            return True
+        if self.clock() < self._retry_at:
+            return False
+
+        self.state = HALF_OPEN
+        if self.reinit is not None:
+            try:
+                ready = self.reinit()
+            except Exception as e:
+                ready = False
+                self.last_error = str(e)
+            if not ready:
+                self._trip()
+                return False
+        return True
+
+    def success(self):
+        """Record a good reading."""
+        if self.state != CLOSED:
+            self.log(f"{self.name} recovered")
+        self.state = CLOSED
+        self.failures = 0
+        self._consecutive_trips = 0
+
+    def failure(self, error: Optional[BaseException] = None):
+        """Record a failed reading, opening the breaker past the threshold."""
+        self.failures += 1
+        if error is not None:
+            self.last_error = str(error)
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._trip()
+
+    def call(self, read: Callable[[], Any]) -> Any:
+        """Read through the breaker; exceptions and None count as failures."""
+        if not self.allow():
+            return None
+        try:
+            value = read()
+        except Exception as e:
+            self.failure(e)
+            return None
+        if value is None:
+            self.failure()
+        else:
+            self.success()
+        return value
+
+    def _trip(self):
+        """Open the breaker for the next backoff delay."""
+        delay = min(self.max_backoff, self.backoff * 2**self._consecutive_trips)
+        delay *= 1.0 + random.uniform(-self.jitter, self.jitter)
+        self._retry_at = self.clock() + delay
+        self._consecutive_trips += 1
+
+        # Only the closed -> open transition is logged; retries stay quiet
+        if self.state == CLOSED:
+            self.trips += 1
+            reason = f": {self.last_error}" if self.last_error else ""
+            self.log(
+                f"Warning: {self.name} failing{reason}, retrying in {delay:.1f}s"
+            )
+        self.state = OPEN
+
+    def status(self) -> Dict[str, Any]:
+        """State, trip count and retry delay for monitoring."""
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "failures": self.failures,
+            "retry_in": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+        }
@@ -2,31 +2,180 @@
 Configuration management for Antec Flux Pro Display.
 """
 
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Set, Union
 
 
 @dataclass
 class Config:
     """Configuration class for the temperature monitor."""
 
-    cpu_device: Optional[str] = "WMI"
+    cpu_device: Optional[str] = "auto"
+    cpu_sensor: Optional[str] = None  # LHM sensor name or Identifier to pin
+    cpu_metric: Optional[str] = None  # e.g. "max(core*)", "package", "p90(core*)"
+    cpu_reprobe_interval: int = 60  # seconds, 0 disables re-probing
+    probe_timeout: int = 3000  # milliseconds each CPU source probe may take
+    wmi_cache_ttl: int = 0  # milliseconds to reuse WMI readings, 0 disables
+    breaker_threshold: int = 3  # consecutive failures before a source is skipped
+    breaker_backoff: int = 2000  # milliseconds before retrying, doubling per trip
+    breaker_max_backoff: int = 60000  # milliseconds
     gpu_device: Optional[str] = "auto"
+    gpu_metric: Optional[str] = None  # e.g. "hottest", "mean", "max(gpu*)", "gpu0"
+    gpu_select: Optional[List[Union[int, str]]] = None  # indices, UUIDs or PCI IDs
+    display_device: str = "usb"  # "usb" or "virtual" (no hardware, logs frames)
+    virtual_display_output: Optional[str] = None  # "udp://HOST:PORT" or a file
+    display_hysteresis: float = 0.0  # °C a temperature may move without a write
+    display_keepalive: int = 5000  # milliseconds between refreshes, 0 sends all
+    display_reconnect_backoff: int = 1000  # milliseconds, doubling per failed open
+    display_reconnect_max_backoff: int = 30000  # milliseconds
+    sysfs_root: str = "/sys"  # Linux hwmon sources; point at a fake tree to test
     polling_interval: int = 1000  # milliseconds
+    overrun_policy: str = "skip"  # "skip" or "catch-up" for updates that ran late
+    cpu_sample_interval: Optional[int] = None  # milliseconds, polling_interval if unset
+    gpu_sample_interval: Optional[int] = None  # milliseconds, polling_interval if unset
+    adaptive_polling: bool = False  # poll faster while temperatures move
+    cpu_adaptive_polling: Optional[bool] = None  # adaptive_polling if unset
+    gpu_adaptive_polling: Optional[bool] = None  # adaptive_polling if unset
+    min_polling_interval: int = 250  # milliseconds, while temperatures move
+    max_polling_interval: int = 5000  # milliseconds, while they are stable
+    adaptive_step_threshold: float = 2.0  # °C between readings
+    adaptive_rate_threshold: float = 1.0  # °C per second
+    config_reload_interval: int = 2000  # milliseconds between checks, 0 disables
+    history_capacity: int = 604800  # samples per metric (a week at 1 Hz), 0 disables
+    exporter_enabled: bool = False  # serve Prometheus metrics over HTTP
+    exporter_host: str = "127.0.0.1"
+    exporter_port: int = 9184
+    # Metrics read per sample: temperature, load, clock, power
+    snapshot_metrics: List[str] = field(default_factory=lambda: ["temperature"])
+
+    def sample_interval(self, source: str) -> int:
+        """Sampling interval in milliseconds for a source ("cpu", "gpu")."""
+        interval = getattr(self, f"{source}_sample_interval", None)
+        return interval or self.polling_interval
+
+    def adaptive_options(self, source: str) -> Optional[Dict[str, Any]]:
+        """Adaptive polling keyword arguments for a source (seconds), or None."""
+        enabled = getattr(self, f"{source}_adaptive_polling", None)
+        if enabled is None:
+            enabled = self.adaptive_polling
+        if not enabled:
+            return None
+        return {
+            "min_interval": self.min_polling_interval / 1000.0,
+            "max_interval": self.max_polling_interval / 1000.0,
+            "step_threshold": self.adaptive_step_threshold,
+            "rate_threshold": self.adaptive_rate_threshold,
+            "initial": self.sample_interval(source) / 1000.0,
+        }
+
+    def breaker_options(self) -> Dict[str, Any]:
+        """Circuit breaker keyword arguments for the CPU/GPU monitors (seconds)."""
+        return {
+            "breaker_threshold": self.breaker_threshold,
+            "breaker_backoff": self.breaker_backoff / 1000.0,
+            "breaker_max_backoff": self.breaker_max_backoff / 1000.0,
+        }
+
+    def display_options(self) -> Dict[str, Any]:
+        """Frame filtering and reconnect keyword arguments for the display (seconds)."""
+        options = {
+            "hysteresis": self.display_hysteresis,
+            "keepalive": self.display_keepalive / 1000.0,
+            # Look for a missing display once per display update
+            "probe_interval": self.polling_interval / 1000.0,
+            "reconnect_backoff": self.display_reconnect_backoff / 1000.0,
+            "reconnect_max_backoff": self.display_reconnect_max_backoff / 1000.0,
+        }
+        if self.display_device == "virtual":
+            options["output"] = self.virtual_display_output
+        return options
+
+    def changes(self, other: "Config") -> Set[str]:
+        """Names of the settings that differ in `other`."""
+        mine, theirs = self.to_dict(), other.to_dict()
+        return {key for key, value in mine.items() if theirs[key] != value}
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary for TOML serialization."""
         return {
             "cpu_device": self.cpu_device,
+            "cpu_sensor": self.cpu_sensor,
+            "cpu_metric": self.cpu_metric,
+            "cpu_reprobe_interval": self.cpu_reprobe_interval,
+            "probe_timeout": self.probe_timeout,
+            "wmi_cache_ttl": self.wmi_cache_ttl,
+            "breaker_threshold": self.breaker_threshold,
+            "breaker_backoff": self.breaker_backoff,
+            "breaker_max_backoff": self.breaker_max_backoff,
             "gpu_device": self.gpu_device,
+            "gpu_metric": self.gpu_metric,
+            "gpu_select": self.gpu_select,
+            "display_device": self.display_device,
+            "virtual_display_output": self.virtual_display_output,
+            "display_hysteresis": self.display_hysteresis,
+            "display_keepalive": self.display_keepalive,
+            "display_reconnect_backoff": self.display_reconnect_backoff,
+            "display_reconnect_max_backoff": self.display_reconnect_max_backoff,
+            "sysfs_root": self.sysfs_root,
             "polling_interval": self.polling_interval,
+            "overrun_policy": self.overrun_policy,
+            "cpu_sample_interval": self.cpu_sample_interval,
+            "gpu_sample_interval": self.gpu_sample_interval,
+            "adaptive_polling": self.adaptive_polling,
+            "cpu_adaptive_polling": self.cpu_adaptive_polling,
+            "gpu_adaptive_polling": self.gpu_adaptive_polling,
+            "min_polling_interval": self.min_polling_interval,
+            "max_polling_interval": self.max_polling_interval,
+            "adaptive_step_threshold": self.adaptive_step_threshold,
+            "adaptive_rate_threshold": self.adaptive_rate_threshold,
+            "config_reload_interval": self.config_reload_interval,
+            "history_capacity": self.history_capacity,
+            "exporter_enabled": self.exporter_enabled,
+            "exporter_host": self.exporter_host,
+            "exporter_port": self.exporter_port,
+            "snapshot_metrics": self.snapshot_metrics,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Config":
         """Create config from dictionary loaded from TOML."""
         return cls(
-            cpu_device=data.get("cpu_device", "WMI"),
+            cpu_device=data.get("cpu_device", "auto"),
+            cpu_sensor=data.get("cpu_sensor"),
+            cpu_metric=data.get("cpu_metric"),
+            cpu_reprobe_interval=data.get("cpu_reprobe_interval", 60),
+            probe_timeout=data.get("probe_timeout", 3000),
+            wmi_cache_ttl=data.get("wmi_cache_ttl", 0),
+            breaker_threshold=data.get("breaker_threshold", 3),
+            breaker_backoff=data.get("breaker_backoff", 2000),
+            breaker_max_backoff=data.get("breaker_max_backoff", 60000),
             gpu_device=data.get("gpu_device", "auto"),
+            gpu_metric=data.get("gpu_metric"),
+            gpu_select=data.get("gpu_select"),
+            display_device=data.get("display_device", "usb"),
+            virtual_display_output=data.get("virtual_display_output"),
+            display_hysteresis=data.get("display_hysteresis", 0.0),
+            display_keepalive=data.get("display_keepalive", 5000),
+            display_reconnect_backoff=data.get("display_reconnect_backoff", 1000),
+            display_reconnect_max_backoff=data.get(
+                "display_reconnect_max_backoff", 30000
+            ),
+            sysfs_root=data.get("sysfs_root", "/sys"),
             polling_interval=data.get("polling_interval", 1000),
+            overrun_policy=data.get("overrun_policy", "skip"),
+            cpu_sample_interval=data.get("cpu_sample_interval"),
+            gpu_sample_interval=data.get("gpu_sample_interval"),
+            adaptive_polling=data.get("adaptive_polling", False),
+            cpu_adaptive_polling=data.get("cpu_adaptive_polling"),
+            gpu_adaptive_polling=data.get("gpu_adaptive_polling"),
+            min_polling_interval=data.get("min_polling_interval", 250),
+            max_polling_interval=data.get("max_polling_interval", 5000),
+            adaptive_step_threshold=data.get("adaptive_step_threshold", 2.0),
+            adaptive_rate_threshold=data.get("adaptive_rate_threshold", 1.0),
+            config_reload_interval=data.get("config_reload_interval", 2000),
+            history_capacity=data.get("history_capacity", 604800),
+            exporter_enabled=data.get("exporter_enabled", False),
+            exporter_host=data.get("exporter_host", "127.0.0.1"),
+            exporter_port=data.get("exporter_port", 9184),
+            snapshot_metrics=data.get("snapshot_metrics", ["temperature"]),
         )
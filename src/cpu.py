@@ -2,218 +2,628 @@
 CPU temperature monitoring for Windows using multiple methods.
 """
 
-import wmi
-import psutil
-import os
+import importlib
 import sys
-from typing import Optional
-
-# Try to import .NET interop for LibreHardwareMonitor DLL
-try:
-    import clr
-
-    PYTHONNET_AVAILABLE = True
-except ImportError:
-    PYTHONNET_AVAILABLE = False
-    clr = None
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .breaker import CircuitBreaker
+from .lhm import LHMSession, shared_session
+from .metrics import NAN, BoundMetric, MetricArray, MetricExpression, canonical_name
+from .snapshot import HardwareSnapshot, validate_metrics
+from .wmi_access import WMIBackend, WMIReader
+
+CIMV2_NAMESPACE = "root\\cimv2"
+HARDWARE_MONITOR_NAMESPACES = (
+    "root\\OpenHardwareMonitor",
+    "root\\LibreHardwareMonitor",
+)
+HARDWARE_MONITOR_SENSOR_FILTER = {"SensorType": "Temperature"}
+
+# cpu_device values that restrict the probed sources to one kind; anything else
+# ("auto", or "WMI" as older config files say) probes every source
+CPU_DEVICES = ("lhm", "wmi-only", "hwmon")
+
+# Temperature sources in fallback order
+SOURCE_PRIORITY = (
+    "LibreHardwareMonitor DLL",
+    "hwmon",
+    "psutil",
+    "Hardware monitor WMI",
+    "MSAcpi_ThermalZoneTemperature",
+    "Win32_TemperatureProbe",
+    "Performance counter",
+)
+
+# LibreHardwareMonitor CPU sensors backing the non-temperature snapshot metrics:
+# metric -> (sensor type, sensor names, reduction over the matches)
+LHM_SNAPSHOT_SENSORS = {
+    "load": ("Load", ("CPU Total",), "first(*)"),
+    "clock": ("Clock", None, "mean(core*)"),
+    "power": ("Power", ("CPU Package", "Package"), "first(*)"),
+}
+
+
+class LHMSensorRef:
+    """Resolved LibreHardwareMonitor sensor handle and the hardware that owns it."""
+
+    __slots__ = (
+        "hardware",
+        "sensor",
+        "hardware_type",
+        "sensor_type",
+        "name",
+        "identifier",
+    )
+
+    def __init__(self, hardware, sensor):
+        self.hardware = hardware
+        self.sensor = sensor
+        # Resolve the .NET strings once so polling never has to
+        self.hardware_type = str(hardware.HardwareType)
+        self.sensor_type = str(sensor.SensorType)
+        self.name = str(sensor.Name)
+        self.identifier = str(sensor.Identifier)
+
+    def matches(self, selector: str) -> bool:
+        """Check whether a configured selector names this sensor."""
+        selector = selector.strip()
+        return selector == self.identifier or selector.lower() == self.name.lower()
 
 
 class CPUMonitor:
     """Monitor CPU temperature on Windows systems."""
 
-    def __init__(self, device: Optional[str] = None):
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        sensor: Optional[str] = None,
+        metric: Optional[str] = None,
+        reprobe_interval: float = 60.0,
+        wmi_cache_ttl: float = 0.0,
+        wmi_backend: Optional[WMIBackend] = None,
+        lhm_session: Optional[LHMSession] = None,
+        sysfs_root: str = "/sys",
+        probe_timeout: float = 3.0,
+        breaker_threshold: int = 3,
+        breaker_backoff: float = 2.0,
+        breaker_max_backoff: float = 60.0,
+    ):
         self.device = device or "auto"
-        self.wmi_connection = None
+        self.sensor = sensor
+        self.metric = _compile_metric(metric)
+        self.reprobe_interval = reprobe_interval  # seconds, 0 disables
+        self.wmi_reader = WMIReader(wmi_backend, ttl=wmi_cache_ttl)
+        # WMI only exists on Windows unless a stand-in backend is supplied
+        self.wmi_enabled = sys.platform == "win32" or wmi_backend is not None
+        self.sysfs_root = sysfs_root
+        self.probe_timeout = probe_timeout  # seconds per source probe
+        self.breaker_threshold = breaker_threshold
+        self.breaker_backoff = breaker_backoff  # seconds
+        self.breaker_max_backoff = breaker_max_backoff  # seconds
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.hwmon = None
+        self._psutil = None
+        self.hardware_monitor_namespaces: List[str] = []
         self.methods_tried = []
         self.libre_hardware_monitor = None
+        self.lhm = lhm_session or shared_session()
         self.computer = None
+        self.sensor_index: Dict[str, LHMSensorRef] = {}
+        self._display_sensors: List[LHMSensorRef] = []
+        self._update_targets = []
+        self._snapshot_sensors: Dict[str, Tuple[list, MetricArray, BoundMetric]] = {}
+        self._metric_array: Optional[MetricArray] = None
+        self._bound_metric: Optional[BoundMetric] = None
+        self._sources: List[Tuple[str, Callable[[], Optional[float]]]] = []
+        self.source_stats: Dict[str, Dict[str, int]] = {}
+        self.active_source: Optional[int] = None
+        self._last_reprobe = 0.0
+        self.available_sources: Set[str] = set()
+        self.probe_report: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._pending_probes: Set[str] = set()
         self._initialize()
 
     def _initialize(self):
-        """Initialize available monitoring methods."""
-        # Try LibreHardwareMonitor DLL first (most reliable)
-        self._initialize_libre_hardware_monitor()
+        """Probe every source concurrently and return once one of them answers."""
+        probes = self._probes()
+        if not probes:
+            return
+
+        started = time.monotonic()
+        with self._lock:
+            self._pending_probes = {name for name, _, _ in probes}
+            for name, _, _ in probes:
+                self.probe_report[name] = {
+                    "available": False,
+                    "latency_ms": None,
+                    "status": "pending",
+                }
+
+        for name, probe, source in probes:
+            threading.Thread(
+                target=self._run_probe,
+                args=(name, probe, source, started),
+                name=f"cpu-probe-{name}",
+                daemon=True,
+            ).start()
+
+        # Usable as soon as the first source is available, or when all probes
+        # have failed or run out of time
+        if not self._ready.wait(self.probe_timeout):
+            self._expire_probes()
+        elif self._pending_probes:
+            # The probes still running are reported as timed out at the deadline
+            remaining = started + self.probe_timeout - time.monotonic()
+            deadline = threading.Timer(max(0.0, remaining), self._expire_probes)
+            deadline.daemon = True
+            deadline.start()
+
+    def _expire_probes(self):
+        """Mark the probes that missed the deadline as timed out."""
+        with self._lock:
+            for name in sorted(self._pending_probes):
+                self.probe_report[name] = {
+                    "available": False,
+                    "latency_ms": round(self.probe_timeout * 1000.0, 1),
+                    "status": "timeout",
+                }
+                print(f"CPU source probe: {name} timeout")
+            if self._pending_probes:
+                self._pending_probes.clear()
+                self._probes_done()
+
+    def _probes_done(self):
+        """All probes answered or timed out."""
+        self._ready.set()
+        if not self.available_sources:
+            print("Warning: No CPU temperature sources found")
+            print(
+                "CPU temperature may not be available without additional "
+                "hardware monitoring software"
+            )
+
+    def _probes(self) -> List[Tuple[str, Callable[[], bool], str]]:
+        """List (probe name, probe callable, source enabled) for this platform."""
+        device = self.device.lower()
+        if device not in CPU_DEVICES:
+            device = "auto"
+        probes = []
+
+        # Native Linux sensors need no extra software
+        if device == "hwmon" or (device == "auto" and sys.platform.startswith("linux")):
+            probes.append(("hwmon", self._initialize_hwmon, "hwmon"))
+        if device in ("auto", "lhm"):
+            probes.append(
+                (
+                    "LibreHardwareMonitor DLL",
+                    self._initialize_libre_hardware_monitor,
+                    "LibreHardwareMonitor DLL",
+                )
+            )
+        if device == "auto":
+            probes.append(("psutil", self._probe_psutil, "psutil"))
+
+        if device in ("auto", "wmi-only") and self.wmi_enabled:
+            for namespace in HARDWARE_MONITOR_NAMESPACES:
+                probes.append(
+                    (
+                        namespace,
+                        lambda namespace=namespace: self._probe_hardware_monitor(
+                            namespace
+                        ),
+                        "Hardware monitor WMI",
+                    )
+                )
+            for source, wmi_class, prop in (
+                (
+                    "MSAcpi_ThermalZoneTemperature",
+                    "MSAcpi_ThermalZoneTemperature",
+                    "CurrentTemperature",
+                ),
+                ("Win32_TemperatureProbe", "Win32_TemperatureProbe", "CurrentReading"),
+                (
+                    "Performance counter",
+                    "Win32_PerfRawData_Counters_ThermalZoneInformation",
+                    "Temperature",
+                ),
+            ):
+                probes.append(
+                    (
+                        wmi_class,
+                        lambda wmi_class=wmi_class, prop=prop: bool(
+                            self._read_cimv2(wmi_class, prop)
+                        ),
+                        source,
+                    )
+                )
+        return probes
 
-        # Try WMI connection as fallback
+    def _run_probe(
+        self, name: str, probe: Callable[[], bool], source: str, started: float
+    ):
+        """Run one probe and enable its source if it answered.
+
+        A probe still running at the deadline has been reported as timed out,
+        but its source is enabled if it answers later.
+        """
+        error = None
         try:
-            self.wmi_connection = wmi.WMI(namespace="root\\cimv2")
-            self._test_wmi_access()
+            available = bool(probe())
         except Exception as e:
-            print(f"Warning: Failed to initialize WMI connection: {e}")
-            self.wmi_connection = None
+            available = False
+            error = e
+        latency = time.monotonic() - started
+
+        if error is not None:
+            status = f"error: {error}"
+        elif not available:
+            status = "unavailable"
+        else:
+            status = "ok" if latency <= self.probe_timeout else "late"
+
+        with self._lock:
+            expired = name not in self._pending_probes
+            if not expired or available:
+                self.probe_report[name] = {
+                    "available": available,
+                    "latency_ms": round(latency * 1000.0, 1),
+                    "status": status,
+                }
+            if available:
+                if name in HARDWARE_MONITOR_NAMESPACES:
+                    self.hardware_monitor_namespaces = [
+                        namespace
+                        for namespace in HARDWARE_MONITOR_NAMESPACES
+                        if namespace == name
+                        or namespace in self.hardware_monitor_namespaces
+                    ]
+                self.available_sources.add(source)
+                self._rebuild_sources()
+                self._ready.set()
+            if expired and not available:
+                return  # already reported as timed out
+
+            print(f"CPU source probe: {name} {status} ({latency * 1000.0:.0f} ms)")
+
+            self._pending_probes.discard(name)
+            if not expired and not self._pending_probes:
+                self._probes_done()
+
+    def _rebuild_sources(self):
+        """Rebuild the fallback chain from the available sources, in priority order."""
+        methods = {
+            "LibreHardwareMonitor DLL": self._get_libre_hardware_monitor_temperature,
+            "hwmon": self._get_hwmon_temperature,
+            "psutil": self._get_psutil_temperature,
+            "Hardware monitor WMI": self._get_hardware_monitor_temperature,
+            "MSAcpi_ThermalZoneTemperature": self._get_thermal_zone_temperature,
+            "Win32_TemperatureProbe": self._get_temperature_probe,
+            "Performance counter": self._get_performance_counter_temperature,
+        }
+
+        active_name = None
+        if self.active_source is not None:
+            active_name = self._sources[self.active_source][0]
+
+        self._sources = [
+            (name, methods[name])
+            for name in SOURCE_PRIORITY
+            if name in self.available_sources
+        ]
+        # Re-initialization hooks run before a tripped source is tried again
+        reset_cimv2 = lambda: self._reset_wmi([CIMV2_NAMESPACE])
+        reinit = {
+            "LibreHardwareMonitor DLL": self._reinit_libre_hardware_monitor,
+            "hwmon": self._reinit_hwmon,
+            "psutil": None,
+            "Hardware monitor WMI": lambda: self._reset_wmi(
+                self.hardware_monitor_namespaces
+            ),
+            "MSAcpi_ThermalZoneTemperature": reset_cimv2,
+            "Win32_TemperatureProbe": reset_cimv2,
+            "Performance counter": reset_cimv2,
+        }
+        for name, _ in self._sources:
+            self.source_stats.setdefault(name, {"hits": 0, "misses": 0})
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(
+                    f"CPU source {name}",
+                    self.breaker_threshold,
+                    self.breaker_backoff,
+                    self.breaker_max_backoff,
+                    reinit=reinit[name],
+                )
 
-    def _initialize_libre_hardware_monitor(self):
+        names = [name for name, _ in self._sources]
+        self.active_source = names.index(active_name) if active_name else None
+        # Let a newly available higher-priority source take over on the next read
+        self._last_reprobe = 0.0
+
+    def _initialize_hwmon(self) -> bool:
+        """Open the Linux hwmon/thermal_zone CPU sensors."""
+        from .hwmon import HwmonCPUSource
+
+        hwmon = HwmonCPUSource(self.sysfs_root, self.metric)
+        if not hwmon:
+            return False
+        self.hwmon = hwmon
+        print(f"hwmon CPU sensors: {', '.join(hwmon.chips)}")
+        return True
+
+    def _reinit_hwmon(self) -> bool:
+        """Reopen the hwmon sensor files, which change when drivers reload."""
+        if self.hwmon:
+            self.hwmon.close()
+            self.hwmon = None
+        return self._initialize_hwmon()
+
+    def _reset_wmi(self, namespaces) -> bool:
+        """Reconnect WMI namespaces on the next read."""
+        for namespace in namespaces:
+            self.wmi_reader.reset(namespace)
+        return True
+
+    def _probe_psutil(self) -> bool:
+        """Check whether psutil can report temperatures (it cannot on Windows)."""
+        self._psutil = _import_optional("psutil")
+        return hasattr(self._psutil, "sensors_temperatures")
+
+    def _probe_hardware_monitor(self, namespace: str) -> bool:
+        """Check an OHM/LHM WMI namespace for CPU temperature sensors."""
+        return bool(self._read_hardware_monitor_sensors(namespace))
+
+    def _initialize_libre_hardware_monitor(self) -> bool:
         """Initialize LibreHardwareMonitor DLL."""
-        if not PYTHONNET_AVAILABLE:
-            print(
-                "Warning: pythonnet not available, LibreHardwareMonitor DLL support disabled"
-            )
-            return
+        if not self.lhm.acquire("cpu"):
+            return False
 
         try:
-            # Get the directory where this script is located
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(script_dir)
-            dll_path = os.path.join(project_root, "LibreHardwareMonitorLib.dll")
-
-            if not os.path.exists(dll_path):
-                print(f"Warning: LibreHardwareMonitorLib.dll not found at {dll_path}")
-                return
-
-            # Add reference to the DLL
-            clr.AddReference(dll_path)
-
-            # Import the LibreHardwareMonitor types
-            from LibreHardwareMonitor.Hardware import Computer, HardwareType
-
-            # Create and open the computer object
-            self.computer = Computer()
-            self.computer.IsCpuEnabled = True
-            self.computer.IsGpuEnabled = False  # We only need CPU for this class
-            self.computer.IsMemoryEnabled = False
-            self.computer.IsMotherboardEnabled = False
-            self.computer.IsControllerEnabled = False
-            self.computer.IsNetworkEnabled = False
-            self.computer.IsStorageEnabled = False
-
-            self.computer.Open()
+            self.computer = self.lhm.computer
+            self._build_sensor_index()
             print("LibreHardwareMonitor DLL initialized successfully")
+            return bool(self._display_sensors)
 
         except Exception as e:
             print(f"Warning: Failed to initialize LibreHardwareMonitor DLL: {e}")
             self.computer = None
+            self.lhm.release("cpu")
+            return False
 
-    def _test_wmi_access(self):
-        """Test if WMI temperature access is available."""
-        methods_available = []
-
-        try:
-            # Try to access thermal zone temperature
-            thermal_zones = self.wmi_connection.query(
-                "SELECT * FROM MSAcpi_ThermalZoneTemperature"
-            )
-            if thermal_zones:
-                methods_available.append("MSAcpi_ThermalZoneTemperature")
-        except Exception:
-            pass
-
-        try:
-            # Try alternative WMI class
-            temp_probes = self.wmi_connection.query(
-                "SELECT * FROM Win32_TemperatureProbe"
-            )
-            if temp_probes:
-                methods_available.append("Win32_TemperatureProbe")
-        except Exception:
-            pass
-
-        try:
-            # Try OpenHardwareMonitor WMI namespace (if installed)
-            ohm_wmi = wmi.WMI(namespace="root\\OpenHardwareMonitor")
-            sensors = ohm_wmi.query(
-                "SELECT * FROM Sensor WHERE SensorType='Temperature' AND Name LIKE '%CPU%'"
-            )
-            if sensors:
-                methods_available.append("OpenHardwareMonitor")
-                self.ohm_connection = ohm_wmi
-        except Exception:
-            self.ohm_connection = None
-
-        try:
-            # Try LibreHardwareMonitor WMI namespace (if installed)
-            lhm_wmi = wmi.WMI(namespace="root\\LibreHardwareMonitor")
-            sensors = lhm_wmi.query(
-                "SELECT * FROM Sensor WHERE SensorType='Temperature' AND Name LIKE '%CPU%'"
+    def _reinit_libre_hardware_monitor(self) -> bool:
+        """Rebuild the sensor index, since hardware can be re-enumerated."""
+        if not self.computer:
+            return False
+        self._build_sensor_index()
+        return bool(self._display_sensors)
+
+    def _build_sensor_index(self):
+        """Resolve sensor handles once so polling skips the hardware tree walk."""
+        self.sensor_index = {}
+        for hardware in self.lhm.hardware(("Cpu",)):
+            self._index_hardware(hardware)
+
+        self._display_sensors = self._resolve_display_sensors()
+
+        # Only the hardware nodes owning displayed sensors need Update() per poll
+        self._update_targets = _owning_hardware(self._display_sensors)
+
+        self._snapshot_sensors = {}
+        for metric, (sensor_type, names, expression) in LHM_SNAPSHOT_SENSORS.items():
+            refs = [
+                ref
+                for ref in self.sensor_index.values()
+                if ref.hardware_type == "Cpu"
+                and ref.sensor_type == sensor_type
+                and (names is None or ref.name in names)
+            ]
+            if names:
+                # Keep the preferred name first
+                refs.sort(key=lambda ref: names.index(ref.name))
+            array = MetricArray([ref.name for ref in refs])
+            bound = array.bind(expression)
+            if bound:
+                self._snapshot_sensors[metric] = (refs, array, bound)
+
+        if self._display_sensors:
+            names = [ref.name for ref in self._display_sensors]
+            if len(names) > 6:
+                names = names[:6] + [f"... ({len(names)} total)"]
+            print(f"LibreHardwareMonitor sensors: {', '.join(names)}")
+        else:
+            print("Warning: No LibreHardwareMonitor CPU temperature sensors found")
+
+    def _index_hardware(self, hardware):
+        """Add the sensors of a hardware node and its sub-hardware to the index."""
+        # Populate sensor values once so the index sees every sensor
+        self.lhm.update([hardware], force=True)
+        for sensor in hardware.Sensors:
+            ref = LHMSensorRef(hardware, sensor)
+            self.sensor_index[ref.identifier] = ref
+
+        for sub_hardware in hardware.SubHardware:
+            self._index_hardware(sub_hardware)
+
+    def _resolve_display_sensors(self) -> List[LHMSensorRef]:
+        """Pick the indexed sensors the display reads, honouring a pinned sensor."""
+        cpu_temperatures = [
+            ref
+            for ref in self.sensor_index.values()
+            if ref.hardware_type == "Cpu" and ref.sensor_type == "Temperature"
+        ]
+
+        if self.metric:
+            # Read only the sensors the expression selects, in one compact array
+            names = [canonical_name(ref.name) for ref in cpu_temperatures]
+            indices = self.metric.bind(names).indices
+            if indices:
+                selected = [cpu_temperatures[i] for i in indices]
+                self._metric_array = MetricArray([ref.name for ref in selected])
+                self._bound_metric = self._metric_array.bind(self.metric)
+                return selected
+            print(
+                f"Warning: CPU metric '{self.metric.text}' matches no sensors "
+                f"(available: {', '.join(names)})"
             )
-            if sensors:
-                methods_available.append("LibreHardwareMonitor")
-                self.lhm_connection = lhm_wmi
-        except Exception:
-            self.lhm_connection = None
 
-        if not methods_available:
-            print("Warning: No WMI temperature sources found")
+        if self.sensor:
+            pinned = [
+                ref for ref in self.sensor_index.values() if ref.matches(self.sensor)
+            ]
+            if pinned:
+                return pinned[:1]
             print(
-                "CPU temperature may not be available without additional hardware monitoring software"
+                f"Warning: Pinned CPU sensor '{self.sensor}' not found, "
+                "using all CPU temperature sensors"
             )
-        else:
-            print(f"Available WMI methods: {', '.join(methods_available)}")
+
+        return cpu_temperatures
 
     def get_temperature(self) -> Optional[float]:
         """Get current CPU temperature in Celsius."""
-        self.methods_tried = []
-
-        # Try LibreHardwareMonitor DLL first (most accurate)
-        temp = self._get_libre_hardware_monitor_temperature()
-        if temp is not None:
-            return temp
+        with self._lock:
+            return self._get_temperature()
+
+    def get_snapshot(self, metrics=("temperature",)) -> HardwareSnapshot:
+        """Read the requested metrics with a single hardware update pass."""
+        metrics = validate_metrics(metrics)
+        snapshot = HardwareSnapshot()
+        with self._lock:
+            # The LHM session updates each hardware node at most once per tick
+            snapshot.temperature = self._get_temperature()
+            for metric in metrics:
+                if metric != "temperature":
+                    snapshot.set(metric, self._read_snapshot_metric(metric))
+        return snapshot
+
+    def _read_snapshot_metric(self, metric: str) -> Optional[float]:
+        """Read a non-temperature metric from LHM, falling back to psutil."""
+        breaker = self.breakers.get("LibreHardwareMonitor DLL")
+        lhm_healthy = breaker is None or breaker.closed
+        if self.computer and lhm_healthy and metric in self._snapshot_sensors:
+            refs, array, bound = self._snapshot_sensors[metric]
+            try:
+                self.lhm.update(_owning_hardware(refs))
+                values = array.values
+                for i in bound.indices:
+                    value = refs[i].sensor.Value
+                    values[i] = NAN if value is None else float(value)
+                value = bound.evaluate(values)
+                if value is not None:
+                    return value
+            except Exception:
+                pass  # The temperature read trips the breaker; use psutil
 
-        # Try psutil (if available)
-        temp = self._get_psutil_temperature()
-        if temp is not None:
-            return temp
+        if metric == "power":
+            return None  # psutil has no power readings
 
-        if not self.wmi_connection:
+        if self._psutil is None:
+            self._psutil = _import_optional("psutil")
+        try:
+            if metric == "load":
+                # Utilization since the previous call, without blocking
+                return float(self._psutil.cpu_percent(interval=None))
+            frequency = self._psutil.cpu_freq()
+            return float(frequency.current) if frequency else None
+        except Exception:
             return None
 
-        # Try OpenHardwareMonitor/LibreHardwareMonitor WMI
-        temp = self._get_hardware_monitor_temperature()
-        if temp is not None:
-            return temp
-
-        # Try MSAcpi_ThermalZoneTemperature
-        temp = self._get_thermal_zone_temperature()
-        if temp is not None:
-            return temp
-
-        # Try Win32_TemperatureProbe as fallback
-        temp = self._get_temperature_probe()
-        if temp is not None:
-            return temp
+    def _get_temperature(self) -> Optional[float]:
+        self.methods_tried.clear()
+
+        active = self.active_source
+        if active is not None:
+            # Periodically give higher-priority sources a chance to take over
+            now = time.monotonic()
+            if (
+                active > 0
+                and self.reprobe_interval
+                and now - self._last_reprobe >= self.reprobe_interval
+            ):
+                self._last_reprobe = now
+                temp = self._try_sources(range(active))
+                if temp is not None:
+                    return temp
+
+            temp = self._read_source(active)
+            if temp is not None:
+                return temp
+
+        # Fall back to the full chain, skipping the source that just failed
+        return self._try_sources(
+            index for index in range(len(self._sources)) if index != active
+        )
+
+    def _try_sources(self, indices) -> Optional[float]:
+        """Try sources in order and return the first valid reading."""
+        for index in indices:
+            temp = self._read_source(index)
+            if temp is not None:
+                return temp
+        return None
 
-        # Try performance counter as last resort
-        temp = self._get_performance_counter_temperature()
-        if temp is not None:
-            return temp
+    def _read_source(self, index: int) -> Optional[float]:
+        """Read one source, keeping it sticky when it produces a reading."""
+        name, method = self._sources[index]
+        self.methods_tried.append(name)
+        stats = self.source_stats[name]
+
+        # A tripped source is skipped without touching the hardware
+        temp = self.breakers[name].call(method)
+        if temp is None:
+            stats["misses"] += 1
+            if self.active_source == index:
+                self.active_source = None
+            return None
 
-        return None
+        stats["hits"] += 1
+        if self.active_source != index:
+            self.active_source = index
+            self._last_reprobe = time.monotonic()
+        return temp
 
     def _get_libre_hardware_monitor_temperature(self) -> Optional[float]:
         """Get temperature using LibreHardwareMonitor DLL directly."""
-        if not self.computer:
+        if not self.computer or not self._display_sensors:
             return None
 
-        try:
-            self.methods_tried.append("LibreHardwareMonitor DLL")
-
-            # Update all hardware
-            for hardware in self.computer.Hardware:
-                hardware.Update()
-
-                # Look for CPU hardware
-                if str(hardware.HardwareType) == "Cpu":
-                    # Look for temperature sensors
-                    for sensor in hardware.Sensors:
-                        if (
-                            str(sensor.SensorType) == "Temperature"
-                            and sensor.Value is not None
-                        ):
-                            # Get the first valid CPU temperature
-                            # Usually Core temperatures or CPU Package temperature
-                            temp = float(sensor.Value)
-                            if 0 < temp < 150:  # Sanity check
-                                return temp
+        # Errors propagate to the source's circuit breaker, which logs them.
+        # Update only the hardware that owns the displayed sensors
+        self.lhm.update(self._update_targets)
+
+        if self._bound_metric is not None:
+            values = self._metric_array.values
+            for i, ref in enumerate(self._display_sensors):
+                value = ref.sensor.Value
+                values[i] = NAN if value is None else float(value)
+            temp = self._bound_metric.evaluate(values)
+            if temp is not None and 0 < temp < 150:  # Sanity check
+                return temp
+            return None
 
-        except Exception as e:
-            print(f"LibreHardwareMonitor DLL error: {e}")
+        for ref in self._display_sensors:
+            value = ref.sensor.Value
+            if value is not None:
+                # Pinned sensor, or the first valid CPU temperature
+                temp = float(value)
+                if 0 < temp < 150:  # Sanity check
+                    return temp
 
         return None
 
+    def _get_hwmon_temperature(self) -> Optional[float]:
+        """Get temperature from the Linux hwmon sensors."""
+        if not self.hwmon:
+            return None
+        return self.hwmon.read()
+
     def _get_psutil_temperature(self) -> Optional[float]:
         """Try to get temperature using psutil."""
         try:
-            temps = psutil.sensors_temperatures()
-            self.methods_tried.append("psutil")
+            temps = self._psutil.sensors_temperatures()
 
             # Look for CPU-related temperature sensors
             for name, entries in temps.items():
@@ -231,35 +641,29 @@ class CPUMonitor:
 
         return None
 
+    def _read_cimv2(self, wmi_class: str, prop: str) -> list:
+        """Read one projected property of a root\\cimv2 class."""
+        return self.wmi_reader.read(CIMV2_NAMESPACE, wmi_class, (prop,))
+
+    def _read_hardware_monitor_sensors(self, namespace: str) -> list:
+        """Read CPU temperature sensors from an OHM/LHM WMI namespace."""
+        sensors = self.wmi_reader.read(
+            namespace, "Sensor", ("Name", "Value"), HARDWARE_MONITOR_SENSOR_FILTER
+        )
+        return [
+            sensor
+            for sensor in sensors
+            if "cpu" in str(sensor["Name"]).lower()
+            or "core" in str(sensor["Name"]).lower()
+        ]
+
     def _get_hardware_monitor_temperature(self) -> Optional[float]:
         """Get temperature from OpenHardwareMonitor or LibreHardwareMonitor."""
-        # Try OpenHardwareMonitor
-        if hasattr(self, "ohm_connection") and self.ohm_connection:
-            try:
-                sensors = self.ohm_connection.query(
-                    "SELECT * FROM Sensor WHERE SensorType='Temperature' AND (Name LIKE '%CPU%' OR Name LIKE '%Core%')"
-                )
-                self.methods_tried.append("OpenHardwareMonitor")
-
-                for sensor in sensors:
-                    if hasattr(sensor, "Value") and sensor.Value:
-                        temp = float(sensor.Value)
-                        if 0 < temp < 150:
-                            return temp
-            except Exception:
-                pass
-
-        # Try LibreHardwareMonitor
-        if hasattr(self, "lhm_connection") and self.lhm_connection:
+        for namespace in self.hardware_monitor_namespaces:
             try:
-                sensors = self.lhm_connection.query(
-                    "SELECT * FROM Sensor WHERE SensorType='Temperature' AND (Name LIKE '%CPU%' OR Name LIKE '%Core%')"
-                )
-                self.methods_tried.append("LibreHardwareMonitor")
-
-                for sensor in sensors:
-                    if hasattr(sensor, "Value") and sensor.Value:
-                        temp = float(sensor.Value)
+                for sensor in self._read_hardware_monitor_sensors(namespace):
+                    if sensor["Value"]:
+                        temp = float(sensor["Value"])
                         if 0 < temp < 150:
                             return temp
             except Exception:
@@ -269,50 +673,31 @@ class CPUMonitor:
 
     def _get_thermal_zone_temperature(self) -> Optional[float]:
         """Get temperature from MSAcpi_ThermalZoneTemperature."""
-        try:
-            thermal_zones = self.wmi_connection.query(
-                "SELECT * FROM MSAcpi_ThermalZoneTemperature"
-            )
-            for zone in thermal_zones:
-                if hasattr(zone, "CurrentTemperature") and zone.CurrentTemperature:
-                    # Convert from tenths of Kelvin to Celsius
-                    temp_celsius = (zone.CurrentTemperature / 10.0) - 273.15
-                    if 0 < temp_celsius < 150:  # Sanity check
-                        return temp_celsius
-        except Exception as e:
-            pass  # Silently fail and try next method
-
-        return None
+        return self._read_kelvin_tenths(
+            "MSAcpi_ThermalZoneTemperature", "CurrentTemperature"
+        )
 
     def _get_temperature_probe(self) -> Optional[float]:
         """Get temperature from Win32_TemperatureProbe."""
-        try:
-            probes = self.wmi_connection.query("SELECT * FROM Win32_TemperatureProbe")
-            for probe in probes:
-                if hasattr(probe, "CurrentReading") and probe.CurrentReading:
-                    # Convert from tenths of Kelvin to Celsius
-                    temp_celsius = (probe.CurrentReading / 10.0) - 273.15
-                    if 0 < temp_celsius < 150:  # Sanity check
-                        return temp_celsius
-        except Exception as e:
-            pass  # Silently fail and try next method
-
-        return None
+        return self._read_kelvin_tenths("Win32_TemperatureProbe", "CurrentReading")
 
     def _get_performance_counter_temperature(self) -> Optional[float]:
         """Get temperature from performance counters."""
+        return self._read_kelvin_tenths(
+            "Win32_PerfRawData_Counters_ThermalZoneInformation", "Temperature"
+        )
+
+    def _read_kelvin_tenths(self, wmi_class: str, prop: str) -> Optional[float]:
+        """Read the first sane temperature reported in tenths of Kelvin."""
         try:
-            counters = self.wmi_connection.query(
-                "SELECT * FROM Win32_PerfRawData_Counters_ThermalZoneInformation"
-            )
-            for counter in counters:
-                if hasattr(counter, "Temperature") and counter.Temperature:
-                    # Convert from Kelvin to Celsius
-                    temp_celsius = (counter.Temperature / 10.0) - 273.15
+            for row in self._read_cimv2(wmi_class, prop):
+                if row[prop]:
+                    # Convert from tenths of Kelvin to Celsius
+                    temp_celsius = (row[prop] / 10.0) - 273.15
                     if 0 < temp_celsius < 150:  # Sanity check
                         return temp_celsius
-        except Exception as e:
-            pass  # Silently fail
+        except Exception:
+            pass  # Silently fail and try next method
 
         return None
 
@@ -320,25 +705,102 @@ class CPUMonitor:
         """Get information about the CPU monitoring method."""
         if self.computer:
             info = "CPU monitoring: LibreHardwareMonitor DLL (direct access)"
-        elif not self.wmi_connection:
+            if self._bound_metric is not None:
+                info += f" [metric: {self.metric.text}]"
+            elif self.sensor and len(self._display_sensors) == 1:
+                ref = self._display_sensors[0]
+                info += f" [sensor: {ref.name} {ref.identifier}]"
+        elif self.hwmon:
+            info = f"CPU monitoring: Linux hwmon ({', '.join(self.hwmon.chips)})"
+        elif not self.available_sources & set(SOURCE_PRIORITY[3:]):
             info = "CPU monitoring: Limited (WMI unavailable)"
         else:
             info = "CPU monitoring: WMI fallback methods"
 
-        if self.methods_tried:
+        if self.active_source is not None:
+            name = self._sources[self.active_source][0]
+            stats = self.source_stats[name]
+            info += (
+                f" (active source: {name}, "
+                f"hits: {stats['hits']}, misses: {stats['misses']})"
+            )
+        elif self.methods_tried:
             info += f" (last used: {', '.join(self.methods_tried)})"
 
+        tripped = [
+            name for name, breaker in self.breakers.items() if not breaker.closed
+        ]
+        if tripped:
+            info += f" [tripped: {', '.join(tripped)}]"
+
         return info
 
+    def configure_breakers(
+        self,
+        breaker_threshold: int,
+        breaker_backoff: float,
+        breaker_max_backoff: float,
+    ):
+        """Change the circuit breaker settings of every source in place."""
+        with self._lock:
+            self.breaker_threshold = breaker_threshold
+            self.breaker_backoff = breaker_backoff
+            self.breaker_max_backoff = breaker_max_backoff
+            for breaker in self.breakers.values():
+                breaker.failure_threshold = max(1, breaker_threshold)
+                breaker.backoff = breaker_backoff
+                breaker.max_backoff = breaker_max_backoff
+
+    def breaker_status(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state and trip count of each source."""
+        with self._lock:
+            return {name: breaker.status() for name, breaker in self.breakers.items()}
+
     def close(self):
         """Clean up resources."""
+        if self.hwmon:
+            self.hwmon.close()
+            self.hwmon = None
+
         if self.computer:
-            try:
-                self.computer.Close()
-            except Exception:
-                pass
+            # The shared Computer closes once its last user releases it
+            self.lhm.release("cpu")
             self.computer = None
+            self.sensor_index = {}
+            self._display_sensors = []
+            self._update_targets = []
+            self._snapshot_sensors = {}
+            self._metric_array = None
+            self._bound_metric = None
 
     def __del__(self):
         """Destructor to ensure cleanup."""
         self.close()
+
+
+def _owning_hardware(refs: List[LHMSensorRef]) -> list:
+    """Distinct hardware nodes owning the given sensors, in order."""
+    nodes = []
+    for ref in refs:
+        if not any(ref.hardware is node for node in nodes):
+            nodes.append(ref.hardware)
+    return nodes
+
+
+def _import_optional(name: str):
+    """Import an optional dependency on first use, or return None."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _compile_metric(text: Optional[str]) -> Optional[MetricExpression]:
+    """Compile a configured metric expression once, warning if it is invalid."""
+    if not text:
+        return None
+    try:
+        return MetricExpression(text)
+    except ValueError as e:
+        print(f"Warning: {e}, ignoring metric")
+        return None
@@ -0,0 +1,457 @@
+"""
+Monitoring engine shared by the command line monitor and the Windows service.
+Sources (the CPU and GPU monitors) are read on their own schedules, each on a
+dedicated executor thread so blocking hardware calls (WMI, pythonnet, NVML)
+never stall the event loop. On every display tick the latest readings pass
+through the transforms and are handed to the sinks (display, console,
+exporters).
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .adaptive import AdaptivePolling, temperature_polling
+from .breaker import CircuitBreaker
+from .sampler import LatestValueStore
+from .scheduler import TickScheduler
+from .snapshot import captured, validate_metrics
+
+
+class DaemonExecutor(concurrent.futures.Executor):
+    """Runs calls one at a time on a single daemon thread.
+
+    The thread is the same for every call, as per-thread state (WMI connections)
+    requires, and a read that never returns cannot hold up interpreter exit.
+    """
+
+    def __init__(self, name: str):
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._shutdown = False
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+
+    def submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+        if self._shutdown:
+            raise RuntimeError("cannot schedule new calls after shutdown")
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._queue.put((future, fn, args, kwargs))
+        if self._thread.ident is None:
+            self._thread.start()
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True, **kwargs):
+        if not self._shutdown:
+            self._shutdown = True
+            self._queue.put(None)
+        if wait and self._thread.ident is not None:
+            self._thread.join()
+
+
+class Source:
+    """A hardware source read on its own thread and schedule."""
+
+    def __init__(
+        self,
+        name: str,
+        read: Callable[[], Any],
+        interval: float,
+        adaptive: Optional[AdaptivePolling] = None,
+    ):
+        self.name = name
+        self.read = read
+        self.scheduler = TickScheduler(interval)
+        self.adaptive = adaptive  # picks the interval from the readings, if set
+        self.executor = DaemonExecutor(f"source-{name}")
+        self.reads = 0
+        self.errors = 0
+        self.last_duration = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Current polling interval in seconds."""
+        return self.scheduler.interval
+
+    @property
+    def max_age(self) -> float:
+        """Age after which a reading from this source counts as stale."""
+        return max(self.interval * 3, 3.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Read counts and timing in milliseconds."""
+        stats = {
+            "interval_ms": round(self.interval * 1000),
+            "reads": self.reads,
+            "errors": self.errors,
+            "last_duration_ms": round(self.last_duration * 1000, 3),
+        }
+        if self.adaptive is not None:
+            stats["adaptive"] = self.adaptive.stats()
+        return stats
+
+
+class Update:
+    """The latest reading of every source at one display tick."""
+
+    __slots__ = ("tick", "snapshots")
+
+    def __init__(self, tick: int, snapshots: Dict[str, Any]):
+        self.tick = tick
+        self.snapshots = snapshots
+
+    def get(self, name: str) -> Any:
+        """Latest non-stale snapshot of a source, or None."""
+        return self.snapshots.get(name)
+
+    def temperature(self, name: str) -> Optional[float]:
+        """Temperature of a source, or None."""
+        snapshot = self.snapshots.get(name)
+        return snapshot.temperature if snapshot is not None else None
+
+    def captured(self) -> Optional[float]:
+        """Wall-clock capture time of the oldest snapshot, for latency figures."""
+        return captured(*self.snapshots.values())
+
+
+Transform = Callable[[Update], Optional[Update]]
+
+
+class Sink:
+    """Receives every display update from the engine."""
+
+    name = "sink"
+    blocking = False  # run update() on the sink thread instead of the event loop
+
+    def update(self, update: Update):
+        raise NotImplementedError
+
+    def close(self):
+        """Called once when the engine stops."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MonitoringEngine:
+    """Reads sources, transforms the readings and feeds the sinks on one event loop.
+
+    run() blocks until stop() is called, from any thread or a signal handler;
+    the waits end immediately and the sinks are closed before it returns.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        policy: str = "skip",
+        breaker: Optional[CircuitBreaker] = None,
+        warmup: float = 0.0,
+        log: Callable[[str], None] = print,
+    ):
+        self.scheduler = TickScheduler(interval, policy)
+        self.breaker = breaker  # backs the display loop off while updates fail
+        self.warmup = warmup  # seconds to wait for the first readings
+        self.log = log
+        self.store = LatestValueStore()
+        self.sources: Dict[str, Source] = {}
+        self.transforms: List[Transform] = []
+        self.sinks: List[Sink] = []
+        self._sink_executor: Optional[DaemonExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._stop_requested = False
+        # Set with _stop, or when a source moves the next display update forward
+        self._wake: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Event] = None
+        # Time the last display update took to deliver, and the longest one
+        self.tick_duration = 0.0
+        self.tick_duration_max = 0.0
+
+    def add_source(
+        self,
+        name: str,
+        read: Callable[[], Any],
+        interval: float,
+        adaptive: Optional[AdaptivePolling] = None,
+    ) -> Source:
+        """Register a source polled every `interval` seconds, or as `adaptive` picks."""
+        source = Source(name, read, interval, adaptive)
+        self.sources[name] = source
+        return source
+
+    def add_transform(self, transform: Transform):
+        """Apply a transform to every update; returning None drops the update."""
+        self.transforms.append(transform)
+
+    def add_sink(self, sink: Sink):
+        """Hand every update to a sink, in the order the sinks were added."""
+        self.sinks.append(sink)
+
+    def sink(self, name: str) -> Optional[Sink]:
+        """The first sink with the given name."""
+        for sink in self.sinks:
+            if sink.name == name:
+                return sink
+        return None
+
+    def value(self, name: str) -> Any:
+        """Latest non-stale reading of a source."""
+        source = self.sources.get(name)
+        return self.store.value(name, source.max_age if source else None)
+
+    @property
+    def adaptive(self) -> bool:
+        """Whether any source adapts its polling interval."""
+        return any(source.adaptive is not None for source in self.sources.values())
+
+    def run(self):
+        """Run until stopped."""
+        asyncio.run(self._run())
+
+    def stop(self):
+        """End run(); safe to call from any thread, a signal handler or early."""
+        self._stop_requested = True
+        loop, stop, wake = self._loop, self._stop, self._wake
+        if loop is not None and stop is not None:
+            try:
+                loop.call_soon_threadsafe(stop.set)
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # the loop has already closed
+
+    def call(self, fn: Callable[[], Any]) -> concurrent.futures.Future:
+        """Run fn on the event loop, or right away when the engine is not running."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(run)
+                return future
+            except RuntimeError:
+                pass  # the loop has already closed
+        run()
+        return future
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._ready = asyncio.Event()
+        if self._stop_requested:
+            self._stop.set()
+        if any(sink.blocking for sink in self.sinks):
+            self._sink_executor = DaemonExecutor("engine-sinks")
+
+        tasks = [
+            asyncio.ensure_future(self._poll(source))
+            for source in self.sources.values()
+        ]
+        try:
+            if self.warmup > 0 and self.sources:
+                await self._wait(self._ready, self.warmup)
+                # Tick one read time behind the sources, so each update carries
+                # the readings taken for it rather than the previous ones
+                lag = max(source.last_duration for source in self.sources.values())
+                await self._wait(self._stop, lag)
+            await self._display_loop()
+        finally:
+            self._stop.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for source in self.sources.values():
+                source.executor.shutdown(wait=False)
+            await self._close_sinks()
+            self._loop = None
+
+    async def _wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for an event; whether it was set."""
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _tick(
+        self, scheduler: TickScheduler, wake: Optional[asyncio.Event] = None
+    ) -> bool:
+        """Wait for the scheduler's next tick; False once stopped.
+
+        Setting `wake` (which a stop also sets) makes the wait start over, for
+        a deadline that was moved meanwhile.
+        """
+        event = wake or self._stop
+        delay = scheduler.delay()
+        while delay > 0 and await self._wait(event, delay):
+            if self._stop.is_set():
+                return False
+            event.clear()
+            delay = scheduler.delay()
+        if self._stop.is_set():
+            return False
+        scheduler.tick()
+        return True
+
+    async def _poll(self, source: Source):
+        """Read a source on its schedule and publish the readings."""
+        while await self._tick(source.scheduler):
+            started = time.monotonic()
+            try:
+                value = await self._loop.run_in_executor(source.executor, source.read)
+            except Exception as e:
+                self.log(f"Warning: {source.name} source error: {e}")
+                source.errors += 1
+                value = None
+            source.reads += 1
+            source.last_duration = time.monotonic() - started
+            self.store.put(source.name, value, started)
+            if not self._ready.is_set() and all(
+                name in self.store.snapshot() for name in self.sources
+            ):
+                self._ready.set()
+            if source.adaptive is not None:
+                interval = source.adaptive.update(value, started)
+                source.scheduler.set_interval(interval)
+                # A source speeding up brings the next display update forward
+                # too, rather than leaving it up to a slow interval away
+                if interval < self.scheduler.interval:
+                    self.scheduler.set_interval(interval)
+                    self._wake.set()
+
+    async def _display_loop(self):
+        """Hand the latest readings to the sinks on every tick."""
+        while await self._tick(self.scheduler, self._wake):
+            started = time.monotonic()
+            try:
+                await self._publish()
+                if self.breaker is not None:
+                    self.breaker.success()
+            except Exception as e:
+                if self.breaker is None:
+                    raise
+                self.breaker.failure(e)
+                self._record_tick(started)
+                # Wait before retrying (a stop request ends the wait)
+                if await self._wait(self._stop, self.breaker.retry_in()):
+                    return
+                self.scheduler.reset()
+            else:
+                self._record_tick(started)
+
+            # Update the display as often as the fastest source is sampled
+            if self.adaptive:
+                self.scheduler.set_interval(
+                    min(source.interval for source in self.sources.values())
+                )
+
+    def _record_tick(self, started: float):
+        self.tick_duration = time.monotonic() - started
+        self.tick_duration_max = max(self.tick_duration_max, self.tick_duration)
+
+    async def _publish(self):
+        """Build this tick's update and deliver it to every sink."""
+        update: Optional[Update] = Update(
+            self.scheduler.ticks, {name: self.value(name) for name in self.sources}
+        )
+        for transform in self.transforms:
+            update = transform(update)
+            if update is None:
+                return
+
+        error: Optional[Exception] = None
+        for sink in self.sinks:
+            try:
+                if sink.blocking:
+                    await self._loop.run_in_executor(
+                        self._sink_executor, sink.update, update
+                    )
+                else:
+                    sink.update(update)
+            except Exception as e:
+                # The other sinks still get the update
+                error = error or e
+        if error is not None:
+            raise error
+
+    async def _close_sinks(self):
+        for sink in self.sinks:
+            try:
+                if sink.blocking:
+                    await self._loop.run_in_executor(self._sink_executor, sink.close)
+                else:
+                    sink.close()
+            except Exception as e:
+                self.log(f"Warning: Closing {sink.name} failed: {e}")
+        if self._sink_executor is not None:
+            self._sink_executor.shutdown(wait=False)
+            self._sink_executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Schedule, source and sink statistics."""
+        schedule = self.scheduler.stats()
+        schedule["tick_duration_ms"] = round(self.tick_duration * 1000, 3)
+        schedule["tick_duration_max_ms"] = round(self.tick_duration_max * 1000, 3)
+        return {
+            "schedule": schedule,
+            "sources": {name: source.stats() for name, source in self.sources.items()},
+            "sinks": {sink.name: sink.stats() for sink in self.sinks},
+        }
+
+
+def monitoring_engine(
+    config, cpu_monitor, gpu_monitor, log: Callable[[str], None] = print
+) -> MonitoringEngine:
+    """The engine both hosts run: CPU and GPU sources on the configured schedule."""
+    polling_interval = config.polling_interval / 1000.0
+    engine = MonitoringEngine(
+        polling_interval,
+        config.overrun_policy,
+        # Back off exponentially while the loop keeps failing, logging only
+        # when it starts failing and when it recovers
+        breaker=CircuitBreaker(
+            "Monitoring loop",
+            failure_threshold=1,
+            backoff=config.breaker_backoff / 1000.0,
+            max_backoff=config.breaker_max_backoff / 1000.0,
+            log=log,
+        ),
+        warmup=polling_interval,
+        log=log,
+    )
+
+    # Each sample is one snapshot shared by the display and the console log
+    metrics = validate_metrics(config.snapshot_metrics)
+    for name, monitor in (("cpu", cpu_monitor), ("gpu", gpu_monitor)):
+        engine.add_source(
+            name,
+            functools.partial(monitor.get_snapshot, metrics),
+            config.sample_interval(name) / 1000.0,
+            adaptive=temperature_polling(config.adaptive_options(name)),
+        )
+    return engine
@@ -0,0 +1,339 @@
+"""
+Prometheus metrics endpoint.
+The exposition text is rendered on every display update from what the engine
+already collected (the latest readings and the loop, source and display
+statistics) and served as-is, so a scrape never touches the hardware.
+"""
+
+import concurrent.futures
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .engine import MonitoringEngine, Sink, Update
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "afpro_"
+
+# Snapshot metrics in Prometheus base units: name suffix and scale
+SNAPSHOT_METRICS = {
+    "temperature": ("temperature_celsius", 1.0, "Latest temperature reading"),
+    "load": ("load_ratio", 0.01, "Latest load reading (0-1)"),
+    "clock": ("clock_hertz", 1e6, "Latest clock speed reading"),
+    "power": ("power_watts", 1.0, "Latest power draw reading"),
+}
+
+Samples = Iterable[Tuple[Dict[str, str], Optional[float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Exposition:
+    """Builds Prometheus text exposition, skipping samples without a value."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def add(self, name: str, kind: str, help_text: str, samples: Samples):
+        rendered = []
+        for labels, value in samples:
+            if value is None:
+                continue
+            label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+            label_text = f"{{{label_text}}}" if label_text else ""
+            rendered.append(f"{PREFIX}{name}{label_text} {_format(value)}")
+        if rendered:
+            self.lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            self.lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            self.lines.extend(rendered)
+
+    def gauge(self, name: str, help_text: str, value: Optional[float], **labels):
+        self.add(name, "gauge", help_text, [(labels, value)])
+
+    def counter(self, name: str, help_text: str, value: Optional[float], **labels):
+        self.add(name, "counter", help_text, [(labels, value)])
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _seconds(milliseconds: Optional[float]) -> Optional[float]:
+    return None if milliseconds is None else round(milliseconds / 1000.0, 6)
+
+
+class MetricsExporter(Sink):
+    """Serves the engine's latest readings and health metrics over HTTP.
+
+    `breakers` maps a source name to a callable returning its monitor's
+    breaker_status(); it is called on the source's own thread, between reads,
+    since the monitors hold their lock while reading the hardware.
+    """
+
+    name = "exporter"
+
+    def __init__(
+        self,
+        engine: MonitoringEngine,
+        host: str = "127.0.0.1",
+        port: int = 9184,
+        breakers: Optional[Dict[str, Callable[[], Dict[str, Dict[str, Any]]]]] = None,
+        log: Callable[[str], None] = print,
+    ):
+        self.engine = engine
+        self.breakers = breakers or {}
+        self.log = log
+        self.scrapes = 0
+        self._failing = False
+        self._breaker_status: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._body = self.render(None)
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter._body
+                exporter.scrapes += 1
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # one line per scrape would flood the log
+
+        # Raises OSError when the port is taken
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="exporter", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The address the endpoint listens on."""
+        return self.server.server_address[:2]
+
+    def update(self, update: Update):
+        # A rendering problem must not hold up the display; scrapes keep
+        # getting the last good text
+        try:
+            self._refresh_breakers()
+            self._body = self.render(update)
+        except Exception as e:
+            if not self._failing:
+                self.log(f"Warning: Rendering metrics failed: {e}")
+            self._failing = True
+        else:
+            self._failing = False
+
+    def _refresh_breakers(self):
+        """Collect breaker states on the source threads, one request at a time."""
+        for name, status in self.breakers.items():
+            source = self.engine.sources.get(name)
+            pending = self._pending.get(name)
+            if source is None or (pending is not None and not pending.done()):
+                continue
+            try:
+                future = source.executor.submit(status)
+            except RuntimeError:
+                continue  # the engine is shutting down
+            future.add_done_callback(
+                lambda future, name=name: self._collect_breakers(name, future)
+            )
+            self._pending[name] = future
+
+    def _collect_breakers(self, name: str, future: concurrent.futures.Future):
+        if not future.cancelled() and future.exception() is None:
+            self._breaker_status[name] = future.result()
+
+    def render(self, update: Optional[Update]) -> bytes:
+        """Exposition text for an update and the current engine statistics."""
+        out = _Exposition()
+        stats = self.engine.stats()
+
+        # Latest readings
+        snapshots = update.snapshots if update is not None else {}
+        for metric, (suffix, scale, help_text) in SNAPSHOT_METRICS.items():
+            samples = []
+            for source, snapshot in snapshots.items():
+                value = snapshot.get(metric) if snapshot is not None else None
+                samples.append(
+                    ({"source": source}, None if value is None else value * scale)
+                )
+            out.add(suffix, "gauge", help_text, samples)
+        out.add(
+            "reading_timestamp_seconds",
+            "gauge",
+            "Unix time of the latest reading",
+            [
+                ({"source": source}, getattr(snapshot, "timestamp", None))
+                for source, snapshot in snapshots.items()
+            ],
+        )
+
+        # Sources
+        sources = stats["sources"]
+        for name, key, kind, help_text, scale in (
+            ("source_reads_total", "reads", "counter", "Source reads", 1),
+            ("source_errors_total", "errors", "counter", "Failed source reads", 1),
+            (
+                "source_read_duration_seconds",
+                "last_duration_ms",
+                "gauge",
+                "Duration of the last source read",
+                0.001,
+            ),
+            (
+                "source_interval_seconds",
+                "interval_ms",
+                "gauge",
+                "Current source polling interval",
+                0.001,
+            ),
+        ):
+            out.add(
+                name,
+                kind,
+                help_text,
+                [({"source": s}, v[key] * scale) for s, v in sources.items()],
+            )
+
+        # Display loop
+        schedule = stats["schedule"]
+        out.counter("ticks_total", "Display updates", schedule["ticks"])
+        out.counter(
+            "ticks_missed_total", "Display updates skipped", schedule["missed"]
+        )
+        out.counter(
+            "overruns_total", "Times the loop fell behind", schedule["overruns"]
+        )
+        out.gauge(
+            "tick_interval_seconds",
+            "Display update interval",
+            _seconds(schedule["interval_ms"]),
+        )
+        out.gauge(
+            "tick_duration_seconds",
+            "Duration of the last display update",
+            _seconds(schedule["tick_duration_ms"]),
+        )
+        out.gauge(
+            "tick_duration_max_seconds",
+            "Longest display update",
+            _seconds(schedule["tick_duration_max_ms"]),
+        )
+        out.gauge(
+            "tick_lateness_seconds",
+            "Lateness of the last display update",
+            _seconds(schedule["jitter_last_ms"]),
+        )
+
+        # Circuit breakers
+        breakers = []
+        loop_breaker = self.engine.breaker
+        if loop_breaker is not None:
+            breakers.append(("loop", loop_breaker.name, loop_breaker.status()))
+        for source, statuses in list(self._breaker_status.items()):
+            for name, status in statuses.items():
+                breakers.append((source, name, status))
+        out.add(
+            "breaker_closed",
+            "gauge",
+            "Whether a circuit breaker lets calls through (0 while tripped)",
+            [
+                ({"source": s, "breaker": n}, float(status["state"] == "closed"))
+                for s, n, status in breakers
+            ],
+        )
+        out.add(
+            "breaker_trips_total",
+            "counter",
+            "Times a circuit breaker tripped",
+            [
+                ({"source": s, "breaker": n}, status["trips"])
+                for s, n, status in breakers
+            ],
+        )
+
+        # Display
+        display = stats["sinks"].get("display")
+        if display is not None:
+            self._render_display(out, display)
+        return out.text().encode("utf-8")
+
+    def _render_display(self, out: _Exposition, display: Dict[str, Any]):
+        sink = self.engine.sink("display")
+        connected = getattr(getattr(sink, "device", None), "connected", None)
+        out.gauge(
+            "display_connected",
+            "Whether the display is connected",
+            None if connected is None else float(connected),
+        )
+        for name, key, help_text in (
+            ("display_frames_sent_total", "sent", "Frames written to the display"),
+            (
+                "display_frames_suppressed_total",
+                "suppressed",
+                "Frames skipped as unchanged",
+            ),
+            ("display_frames_dropped_total", "dropped", "Stale frames dropped"),
+            ("display_connects_total", "connects", "Display connections"),
+            ("display_disconnects_total", "disconnects", "Display disconnections"),
+            ("display_write_errors_total", "failed_writes", "Failed display writes"),
+        ):
+            out.counter(name, help_text, display.get(key))
+
+        latency = display.get("latency")
+        if latency:
+            out.counter(
+                "display_write_timeouts_total",
+                "Display writes that timed out",
+                latency["timeouts"],
+            )
+            out.add(
+                "display_write_latency_seconds",
+                "gauge",
+                "Display write duration",
+                [
+                    ({"stat": stat}, _seconds(latency[f"{stat}_ms"]))
+                    for stat in ("last", "mean", "max")
+                ],
+            )
+        sensor_latency = display.get("sensor_latency")
+        if sensor_latency and sensor_latency["count"]:
+            out.add(
+                "display_sensor_latency_seconds",
+                "gauge",
+                "Time from sensor read to frame decoded by the virtual display",
+                [
+                    ({"stat": stat}, _seconds(sensor_latency[f"{stat}_ms"]))
+                    for stat in ("mean", "p50", "p95", "max")
+                ],
+            )
+
+    def close(self):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        host, port = self.address
+        return {"address": f"{host}:{port}", "scrapes": self.scrapes}
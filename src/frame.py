@@ -0,0 +1,217 @@
+"""
+Frame encoding for the Antec Flux Pro display protocol.
+
+A frame is 12 bytes: the header 55 AA 01 01 06, the CPU and GPU temperatures
+as three digits each (tens, ones, tenths; 238/238/238 when there is no data)
+and a checksum byte holding the sum of the preceding bytes modulo 256.
+"""
+
+import time
+from typing import Callable, List, Optional, Tuple
+
+HEADER = bytes([85, 170, 1, 1, 6])
+FRAME_SIZE = 12
+NO_DATA = (238, 238, 238)
+
+CPU_OFFSET = len(HEADER)
+GPU_OFFSET = CPU_OFFSET + 3
+CHECKSUM_OFFSET = FRAME_SIZE - 1
+
+# Lookup table indexed by tenths of a degree over 0.0-99.9 °C; the extra last
+# entry holds the no-data marker
+LUT_SIZE = 1000
+NO_DATA_KEY = LUT_SIZE
+
+_HEADER_SUM = sum(HEADER)
+_DIGITS: List[bytes] = [
+    bytes((i // 100, i // 10 % 10, i % 10)) for i in range(LUT_SIZE)
+]
+_DIGITS.append(bytes(NO_DATA))
+_SUMS: List[int] = [sum(digits) for digits in _DIGITS]
+
+
+def encode_temperature(temp: Optional[float]) -> bytes:
+    """Encode one temperature with the protocol's digit arithmetic."""
+    if temp is None:
+        return bytes(NO_DATA)
+
+    ones = int(temp / 10.0)
+    tens = int(temp % 10.0)
+    tenths = int((temp * 10.0) % 10.0)
+
+    return bytes([ones, tens, tenths])
+
+
+def decode_temperature(digits) -> Optional[float]:
+    """Decode a digit triplet; None for the no-data marker."""
+    if tuple(digits) == NO_DATA:
+        return None
+    return digits[0] * 10 + digits[1] + digits[2] / 10.0
+
+
+def checksum(data) -> int:
+    """Checksum byte for the bytes preceding it."""
+    return sum(data) & 0xFF
+
+
+class FrameEncoder:
+    """
+    Encodes temperatures into one preallocated frame buffer.
+
+    Temperatures in the lookup table range are encoded by index, and the
+    checksum is kept from the per-slot digit sums, so an encode touches only
+    the slots whose value changed. encode() returns a memoryview of the shared
+    buffer, which is overwritten by the next call.
+    """
+
+    __slots__ = ("_frame", "_view", "_keys", "_sums")
+
+    def __init__(self):
+        self._frame = bytearray(FRAME_SIZE)
+        self._frame[:CPU_OFFSET] = HEADER
+        self._view = memoryview(self._frame)
+        self._keys: List[Optional[int]] = [None, None]
+        self._sums = [0, 0]
+
+    def encode(
+        self, cpu_temp: Optional[float], gpu_temp: Optional[float]
+    ) -> memoryview:
+        """Fill the frame for a CPU/GPU temperature pair."""
+        # Inlined: this runs for every frame sent to the display
+        if cpu_temp is None:
+            cpu_key = NO_DATA_KEY
+        elif 0.0 <= cpu_temp < 100.0:
+            cpu_key = int(cpu_temp * 10.0)
+        else:
+            cpu_key = None
+        if gpu_temp is None:
+            gpu_key = NO_DATA_KEY
+        elif 0.0 <= gpu_temp < 100.0:
+            gpu_key = int(gpu_temp * 10.0)
+        else:
+            gpu_key = None
+
+        keys = self._keys
+        if (
+            cpu_key == keys[0]
+            and gpu_key == keys[1]
+            and cpu_key is not None
+            and gpu_key is not None
+        ):
+            return self._view
+
+        frame = self._frame
+        sums = self._sums
+        if cpu_key is None:
+            sums[0] = self._put_uncached(CPU_OFFSET, cpu_temp)
+        elif cpu_key != keys[0]:
+            frame[CPU_OFFSET:GPU_OFFSET] = _DIGITS[cpu_key]
+            sums[0] = _SUMS[cpu_key]
+        if gpu_key is None:
+            sums[1] = self._put_uncached(GPU_OFFSET, gpu_temp)
+        elif gpu_key != keys[1]:
+            frame[GPU_OFFSET:CHECKSUM_OFFSET] = _DIGITS[gpu_key]
+            sums[1] = _SUMS[gpu_key]
+        keys[0] = cpu_key
+        keys[1] = gpu_key
+        frame[CHECKSUM_OFFSET] = (_HEADER_SUM + sums[0] + sums[1]) & 0xFF
+        return self._view
+
+    def _put_uncached(self, offset: int, temp: float) -> int:
+        """Encode a temperature outside the lookup table; returns its digit sum."""
+        digits = encode_temperature(temp)
+        self._frame[offset : offset + 3] = digits
+        return sum(digits)
+
+    def frame(self) -> bytes:
+        """A copy of the current frame."""
+        return bytes(self._frame)
+
+
+class ChangeFilter:
+    """
+    Decides which frames a display sink has to write.
+
+    A frame is suppressed when it is byte-identical to the last frame sent, or
+    when both temperatures are within `hysteresis` degrees of the values last
+    sent. The display is still refreshed every `keepalive` seconds; a keepalive
+    of 0 sends every frame.
+    """
+
+    def __init__(
+        self,
+        hysteresis: float = 0.0,
+        keepalive: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.hysteresis = max(0.0, hysteresis)
+        self.keepalive = keepalive
+        self.clock = clock
+        self.sent = 0
+        self.suppressed = 0
+        self.keepalives = 0  # frames sent only because the keepalive was due
+        self._last_frame = bytearray(FRAME_SIZE)
+        self._last_temps: Tuple[Optional[float], Optional[float]] = (None, None)
+        self._sent_at: Optional[float] = None
+
+    def should_send(
+        self, cpu_temp: Optional[float], gpu_temp: Optional[float], frame
+    ) -> bool:
+        """Whether the encoded frame for these temperatures needs writing."""
+        if self.keepalive <= 0 or self._sent_at is None:
+            return True
+
+        if frame == self._last_frame or (
+            self.hysteresis > 0
+            and _within(cpu_temp, self._last_temps[0], self.hysteresis)
+            and _within(gpu_temp, self._last_temps[1], self.hysteresis)
+        ):
+            if self.clock() - self._sent_at < self.keepalive:
+                self.suppressed += 1
+                return False
+            self.keepalives += 1
+        return True
+
+    def record(self, cpu_temp: Optional[float], gpu_temp: Optional[float], frame):
+        """Note a frame as written to the display."""
+        self._last_frame[:] = frame
+        self._last_temps = (cpu_temp, gpu_temp)
+        self._sent_at = self.clock()
+        self.sent += 1
+
+    def reset(self):
+        """Forget the last frame, so the next one is always sent."""
+        self._sent_at = None
+
+    def stats(self) -> dict:
+        """Frame counters."""
+        return {
+            "sent": self.sent,
+            "suppressed": self.suppressed,
+            "keepalives": self.keepalives,
+        }
+
+
+def _within(value: Optional[float], last: Optional[float], tolerance: float) -> bool:
+    """True if value is within tolerance of last (both missing counts as equal)."""
+    if value is None or last is None:
+        return value is None and last is None
+    # Slack for float error, so 60.2 vs 60.0 counts as a 0.2 step
+    return abs(value - last) <= tolerance + 1e-9
+
+
+def decode_frame(frame) -> Tuple[Optional[float], Optional[float]]:
+    """Decode a frame into (cpu, gpu), validating its header and checksum."""
+    if len(frame) != FRAME_SIZE:
+        raise ValueError(f"Frame must be {FRAME_SIZE} bytes, got {len(frame)}")
+    if bytes(frame[:CPU_OFFSET]) != HEADER:
+        raise ValueError(f"Bad frame header: {bytes(frame[:CPU_OFFSET]).hex()}")
+    expected = checksum(frame[:CHECKSUM_OFFSET])
+    if frame[CHECKSUM_OFFSET] != expected:
+        raise ValueError(
+            f"Bad frame checksum: {frame[CHECKSUM_OFFSET]:02x} != {expected:02x}"
+        )
+    return (
+        decode_temperature(frame[CPU_OFFSET:GPU_OFFSET]),
+        decode_temperature(frame[GPU_OFFSET:CHECKSUM_OFFSET]),
+    )
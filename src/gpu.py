@@ -1,27 +1,165 @@
 """
 GPU temperature monitoring for Windows.
-Supports NVIDIA GPUs via pynvml (Python bindings for NVML).
+Supports NVIDIA GPUs via pynvml (Python bindings for NVML), AMD/Intel GPUs
+through the shared LibreHardwareMonitor session, and AMD/nouveau GPUs through
+hwmon on Linux.
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
 import os
+import sys
+
+from .breaker import CircuitBreaker
+from .metrics import NAN, BoundMetric, MetricArray, MetricExpression
+from .snapshot import HardwareSnapshot, validate_metrics
+
+# Shorthands accepted for gpu_metric
+GPU_METRIC_ALIASES = {
+    "hottest": "max(gpu*)",
+    "coolest": "min(gpu*)",
+    "mean": "mean(gpu*)",
+}
+
+NVML_ERROR_GPU_IS_LOST = 15
 
 
 class GPUMonitor:
     """Monitor GPU temperature on Windows systems."""
 
-    def __init__(self, device: Optional[str] = None):
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        metric: Optional[str] = None,
+        sysfs_root: str = "/sys",
+        select: Optional[Sequence[Union[int, str]]] = None,
+        breaker_threshold: int = 3,
+        breaker_backoff: float = 2.0,
+        breaker_max_backoff: float = 60.0,
+        lhm_session=None,
+    ):
         self.device = device or "auto"
+        self.metric = GPU_METRIC_ALIASES.get(str(metric).lower(), metric)
+        self.sysfs_root = sysfs_root
+        self.select = list(select) if select else []
+        self.lhm = lhm_session
+        self._lhm_acquired = False
         self.nvidia_gpu = None
+        self.nvidia_gpus: List[NvidiaGPU] = []
+        self.gpus: list = []
+        self.breakers: List[CircuitBreaker] = []
+        self._breaker_options = (
+            breaker_threshold,
+            breaker_backoff,
+            breaker_max_backoff,
+        )
+        self._metric_array: Optional[MetricArray] = None
+        self._bound_metric: Optional[BoundMetric] = None
         self._initialize()
 
     def _initialize(self):
         """Initialize GPU monitoring."""
         if self.device == "auto" or self.device == "nvidia":
-            self.nvidia_gpu = self._init_nvidia()
+            self.nvidia_gpus = self._init_nvidia()
+        self.gpus = list(self.nvidia_gpus)
+
+        # AMD/Intel GPUs (and NVIDIA ones with device "lhm") through the LHM
+        # session the CPU monitor already opened
+        if self.device in ("auto", "lhm"):
+            self.gpus.extend(self._init_lhm())
+
+        # AMD/nouveau cards expose their temperatures through hwmon on Linux
+        linux_auto = self.device == "auto" and sys.platform.startswith("linux")
+        if linux_auto or self.device == "hwmon":
+            from .hwmon import discover_gpus
+
+            self.gpus.extend(discover_gpus(self.sysfs_root, len(self.gpus)))
+
+        if self.select:
+            self._apply_selection()
+        self.nvidia_gpu = next(
+            (gpu for gpu in self.gpus if isinstance(gpu, NvidiaGPU)), None
+        )
+        # One breaker per GPU; NVIDIA devices re-resolve their handle on retry
+        self.breakers = [
+            CircuitBreaker(
+                f"GPU {gpu.device_index} ({gpu.name})",
+                *self._breaker_options,
+                reinit=getattr(gpu, "reconnect", None),
+            )
+            for gpu in self.gpus
+        ]
+        self._bind_metric()
+
+    def _init_lhm(self) -> list:
+        """Enumerate GPUs from the shared LibreHardwareMonitor session."""
+        from .lhm import GPU_HARDWARE_TYPES, discover_gpus, shared_session
+
+        if self.lhm is None:
+            self.lhm = shared_session()
+        if self.device == "auto" and not self.lhm.available():
+            return []  # Optional in auto mode, so no warning
+        if not self.lhm.acquire("gpu"):
+            return []
+
+        if self.device == "lhm":
+            hardware_types = GPU_HARDWARE_TYPES
+        else:
+            hardware_types = ("GpuAmd", "GpuIntel")  # NVIDIA is read through NVML
+        gpus = discover_gpus(self.lhm, hardware_types, len(self.gpus))
+        if gpus:
+            self._lhm_acquired = True
+        else:
+            self.lhm.release("gpu")
+        return gpus
+
+    def _apply_selection(self):
+        """Keep only the configured GPUs (by index, UUID or PCI bus ID), in order."""
+        selected = []
+        for selector in self.select:
+            matches = [gpu for gpu in self.gpus if _gpu_matches(gpu, selector)]
+            if not matches:
+                print(f"Warning: GPU '{selector}' not found")
+            for gpu in matches:
+                if gpu not in selected:
+                    selected.append(gpu)
+
+        if not selected:
+            print("Warning: No configured GPU found, monitoring all GPUs")
+            return
+        for gpu in self.gpus:
+            if gpu not in selected and hasattr(gpu, "close"):
+                gpu.close()
+        self.gpus = selected
+
+        # The LHM session stays open only while a selected GPU reads through it
+        if self._lhm_acquired and not any(
+            getattr(gpu, "session", None) is self.lhm for gpu in selected
+        ):
+            self.lhm.release("gpu")
+            self._lhm_acquired = False
 
-    def _init_nvidia(self) -> Optional["NvidiaGPU"]:
-        """Initialize NVIDIA GPU monitoring."""
+    def _bind_metric(self):
+        """Compile the metric expression once against the GPU layout (gpu0, ...)."""
+        if not self.metric or not self.gpus:
+            return
+        try:
+            expression = MetricExpression(self.metric)
+        except ValueError as e:
+            print(f"Warning: {e}, ignoring metric")
+            return
+
+        labels = [f"GPU {gpu.device_index}" for gpu in self.gpus]
+        self._metric_array = MetricArray(labels)
+        self._bound_metric = self._metric_array.bind(expression)
+        if not self._bound_metric:
+            print(
+                f"Warning: GPU metric '{self.metric}' matches no GPUs "
+                f"(available: {', '.join(self._metric_array.names)})"
+            )
+            self._bound_metric = None
+
+    def _init_nvidia(self) -> List["NvidiaGPU"]:
+        """Initialize NVIDIA GPU monitoring, caching a handle for every device."""
         try:
             import pynvml
 
@@ -29,62 +167,230 @@ class GPUMonitor:
 
             device_count = pynvml.nvmlDeviceGetCount()
             if device_count > 0:
-                return NvidiaGPU(pynvml)
+                return [NvidiaGPU(pynvml, index) for index in range(device_count)]
             else:
                 print("No NVIDIA GPUs found")
-                return None
+                return []
 
         except ImportError:
             print("Warning: pynvml not available. Install with: pip install pynvml")
-            return None
+            return []
         except Exception as e:
             print(f"Warning: Failed to initialize NVIDIA GPU monitoring: {e}")
-            return None
+            return []
+
+    def _read(self, index: int) -> Optional[float]:
+        """Read one GPU through its circuit breaker."""
+        return self.breakers[index].call(self.gpus[index].read_temperature)
 
     def get_temperature(self) -> Optional[float]:
         """Get current GPU temperature in Celsius."""
-        if self.nvidia_gpu:
-            return self.nvidia_gpu.get_temperature()
+        if self._bound_metric is not None:
+            # Only the GPUs the metric selects are read
+            values = self._metric_array.values
+            for i in self._bound_metric.indices:
+                temp = self._read(i)
+                values[i] = NAN if temp is None else temp
+            return self._bound_metric.evaluate(values)
+
+        if self.gpus:
+            return self._read(0)
 
         return None
 
+    def get_snapshot(self, metrics=("temperature",)) -> HardwareSnapshot:
+        """Read the requested metrics in one pass over the GPUs."""
+        metrics = validate_metrics(metrics)
+        snapshot = HardwareSnapshot()
+        snapshot.temperature = self.get_temperature()
+        if self.gpus and self.breakers[0].closed:
+            # Load, clock and power describe the primary GPU
+            for metric in metrics:
+                if metric != "temperature":
+                    snapshot.set(metric, self.gpus[0].read_metric(metric))
+        return snapshot
+
     def get_info(self) -> str:
         """Get information about the GPU monitoring method."""
-        if self.nvidia_gpu:
-            return f"GPU monitoring: NVIDIA (pynvml)"
+        if not self.gpus:
+            return "GPU monitoring: No compatible GPU found"
+
+        backends = dict.fromkeys(gpu.backend for gpu in self.gpus)
+        info = f"GPU monitoring: {', '.join(backends)}"
+        if len(self.gpus) > 1 or not self.nvidia_gpu:
+            names = [f"gpu{gpu.device_index}: {gpu.name}" for gpu in self.gpus]
+            info += f" [{', '.join(names)}]"
+        if self._bound_metric is not None:
+            info += f" [metric: {self.metric}]"
+        tripped = [breaker.name for breaker in self.breakers if not breaker.closed]
+        if tripped:
+            info += f" [tripped: {', '.join(tripped)}]"
+        return info
+
+    def configure_breakers(
+        self,
+        breaker_threshold: int,
+        breaker_backoff: float,
+        breaker_max_backoff: float,
+    ):
+        """Change the circuit breaker settings of every GPU in place."""
+        self._breaker_options = (
+            breaker_threshold,
+            breaker_backoff,
+            breaker_max_backoff,
+        )
+        for breaker in self.breakers:
+            breaker.failure_threshold = max(1, breaker_threshold)
+            breaker.backoff = breaker_backoff
+            breaker.max_backoff = breaker_max_backoff
+
+    def breaker_status(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state and trip count of each GPU."""
+        return {breaker.name: breaker.status() for breaker in self.breakers}
+
+    def close(self):
+        """Release GPU resources."""
+        for gpu in self.gpus:
+            if hasattr(gpu, "close"):
+                gpu.close()
+        self.gpus = []
+        self.breakers = []
+        self.nvidia_gpus = []
+        self.nvidia_gpu = None
+        if self._lhm_acquired:
+            self.lhm.release("gpu")
+            self._lhm_acquired = False
 
-        return "GPU monitoring: No compatible GPU found"
+
+def _gpu_matches(gpu, selector: Union[int, str]) -> bool:
+    """Check whether a configured selector (index, UUID, PCI bus ID) names a GPU."""
+    selector = str(selector).strip().lower()
+    if selector.isdigit():
+        return int(selector) == gpu.device_index
+    uuid = getattr(gpu, "uuid", None)
+    if uuid and selector == uuid.lower():
+        return True
+    pci_bus_id = getattr(gpu, "pci_bus_id", None)
+    return bool(pci_bus_id) and _short_bus_id(selector) == _short_bus_id(pci_bus_id)
+
+
+def _short_bus_id(bus_id: str) -> str:
+    """Bus ID without its PCI domain ("00000000:01:00.0" -> "01:00.0")."""
+    return ":".join(bus_id.lower().split(":")[-2:])
+
+
+def _text(value) -> str:
+    """Decode NVML strings, which are bytes in older pynvml releases."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
 
 
 class NvidiaGPU:
     """NVIDIA GPU temperature monitoring using pynvml."""
 
+    backend = "NVIDIA (pynvml)"
+
     def __init__(self, pynvml_module, device_index: int = 0):
         self.pynvml = pynvml_module
         self.device_index = device_index
+        self.uuid: Optional[str] = None
+        self.pci_bus_id: Optional[str] = None
 
         try:
             self.handle = self.pynvml.nvmlDeviceGetHandleByIndex(device_index)
             # Get device name for info - handle both bytes and string returns
-            name_result = self.pynvml.nvmlDeviceGetName(self.handle)
-            if isinstance(name_result, bytes):
-                self.name = name_result.decode("utf-8")
-            else:
-                self.name = str(name_result)
+            self.name = _text(self.pynvml.nvmlDeviceGetName(self.handle))
         except Exception as e:
             print(f"Warning: Failed to get NVIDIA GPU handle: {e}")
             self.handle = None
             self.name = "Unknown NVIDIA GPU"
+            return
 
-    def get_temperature(self) -> Optional[float]:
-        """Get GPU temperature in Celsius."""
+        # Stable identities, used for selection and to find the device again
+        try:
+            self.uuid = _text(self.pynvml.nvmlDeviceGetUUID(self.handle))
+            pci_info = self.pynvml.nvmlDeviceGetPciInfo(self.handle)
+            self.pci_bus_id = _text(pci_info.busId)
+        except Exception:
+            pass
+
+    def reconnect(self) -> bool:
+        """Re-resolve the device handle by UUID (falling back to index).
+
+        Handles do not survive a driver reset, so NVML is initialized again
+        when the lookup fails; the devices are then enumerated anew, as the
+        GPU may have come back under another index.
+        """
+        for attempt in range(2):
+            try:
+                if self.uuid:
+                    try:
+                        handle = self.pynvml.nvmlDeviceGetHandleByUUID(self.uuid)
+                    except Exception:
+                        handle = self._find_by_uuid()
+                else:
+                    handle = self.pynvml.nvmlDeviceGetHandleByIndex(self.device_index)
+                self.handle = handle
+                return True
+            except Exception:
+                if attempt == 0:
+                    try:
+                        self.pynvml.nvmlInit()
+                    except Exception:
+                        break
+        self.handle = None
+        return False
+
+    def _find_by_uuid(self):
+        """Look for this GPU's UUID among the devices NVML counts now."""
+        for index in range(self.pynvml.nvmlDeviceGetCount()):
+            try:
+                handle = self.pynvml.nvmlDeviceGetHandleByIndex(index)
+                if _text(self.pynvml.nvmlDeviceGetUUID(handle)) == self.uuid:
+                    return handle
+            except Exception:
+                continue  # another device that is missing or resetting
+        raise LookupError(f"GPU {self.uuid} not found")
+
+    def read_temperature(self) -> Optional[float]:
+        """Read the GPU temperature in Celsius, raising NVML errors."""
         if not self.handle:
             return None
 
         try:
             # NVML_TEMPERATURE_GPU = 0
-            temp = self.pynvml.nvmlDeviceGetTemperature(self.handle, 0)
-            return float(temp)
+            return float(self.pynvml.nvmlDeviceGetTemperature(self.handle, 0))
+        except Exception as e:
+            if getattr(e, "value", None) == NVML_ERROR_GPU_IS_LOST:
+                self.handle = None  # re-resolved by reconnect()
+            raise
+
+    def get_temperature(self) -> Optional[float]:
+        """Get GPU temperature in Celsius."""
+        try:
+            return self.read_temperature()
         except Exception as e:
             print(f"Error getting GPU temperature: {e}")
             return None
+
+    def read_metric(self, metric: str) -> Optional[float]:
+        """Read one snapshot metric (temperature, load, clock or power)."""
+        if metric == "temperature":
+            return self.get_temperature()
+        if not self.handle:
+            return None
+
+        try:
+            if metric == "load":
+                return float(self.pynvml.nvmlDeviceGetUtilizationRates(self.handle).gpu)
+            if metric == "clock":
+                # NVML_CLOCK_GRAPHICS = 0
+                return float(self.pynvml.nvmlDeviceGetClockInfo(self.handle, 0))
+            if metric == "power":
+                # NVML reports milliwatts
+                return self.pynvml.nvmlDeviceGetPowerUsage(self.handle) / 1000.0
+        except Exception:
+            pass  # Not supported on every board
+
+        return None
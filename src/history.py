@@ -0,0 +1,254 @@
+"""
+In-memory sample history.
+Every metric of every source is kept in a fixed-capacity ring buffer of two
+typed arrays, int32 millisecond offsets and float32 values (8 bytes a sample,
+so a week at 1 Hz takes under 5 MB), and window queries such as "the maximum
+CPU temperature over the last ten minutes" are answered from those arrays.
+NumPy is used for the queries when it is installed.
+"""
+
+import itertools
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+INT32_MAX = 2**31 - 1
+
+
+class Window:
+    """The samples of one metric inside a time window."""
+
+    def __init__(self, times: array, values: array):
+        # times in milliseconds (relative to any origin), values as float32
+        if NUMPY_AVAILABLE:
+            self.times = np.frombuffer(times, dtype=np.int32)
+            self.values = np.frombuffer(values, dtype=np.float32)
+        else:
+            self.times = times
+            self.values = values
+        self._sorted: Optional[List[float]] = None  # pure-Python percentiles
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def min(self) -> Optional[float]:
+        if not len(self):
+            return None
+        return float(self.values.min() if NUMPY_AVAILABLE else min(self.values))
+
+    def max(self) -> Optional[float]:
+        if not len(self):
+            return None
+        return float(self.values.max() if NUMPY_AVAILABLE else max(self.values))
+
+    def mean(self) -> Optional[float]:
+        if not len(self):
+            return None
+        if NUMPY_AVAILABLE:
+            return float(self.values.mean(dtype=np.float64))
+        return math.fsum(self.values) / len(self.values)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Linear-interpolated percentile, q in 0-100."""
+        if not len(self):
+            return None
+        if NUMPY_AVAILABLE:
+            return float(np.percentile(self.values, q))
+        # Sorted once per window, however many percentiles are asked for
+        if self._sorted is None:
+            self._sorted = sorted(self.values)
+        values = self._sorted
+        position = (len(values) - 1) * q / 100.0
+        lower = math.floor(position)
+        upper = min(lower + 1, len(values) - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    def time_above(self, threshold: float) -> float:
+        """Seconds spent above a threshold, each sample holding until the next."""
+        if len(self) < 2:
+            return 0.0
+        if NUMPY_AVAILABLE:
+            durations = np.diff(self.times)
+            above = self.values[:-1] > threshold
+            return float(durations[above].sum(dtype=np.int64)) / 1000.0
+        times = self.times
+        total = sum(
+            end - start
+            for start, end, value in zip(
+                times, itertools.islice(times, 1, None), self.values
+            )
+            if value > threshold
+        )
+        return total / 1000.0
+
+    def summary(self, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """Count, min, max, mean, p50/p95/p99 and optionally the time above."""
+
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 2)
+
+        summary = {
+            "count": len(self),
+            "min": rounded(self.min()),
+            "max": rounded(self.max()),
+            "mean": rounded(self.mean()),
+            "p50": rounded(self.percentile(50)),
+            "p95": rounded(self.percentile(95)),
+            "p99": rounded(self.percentile(99)),
+        }
+        if threshold is not None:
+            summary["seconds_above"] = round(self.time_above(threshold), 3)
+        return summary
+
+
+class MetricHistory:
+    """Fixed-capacity ring buffer of (time, value) samples of one metric.
+
+    Times are stored as int32 milliseconds after `epoch` (wall-clock seconds),
+    which is moved forward when the offsets would overflow (after ~24 days).
+    They never decrease: a sample taken after the wall clock stepped back is
+    stored at the time of the one before it, keeping the window search valid.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"History capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.epoch: Optional[float] = None
+        # Grown up to capacity, then overwritten oldest first from _start
+        self._times = array("i")
+        self._values = array("f")
+        self._start = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the samples."""
+        return len(self._times) * (self._times.itemsize + self._values.itemsize)
+
+    def append(self, value: Optional[float], timestamp: Optional[float] = None):
+        """Record a value read at `timestamp` (wall-clock seconds); None is skipped."""
+        if value is None or value != value:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self.epoch is None:
+                self.epoch = timestamp
+            offset = int(round((timestamp - self.epoch) * 1000))
+            if self._times:
+                offset = max(offset, self._times[self._start - 1])
+            if offset > INT32_MAX:
+                offset -= self._rebase()
+            if offset > INT32_MAX:
+                # The samples kept span more than an int32 offset can; start over
+                self._times, self._values = array("i"), array("f")
+                self._start, self.epoch, offset = 0, timestamp, 0
+            if len(self._times) < self.capacity:
+                self._times.append(offset)
+                self._values.append(value)
+            else:
+                self._times[self._start] = offset
+                self._values[self._start] = value
+                self._start = (self._start + 1) % self.capacity
+
+    def _rebase(self) -> int:
+        """Move the epoch to the oldest sample; returns the shift in milliseconds."""
+        shift = self._times[self._start]
+        self._times = array("i", (t - shift for t in self._times))
+        self.epoch += shift / 1000.0
+        return shift
+
+    def _first_at(self, offset: int) -> int:
+        """Logical index of the first sample at or after `offset`."""
+        times, start, size = self._times, self._start, len(self._times)
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            if times[(start + middle) % size] < offset:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def window(
+        self, seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> Window:
+        """Samples of the last `seconds` before `now` (default: all of them)."""
+        with self._lock:
+            size = len(self._times)
+            if not size:
+                return Window(array("i"), array("f"))
+            first = 0
+            if seconds is not None:
+                now = time.time() if now is None else now
+                since = math.ceil((now - seconds - self.epoch) * 1000)
+                first = self._first_at(since)
+                if first == size:
+                    return Window(array("i"), array("f"))
+            # Copy out the window in time order, in at most two slices
+            begin = (self._start + first) % size
+            if begin < self._start or self._start == 0:
+                end = self._start if self._start else size
+                times = self._times[begin:end]
+                values = self._values[begin:end]
+            else:
+                times = self._times[begin:] + self._times[: self._start]
+                values = self._values[begin:] + self._values[: self._start]
+        return Window(times, values)
+
+
+class History:
+    """Ring buffers for every metric of every source ("cpu.temperature", ...)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity  # samples kept per metric
+        self.metrics: Dict[str, MetricHistory] = {}
+        self._lock = threading.Lock()
+
+    def metric(self, name: str) -> MetricHistory:
+        """The buffer of one metric, created on first use."""
+        with self._lock:
+            history = self.metrics.get(name)
+            if history is None:
+                history = self.metrics[name] = MetricHistory(self.capacity)
+            return history
+
+    def record(self, source: str, snapshot: Any):
+        """Record every metric a snapshot carries."""
+        for metric, value in snapshot.as_dict().items():
+            if value is not None:
+                self.metric(f"{source}.{metric}").append(value, snapshot.timestamp)
+
+    def window(
+        self, name: str, seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> Window:
+        """Samples of a metric ("cpu.temperature") over the last `seconds`."""
+        history = self.metrics.get(name)
+        if history is None:
+            return Window(array("i"), array("f"))
+        return history.window(seconds, now)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by all samples."""
+        return sum(history.nbytes for history in list(self.metrics.values()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "metrics": len(self.metrics),
+            "samples": sum(len(history) for history in list(self.metrics.values())),
+            "bytes": self.nbytes,
+        }
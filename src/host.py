@@ -0,0 +1,209 @@
+"""
+The monitoring pipeline shared by the console application and the Windows
+service: configuration, hardware monitors, engine, sinks and the config
+reloader. Hosts only add their own lifecycle around it.
+"""
+
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+import toml
+
+from .backends import create_backend
+from .config import Config
+from .engine import monitoring_engine
+from .sinks import DisplaySink, HistorySink
+
+# The history (NumPy), the exporter (http.server) and the reloader are imported
+# only when they are enabled
+if TYPE_CHECKING:
+    from .exporter import MetricsExporter
+
+
+class MonitorHost:
+    """Builds the monitors, engine, history and reloader for a config file.
+
+    Also serves as the host a ConfigReloader rebuilds components through.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        simulation=None,
+        log: Callable[[str], None] = print,
+    ):
+        self.started = time.monotonic()
+        self.config_path = Path(config_path)
+        self.simulation = simulation
+        self.log = log
+        self.cpu_monitor = None
+        self.gpu_monitor = None
+        self.usb_device = None
+        self.history = None
+        self.exporter: Optional["MetricsExporter"] = None
+        self.reloader = None
+        self.load_config()
+
+        try:
+            # Initialize hardware monitors
+            self.cpu_monitor = self.create_cpu_monitor(self.config)
+            self.gpu_monitor = self.create_gpu_monitor(self.config)
+
+            # Each source is sampled on its own thread so slow reads never stall
+            # the display; the engine hands the latest readings to the sinks
+            self.engine = monitoring_engine(
+                self.config, self.cpu_monitor, self.gpu_monitor, log=log
+            )
+        except Exception:
+            self.close()
+            raise
+
+        # Recent samples of every metric, for window queries
+        if self.config.history_capacity > 0:
+            from .history import History
+
+            self.history = History(self.config.history_capacity)
+
+        # Apply changes to the config file while running
+        if self.config.config_reload_interval > 0:
+            from .reload import ConfigReloader
+
+            self.reloader = ConfigReloader(
+                self,
+                str(self.config_path),
+                self.config.config_reload_interval / 1000.0,
+                log=log,
+            )
+
+    @property
+    def usb_cache_path(self) -> Path:
+        """Where the resolved USB backend and endpoint are remembered."""
+        return self.config_path.parent / "usb-cache.json"
+
+    def load_config(self):
+        """Load configuration from TOML file, create default if not exists."""
+        if not self.config_path.exists():
+            self.log(f"Config file not found at: {self.config_path}")
+            self.log("Creating default config file...")
+
+            # Create directory if it doesn't exist
+            self.config_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write default config
+            default_config = Config()
+            with open(self.config_path, "w") as f:
+                toml.dump(default_config.to_dict(), f)
+
+        self.config = self.read_config()
+
+    def read_config(self) -> Config:
+        """Parse the config file."""
+        with open(self.config_path, "r") as f:
+            config_data = toml.load(f)
+
+        return Config.from_dict(config_data)
+
+    def create_cpu_monitor(self, config: Config):
+        """Build the CPU monitor for a configuration."""
+        options = {"sysfs_root": config.sysfs_root}
+        if self.simulation:
+            # Simulated hardware routes WMI and hwmon to its stand-ins
+            options.update(self.simulation.cpu_options())
+        return create_backend(
+            "cpu",
+            config.cpu_device,
+            config.cpu_device,
+            sensor=config.cpu_sensor,
+            metric=config.cpu_metric,
+            reprobe_interval=config.cpu_reprobe_interval,
+            wmi_cache_ttl=config.wmi_cache_ttl / 1000.0,
+            probe_timeout=config.probe_timeout / 1000.0,
+            **config.breaker_options(),
+            **options,
+        )
+
+    def create_gpu_monitor(self, config: Config):
+        """Build the GPU monitor for a configuration."""
+        options = {"sysfs_root": config.sysfs_root}
+        if self.simulation:
+            options.update(self.simulation.gpu_options())
+        return create_backend(
+            "gpu",
+            config.gpu_device,
+            config.gpu_device,
+            metric=config.gpu_metric,
+            select=config.gpu_select,
+            **config.breaker_options(),
+            **options,
+        )
+
+    def create_display(self, config: Config):
+        """Build the display backend for a configuration."""
+        # A display that is missing now is picked up once it is plugged in
+        return create_backend(
+            "display",
+            config.display_device,
+            wait_for_device=True,
+            # The simulated display must not overwrite the real one's cache
+            cache_path=None if self.simulation else str(self.usb_cache_path),
+            started=self.started,
+            log=self.log,
+            **config.display_options(),
+        )
+
+    def create_exporter(self, config: Config) -> "MetricsExporter":
+        """Start the Prometheus endpoint for a configuration."""
+        from .exporter import MetricsExporter
+
+        return MetricsExporter(
+            self.engine,
+            config.exporter_host,
+            config.exporter_port,
+            # Looked up on each refresh, so a reloaded monitor is reported
+            breakers={
+                "cpu": lambda: self.cpu_monitor.breaker_status(),
+                "gpu": lambda: self.gpu_monitor.breaker_status(),
+            },
+            log=self.log,
+        )
+
+    def add_sinks(self, display_log: Optional[Callable[[str], None]] = None):
+        """Attach the display, the history and the metrics endpoint to the engine.
+
+        The endpoint is left out, with a warning, if its port is taken.
+        """
+        if self.usb_device is not None:
+            self.engine.add_sink(DisplaySink(self.usb_device, log=display_log))
+        if self.history is not None:
+            self.engine.add_sink(HistorySink(self.history))
+        if self.config.exporter_enabled:
+            try:
+                self.exporter = self.create_exporter(self.config)
+            except OSError as e:
+                self.log(f"Warning: Metrics endpoint not started: {e}")
+            else:
+                self.engine.add_sink(self.exporter)
+
+    def run_engine(self):
+        """Run the engine until stopped, watching the config file meanwhile."""
+        if self.reloader:
+            self.reloader.start()
+        try:
+            # Returns once stopped, after clearing and closing the display
+            self.engine.run()
+        finally:
+            if self.reloader:
+                self.reloader.stop()
+
+    def close(self):
+        """Close the hardware monitors; the engine closes its sinks itself."""
+        if self.reloader:
+            self.reloader.stop()
+        for monitor in (self.cpu_monitor, self.gpu_monitor):
+            if monitor is None:
+                continue
+            try:
+                monitor.close()
+            except Exception as e:
+                self.log(f"Warning: Closing a hardware monitor failed: {e}")
@@ -0,0 +1,114 @@
+"""
+USB hotplug notifications for the display through the optional usb1 package
+(python-libusb1). Where libusb has no hotplug support (notably on Windows) or
+usb1 is not installed, start() returns None and callers poll instead.
+"""
+
+import threading
+from typing import Optional
+
+
+class HotplugMonitor:
+    """Watches one vendor/product ID for arrival and departure events."""
+
+    def __init__(self, vendor_id: int, product_id: int):
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self._arrived = threading.Event()
+        self._left = threading.Event()
+        self._context = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @classmethod
+    def start(cls, vendor_id: int, product_id: int) -> Optional["HotplugMonitor"]:
+        """A running monitor, or None where hotplug events are unavailable."""
+        try:
+            import usb1
+        except ImportError:
+            return None
+
+        monitor = cls(vendor_id, product_id)
+        try:
+            if not monitor._start(usb1):
+                return None
+        except Exception as e:
+            print(f"Warning: USB hotplug unavailable: {e}")
+            monitor.stop()
+            return None
+        return monitor
+
+    def _start(self, usb1) -> bool:
+        """Register the callback and start the event thread."""
+        context = usb1.USBContext()
+        if hasattr(context, "open"):
+            context = context.open() or context
+        self._context = context
+        if not context.hasCapability(usb1.CAP_HAS_HOTPLUG):
+            self.stop()
+            return False
+
+        arrived = usb1.HOTPLUG_EVENT_DEVICE_ARRIVED
+
+        def callback(context, device, event):
+            if event == arrived:
+                self._arrived.set()
+            else:
+                self._left.set()
+            return False  # keep the callback registered
+
+        # HOTPLUG_ENUMERATE also reports a display that is already plugged in
+        context.hotplugRegisterCallback(
+            callback,
+            events=arrived | usb1.HOTPLUG_EVENT_DEVICE_LEFT,
+            flags=usb1.HOTPLUG_ENUMERATE,
+            vendor_id=self.vendor_id,
+            product_id=self.product_id,
+        )
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="usb-hotplug", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _run(self):
+        """Deliver libusb events until stopped."""
+        while self._running:
+            try:
+                self._context.handleEventsTimeout(tv=0.5)
+            except Exception as e:
+                print(f"Warning: USB hotplug event handling failed: {e}")
+                self._running = False
+
+    @property
+    def running(self) -> bool:
+        """Whether events are still being delivered."""
+        return self._running
+
+    def take_arrival(self) -> bool:
+        """True once per arrival since the last call."""
+        if self._arrived.is_set():
+            self._arrived.clear()
+            return True
+        return False
+
+    def take_departure(self) -> bool:
+        """True once per departure since the last call."""
+        if self._left.is_set():
+            self._left.clear()
+            return True
+        return False
+
+    def stop(self):
+        """Stop the event thread and release the libusb context."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._context is not None:
+            try:
+                self._context.close()
+            except Exception:
+                pass
+            self._context = None
@@ -0,0 +1,205 @@
+"""
+Linux hwmon and thermal_zone temperature sources.
+Sensors are discovered once at startup; their temp*_input files stay open and
+are re-read with os.pread each tick, so polling never walks sysfs.
+"""
+
+import glob
+import os
+import re
+from typing import List, Optional
+
+from .metrics import NAN, BoundMetric, MetricArray, MetricExpression
+
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal")
+GPU_CHIPS = ("amdgpu", "radeon", "nouveau")
+CPU_THERMAL_ZONES = ("x86_pkg_temp", "cpu-thermal", "cpu_thermal", "soc_thermal")
+
+# Preferred sensor label per GPU chip
+GPU_PRIMARY_LABELS = ("edge", "gpu", "temp1")
+
+
+class HwmonSensor:
+    """One sysfs temperature file kept open for repeated reads."""
+
+    __slots__ = ("chip", "label", "path", "device", "fd")
+
+    def __init__(self, chip: str, label: str, path: str, device: str = ""):
+        self.chip = chip
+        self.label = label
+        self.path = path
+        self.device = device  # resolved sysfs device path, identifies the card
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self) -> Optional[float]:
+        """Read the temperature in Celsius (sysfs reports millidegrees)."""
+        try:
+            return int(os.pread(self.fd, 16, 0)) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        """Close the file descriptor."""
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+
+
+def _numeric_order(path: str) -> tuple:
+    """Sort key placing hwmon10 after hwmon9 and temp10_input after temp9_input."""
+    return tuple(int(part) for part in re.findall(r"\d+", os.path.basename(path)))
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def discover_sensors(sysfs_root: str = "/sys", chips=CPU_CHIPS) -> List[HwmonSensor]:
+    """Open the temp*_input files of every hwmon chip whose name is in `chips`."""
+    sensors = []
+    pattern = os.path.join(sysfs_root, "class/hwmon/hwmon*")
+    for hwmon_dir in sorted(glob.glob(pattern), key=_numeric_order):
+        chip = _read_text(os.path.join(hwmon_dir, "name"))
+        if chip not in chips:
+            continue
+
+        device = os.path.realpath(os.path.join(hwmon_dir, "device"))
+        inputs = glob.glob(os.path.join(hwmon_dir, "temp*_input"))
+        for input_path in sorted(inputs, key=_numeric_order):
+            prefix = input_path[: -len("_input")]
+            label = _read_text(prefix + "_label") or os.path.basename(prefix)
+            try:
+                sensors.append(HwmonSensor(chip, label, input_path, device))
+            except OSError:
+                pass
+    return sensors
+
+
+def discover_thermal_zones(
+    sysfs_root: str = "/sys", zone_types=CPU_THERMAL_ZONES
+) -> List[HwmonSensor]:
+    """Open the temp files of thermal zones whose type is in `zone_types`."""
+    sensors = []
+    pattern = os.path.join(sysfs_root, "class/thermal/thermal_zone*")
+    for zone_dir in sorted(glob.glob(pattern), key=_numeric_order):
+        zone_type = _read_text(os.path.join(zone_dir, "type"))
+        if zone_type not in zone_types:
+            continue
+        try:
+            sensors.append(
+                HwmonSensor(zone_type, zone_type, os.path.join(zone_dir, "temp"))
+            )
+        except OSError:
+            pass
+    return sensors
+
+
+class HwmonCPUSource:
+    """CPU temperature from hwmon chips, falling back to CPU thermal zones."""
+
+    def __init__(
+        self, sysfs_root: str = "/sys", metric: Optional[MetricExpression] = None
+    ):
+        self.sensors = discover_sensors(sysfs_root, CPU_CHIPS)
+        if not self.sensors:
+            self.sensors = discover_thermal_zones(sysfs_root)
+
+        self._metric_array = MetricArray([sensor.label for sensor in self.sensors])
+        self._bound_metric: Optional[BoundMetric] = None
+        if metric and self.sensors:
+            bound = self._metric_array.bind(metric)
+            if bound:
+                self._bound_metric = bound
+            else:
+                print(
+                    f"Warning: CPU metric '{metric.text}' matches no hwmon sensors "
+                    f"(available: {', '.join(self._metric_array.names)})"
+                )
+
+    def __bool__(self) -> bool:
+        return bool(self.sensors)
+
+    @property
+    def chips(self) -> List[str]:
+        """Names of the chips providing sensors."""
+        return sorted({sensor.chip for sensor in self.sensors})
+
+    def read(self) -> Optional[float]:
+        """Read the CPU temperature: the metric if configured, else first valid."""
+        if self._bound_metric is not None:
+            values = self._metric_array.values
+            for i in self._bound_metric.indices:
+                temp = self.sensors[i].read()
+                values[i] = NAN if temp is None else temp
+            temp = self._bound_metric.evaluate(values)
+            if temp is not None and 0 < temp < 150:
+                return temp
+            return None
+
+        for sensor in self.sensors:
+            temp = sensor.read()
+            if temp is not None and 0 < temp < 150:
+                return temp
+        return None
+
+    def close(self):
+        """Close all sensor files."""
+        for sensor in self.sensors:
+            sensor.close()
+
+
+class HwmonGPU:
+    """GPU temperature from one hwmon chip (amdgpu, radeon, nouveau)."""
+
+    backend = "hwmon"
+
+    def __init__(self, sensor: HwmonSensor, device_index: int):
+        self.sensor = sensor
+        self.device_index = device_index
+        # hwmon device paths end in the PCI address ("0000:03:00.0")
+        self.pci_bus_id = os.path.basename(sensor.device)
+        self.name = f"{sensor.chip} ({self.pci_bus_id})"
+
+    def get_temperature(self) -> Optional[float]:
+        """Get GPU temperature in Celsius."""
+        return self.sensor.read()
+
+    read_temperature = get_temperature
+
+    def read_metric(self, metric: str) -> Optional[float]:
+        """Read one snapshot metric; hwmon GPUs only provide temperature."""
+        if metric == "temperature":
+            return self.sensor.read()
+        return None
+
+    def close(self):
+        """Close the sensor file."""
+        self.sensor.close()
+
+
+def discover_gpus(sysfs_root: str = "/sys", first_index: int = 0) -> List[HwmonGPU]:
+    """One HwmonGPU per GPU chip, using its edge (or first) temperature sensor."""
+    cards = {}
+    for sensor in discover_sensors(sysfs_root, GPU_CHIPS):
+        cards.setdefault(sensor.device, []).append(sensor)
+
+    gpus = []
+    for sensors in cards.values():
+        primary = sensors[0]
+        for label in GPU_PRIMARY_LABELS:
+            match = [sensor for sensor in sensors if sensor.label == label]
+            if match:
+                primary = match[0]
+                break
+        for sensor in sensors:
+            if sensor is not primary:
+                sensor.close()
+        gpus.append(HwmonGPU(primary, first_index + len(gpus)))
+    return gpus
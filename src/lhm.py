@@ -0,0 +1,242 @@
+"""
+Shared LibreHardwareMonitor session.
+One Computer is opened per process, with only the hardware classes its
+consumers asked for, and each hardware node is updated at most once per tick
+however many monitors read from it. The .NET side is reached through a
+computer factory, so a fake hardware tree can stand in for it in tests.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# .NET interop is imported only when the DLL is actually loaded, since starting
+# the CLR is expensive
+PYTHONNET_AVAILABLE = importlib.util.find_spec("clr") is not None
+
+DLL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "LibreHardwareMonitorLib.dll",
+)
+
+# Consumer kind -> Computer switch
+HARDWARE_CLASSES = {"cpu": "IsCpuEnabled", "gpu": "IsGpuEnabled"}
+GPU_HARDWARE_TYPES = ("GpuNvidia", "GpuAmd", "GpuIntel")
+
+# Updates of the same hardware node closer together than this are shared
+UPDATE_WINDOW = 0.1  # seconds
+
+
+def load_computer() -> Any:
+    """Load LibreHardwareMonitorLib.dll through pythonnet and create a Computer."""
+    import clr
+
+    clr.AddReference(DLL_PATH)
+    from LibreHardwareMonitor.Hardware import Computer
+
+    computer = Computer()
+    computer.IsCpuEnabled = False
+    computer.IsGpuEnabled = False
+    computer.IsMemoryEnabled = False
+    computer.IsMotherboardEnabled = False
+    computer.IsControllerEnabled = False
+    computer.IsNetworkEnabled = False
+    computer.IsStorageEnabled = False
+    return computer
+
+
+class LHMSession:
+    """A reference-counted Computer shared by the CPU and GPU monitors."""
+
+    def __init__(
+        self,
+        computer_factory: Optional[Callable[[], Any]] = None,
+        update_window: float = UPDATE_WINDOW,
+    ):
+        self.computer_factory = computer_factory
+        self.update_window = update_window
+        self.computer = None
+        self.users: Dict[str, int] = {}
+        self.updates = 0  # Update() calls made, for diagnostics
+        self._updated_at: Dict[int, float] = {}
+        self._lock = threading.RLock()
+
+    def available(self) -> bool:
+        """Whether a Computer can be created, without loading anything."""
+        if self.computer_factory is not None:
+            return True
+        return PYTHONNET_AVAILABLE and os.path.exists(DLL_PATH)
+
+    def acquire(self, kind: str) -> bool:
+        """Enable a hardware class ("cpu", "gpu"), opening the Computer if needed."""
+        with self._lock:
+            if not self.available():
+                if not PYTHONNET_AVAILABLE:
+                    print(
+                        "Warning: pythonnet not available, "
+                        "LibreHardwareMonitor DLL support disabled"
+                    )
+                else:
+                    print(
+                        f"Warning: LibreHardwareMonitorLib.dll not found at {DLL_PATH}"
+                    )
+                return False
+
+            try:
+                if self.computer is None:
+                    factory = self.computer_factory or load_computer
+                    computer = factory()
+                    setattr(computer, HARDWARE_CLASSES[kind], True)
+                    computer.Open()
+                    self.computer = computer
+                else:
+                    # Enabling a class on an open Computer adds its hardware
+                    setattr(self.computer, HARDWARE_CLASSES[kind], True)
+            except Exception as e:
+                print(f"Warning: Failed to initialize LibreHardwareMonitor DLL: {e}")
+                return False
+
+            self.users[kind] = self.users.get(kind, 0) + 1
+            return True
+
+    def release(self, kind: str):
+        """Drop one user of a hardware class, closing the Computer after the last."""
+        with self._lock:
+            if self.users.get(kind, 0) == 0:
+                return
+            self.users[kind] -= 1
+            if self.users[kind] == 0:
+                del self.users[kind]
+                if self.computer is not None:
+                    try:
+                        setattr(self.computer, HARDWARE_CLASSES[kind], False)
+                    except Exception:
+                        pass
+
+            if not self.users and self.computer is not None:
+                try:
+                    self.computer.Close()
+                except Exception:
+                    pass
+                self.computer = None
+                self._updated_at.clear()
+
+    def hardware(self, hardware_types: Iterable[str]) -> List[Any]:
+        """Top-level hardware nodes of the given types ("Cpu", "GpuAmd", ...)."""
+        hardware_types = tuple(hardware_types)
+        with self._lock:
+            if self.computer is None:
+                return []
+            return [
+                hardware
+                for hardware in self.computer.Hardware
+                if str(hardware.HardwareType) in hardware_types
+            ]
+
+    def update(self, nodes: Iterable[Any], force: bool = False):
+        """Update hardware nodes, skipping those already updated this tick."""
+        with self._lock:
+            now = time.monotonic()
+            for hardware in nodes:
+                key = id(hardware)
+                updated_at = self._updated_at.get(key)
+                if (
+                    not force
+                    and updated_at is not None
+                    and now - updated_at < self.update_window
+                ):
+                    continue
+                hardware.Update()
+                self._updated_at[key] = now
+                self.updates += 1
+
+
+_shared: Optional[LHMSession] = None
+_shared_lock = threading.Lock()
+
+
+def shared_session() -> LHMSession:
+    """The process-wide session used by the CPU and GPU monitors."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LHMSession()
+        return _shared
+
+
+def set_computer_factory(factory: Optional[Callable[[], Any]]):
+    """Replace the Computer factory of the shared session (fake trees, tests)."""
+    shared_session().computer_factory = factory
+
+
+class LHMGPU:
+    """GPU readings from a LibreHardwareMonitor GPU node (AMD, Intel or NVIDIA)."""
+
+    backend = "LibreHardwareMonitor"
+
+    # metric -> (sensor type, preferred sensor names)
+    SENSORS = {
+        "temperature": ("Temperature", ("GPU Core", "GPU Hot Spot")),
+        "load": ("Load", ("GPU Core",)),
+        "clock": ("Clock", ("GPU Core",)),
+        "power": ("Power", ("GPU Package", "GPU Power", "GPU Core")),
+    }
+
+    def __init__(self, session: LHMSession, hardware, device_index: int):
+        self.session = session
+        self.hardware = hardware
+        self.device_index = device_index
+        self.name = str(hardware.Name)
+        self.hardware_type = str(hardware.HardwareType)
+        self.uuid = None
+        self.pci_bus_id = None
+        self.sensors = {}
+        self._resolve_sensors()
+
+    def _resolve_sensors(self):
+        """Resolve the sensor handle of each metric once."""
+        session = self.session
+        session.update([self.hardware], force=True)
+        by_type: Dict[str, list] = {}
+        for sensor in self.hardware.Sensors:
+            by_type.setdefault(str(sensor.SensorType), []).append(sensor)
+
+        for metric, (sensor_type, names) in self.SENSORS.items():
+            candidates = by_type.get(sensor_type, [])
+            for name in names:
+                match = [sensor for sensor in candidates if str(sensor.Name) == name]
+                if match:
+                    self.sensors[metric] = match[0]
+                    break
+            else:
+                if candidates and metric == "temperature":
+                    self.sensors[metric] = candidates[0]
+
+    def read_metric(self, metric: str) -> Optional[float]:
+        """Read one snapshot metric (temperature, load, clock or power)."""
+        sensor = self.sensors.get(metric)
+        if sensor is None:
+            return None
+        self.session.update([self.hardware])
+        value = sensor.Value
+        return None if value is None else float(value)
+
+    def get_temperature(self) -> Optional[float]:
+        """Get GPU temperature in Celsius."""
+        return self.read_metric("temperature")
+
+    read_temperature = get_temperature
+
+
+def discover_gpus(
+    session: LHMSession, hardware_types=GPU_HARDWARE_TYPES, first_index: int = 0
+) -> List[LHMGPU]:
+    """One LHMGPU per GPU node of the given types that has a temperature sensor."""
+    gpus = []
+    for hardware in session.hardware(hardware_types):
+        gpu = LHMGPU(session, hardware, first_index + len(gpus))
+        if "temperature" in gpu.sensors:
+            gpus.append(gpu)
+    return gpus
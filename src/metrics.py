@@ -0,0 +1,193 @@
+"""
+Derived metrics over multi-sensor readings.
+Expressions such as "max(core*)", "mean(core*)", "package" or "p90(core*)" are
+compiled once, bound to the sensor layout once, and then evaluated against a
+flat array of readings each tick. NumPy is used for reductions over several
+sensors when it is installed, and only imported once such a metric is bound.
+"""
+
+import math
+import re
+from array import array
+from typing import Callable, List, Optional, Sequence
+
+_numpy = None  # the numpy module once imported, False if it is not installed
+
+NAN = float("nan")
+
+_EXPRESSION = re.compile(r"^\s*(?:(\w+)\s*\(\s*([\w*]+)\s*\)|([\w*]+))\s*$")
+_PERCENTILE = re.compile(r"^p(\d{1,2}(?:_\d+)?)$")
+
+# Sensor label patterns -> canonical expression names
+_CANONICAL_NAMES = [
+    (re.compile(r"^(?:cpu )?core\s*#?\s*(\d+)$"), "core{0}"),
+    (re.compile(r"^(?:cpu )?package(?: id (\d+))?$"), "package{0}"),
+    (re.compile(r"^core \(tctl/tdie\)$|^tctl$"), "tctl"),
+    (re.compile(r"^tdie$"), "tdie"),
+    (re.compile(r"^(?:core \()?tccd\s*#?(\d+)\)?$"), "ccd{0}"),
+    (re.compile(r"^gpu\s*#?\s*(\d+)$"), "gpu{0}"),
+]
+
+
+def canonical_name(label: str) -> str:
+    """Normalize a sensor label ("CPU Core #3", "Package id 0") to a metric name."""
+    label = " ".join(str(label).lower().split())
+    for pattern, template in _CANONICAL_NAMES:
+        match = pattern.match(label)
+        if match:
+            index = match.group(1) if match.groups() else None
+            # Package 0 is simply "package"; further packages keep their index
+            if template.startswith("package") and index in (None, "0"):
+                index = ""
+            return template.format(index or "")
+    return re.sub(r"[^a-z0-9]+", "_", label).strip("_")
+
+
+def _match_names(pattern: str, names: Sequence[str]) -> List[int]:
+    """Indices of names selected by a pattern ("core*" selects core0, core1, ...)."""
+    pattern = pattern.lower()
+    if pattern == "*":
+        return list(range(len(names)))
+    if pattern.endswith("*"):
+        regex = re.compile(re.escape(pattern[:-1]) + r"\d+$")
+        return [i for i, name in enumerate(names) if regex.match(name)]
+    return [i for i, name in enumerate(names) if name == pattern]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, matching numpy's default method."""
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100.0
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _python_reducer(function: str, q: float) -> Callable[[List[float]], float]:
+    if function == "max":
+        return max
+    if function == "min":
+        return min
+    if function == "mean":
+        return lambda values: math.fsum(values) / len(values)
+    if function == "first":
+        return lambda values: values[0]
+    return lambda values: _percentile(values, q)
+
+
+def _load_numpy():
+    """Import NumPy on first use; None if it is not installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def _numpy_reducer(np, function: str, q: float) -> Callable:
+    if function == "max":
+        return np.max
+    if function == "min":
+        return np.min
+    if function == "mean":
+        return np.mean
+    if function == "first":
+        return lambda values: values[0]
+    return lambda values: np.percentile(values, q)
+
+
+class MetricExpression:
+    """A compiled expression such as "max(core*)" or "package"."""
+
+    FUNCTIONS = ("max", "min", "mean", "avg", "first")
+
+    def __init__(self, text: str):
+        match = _EXPRESSION.match(text or "")
+        if not match:
+            raise ValueError(f"Invalid metric expression: '{text}'")
+
+        function, pattern, bare = match.groups()
+        self.text = text.strip()
+        self.pattern = (pattern or bare).lower()
+        function = (function or "first").lower()
+        self.q = 0.0
+
+        percentile = _PERCENTILE.match(function)
+        if function == "avg":
+            function = "mean"
+        elif percentile:
+            self.q = float(percentile.group(1).replace("_", "."))
+            function = "percentile"
+        elif function not in self.FUNCTIONS:
+            raise ValueError(f"Unknown metric function '{function}' in '{text}'")
+        self.function = function
+
+    def bind(self, names: Sequence[str]) -> "BoundMetric":
+        """Resolve the expression against a fixed sensor layout."""
+        return BoundMetric(self, _match_names(self.pattern, names))
+
+    def __repr__(self) -> str:
+        return f"MetricExpression({self.text!r})"
+
+
+class BoundMetric:
+    """An expression resolved to array indices, ready to evaluate each tick."""
+
+    def __init__(self, expression: MetricExpression, indices: List[int]):
+        self.expression = expression
+        self.indices = indices
+        # A single reading needs no array arithmetic
+        np = _load_numpy() if len(indices) > 1 else None
+        self._np = np
+        if np is not None:
+            self._index_array = np.asarray(indices, dtype=np.intp)
+            self._reduce = _numpy_reducer(np, expression.function, expression.q)
+        else:
+            self._reduce = _python_reducer(expression.function, expression.q)
+
+    def __bool__(self) -> bool:
+        return bool(self.indices)
+
+    def evaluate(self, values: Sequence[float]) -> Optional[float]:
+        """Reduce the selected readings, ignoring missing (NaN) values."""
+        if not self.indices:
+            return None
+
+        np = self._np
+        if np is not None:
+            selected = np.asarray(values, dtype=np.float64)[self._index_array]
+            selected = selected[~np.isnan(selected)]
+            if selected.size == 0:
+                return None
+            return float(self._reduce(selected))
+
+        selected = [values[i] for i in self.indices if values[i] == values[i]]
+        if not selected:
+            return None
+        return float(self._reduce(selected))
+
+
+class MetricArray:
+    """Fixed layout of named readings stored in a compact double array."""
+
+    def __init__(self, labels: Sequence[str]):
+        self.labels = list(labels)
+        self.names = [canonical_name(label) for label in self.labels]
+        self.values = array("d", [NAN] * len(self.names))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def clear(self):
+        """Mark every reading as missing."""
+        for i in range(len(self.values)):
+            self.values[i] = NAN
+
+    def bind(self, expression) -> BoundMetric:
+        """Bind an expression (text or compiled) to this layout."""
+        if not isinstance(expression, MetricExpression):
+            expression = MetricExpression(expression)
+        return expression.bind(self.names)
@@ -0,0 +1,297 @@
+"""
+Live configuration reload.
+The config file is polled for changes (its modification time and size, one
+stat call per check) and the settings that changed are applied to the running
+engine. Hardware monitors and the display are only rebuilt when their own
+settings changed, and the replacement is built before the old one is closed,
+so shared hardware sessions (the LibreHardwareMonitor Computer, NVML) stay
+open; everything else is changed in place.
+"""
+
+import functools
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from .adaptive import temperature_polling
+from .config import Config
+from .engine import MonitoringEngine
+from .scheduler import check_policy
+from .sinks import DisplaySink
+from .snapshot import validate_metrics
+
+# Circuit breaker settings, changed in place on the running monitors
+BREAKER_KEYS = {"breaker_threshold", "breaker_backoff", "breaker_max_backoff"}
+# Settings each hardware monitor is built with
+MONITOR_KEYS = {
+    "cpu": {
+        "cpu_device",
+        "cpu_sensor",
+        "cpu_metric",
+        "cpu_reprobe_interval",
+        "probe_timeout",
+        "wmi_cache_ttl",
+        "sysfs_root",
+    },
+    "gpu": {"gpu_device", "gpu_metric", "gpu_select", "sysfs_root"},
+}
+# Settings the display backend is built with, and those it can take live
+DISPLAY_KEYS = {"display_device"}
+VIRTUAL_DISPLAY_KEYS = {"virtual_display_output"}
+DISPLAY_OPTION_KEYS = {
+    "display_hysteresis",
+    "display_keepalive",
+    "display_reconnect_backoff",
+    "display_reconnect_max_backoff",
+    "polling_interval",
+}
+# Settings that only take effect on restart
+RESTART_KEYS = {
+    "history_capacity",
+    "exporter_enabled",
+    "exporter_host",
+    "exporter_port",
+}
+# How often the config file is checked, changed on the reloader itself
+RELOAD_KEYS = {"config_reload_interval"}
+ADAPTIVE_KEYS = {
+    "adaptive_polling",
+    "min_polling_interval",
+    "max_polling_interval",
+    "adaptive_step_threshold",
+    "adaptive_rate_threshold",
+}
+
+
+def display_keys(old: Config, new: Config) -> Set[str]:
+    """Settings whose change requires rebuilding the display backend.
+
+    The virtual display's output only matters while a virtual display is in
+    use; rebuilding a USB display for it would open the device a second time.
+    """
+    devices = {old.display_device.lower(), new.display_device.lower()}
+    if "virtual" in devices:
+        return DISPLAY_KEYS | VIRTUAL_DISPLAY_KEYS
+    return DISPLAY_KEYS
+
+
+class ConfigWatcher:
+    """Notices changes to a file from its modification time and size."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self) -> bool:
+        """Whether the file changed since the last check (a missing file never has)."""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return signature is not None
+
+
+class ConfigReloader(threading.Thread):
+    """Watches the config file and applies its changes to a running host.
+
+    The host (a MonitorHost, see src/host.py) provides `config`,
+    `engine`, `cpu_monitor`, `gpu_monitor` and `usb_device`, plus read_config()
+    and create_cpu_monitor(config), create_gpu_monitor(config) and
+    create_display(config) to build replacements.
+    """
+
+    def __init__(
+        self,
+        host: Any,
+        path: str,
+        interval: float = 2.0,
+        log: Callable[[str], None] = print,
+    ):
+        super().__init__(name="config-reload", daemon=True)
+        self.host = host
+        self.watcher = ConfigWatcher(path)
+        self.interval = interval  # seconds between checks
+        self.log = log
+        self.reloads = 0
+        self._stop_event = threading.Event()
+
+    @property
+    def engine(self) -> MonitoringEngine:
+        return self.host.engine
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if self.watcher.changed():
+                self.reload()
+
+    def stop(self):
+        """Stop watching."""
+        self._stop_event.set()
+
+    def reload(self) -> Set[str]:
+        """Re-read the config file and apply what changed; the changed keys."""
+        if self._stop_event.is_set():
+            return set()  # the host is shutting down
+        old: Config = self.host.config
+        try:
+            config = self.host.read_config()
+            check_policy(config.overrun_policy)
+            validate_metrics(config.snapshot_metrics)
+            for name in self.engine.sources:
+                temperature_polling(config.adaptive_options(name))
+        except Exception as e:
+            self.log(f"Warning: Ignoring invalid configuration: {e}")
+            return set()
+
+        changed = old.changes(config)
+        if not changed:
+            return changed
+
+        # Build replacements before touching anything; if one fails, the current
+        # configuration stays in effect and the next change to the file retries
+        monitors: Dict[str, Any] = {}
+        display = None
+        try:
+            for name, keys in MONITOR_KEYS.items():
+                current = getattr(self.host, f"{name}_monitor")
+                # Backends without configure_breakers() are rebuilt instead
+                if changed & keys or (
+                    changed & BREAKER_KEYS
+                    and not hasattr(current, "configure_breakers")
+                ):
+                    create = getattr(self.host, f"create_{name}_monitor")
+                    monitors[name] = create(config)
+            if changed & display_keys(old, config):
+                display = self.host.create_display(config)
+        except Exception as e:
+            self.log(f"Warning: Configuration not reloaded: {e}")
+            for monitor in monitors.values():
+                monitor.close()
+            return set()
+
+        replaced = self.engine.call(
+            functools.partial(self._apply, config, changed, monitors, display)
+        ).result()
+
+        # Close what was replaced; a monitor is closed on its source's thread,
+        # after any read still in flight
+        for name, monitor in replaced.items():
+            if name == "display":
+                sink = DisplaySink(monitor)
+                try:
+                    sink.close()
+                except Exception as e:
+                    self.log(f"Warning: Closing the old display failed: {e}")
+                continue
+            self._on_source_thread(name, monitor.close)
+
+        # Breakers are driven by their source's reads, so they are changed on
+        # the same thread
+        if changed & BREAKER_KEYS:
+            for name in MONITOR_KEYS:
+                if name not in monitors:
+                    monitor = getattr(self.host, f"{name}_monitor")
+                    self._on_source_thread(
+                        name,
+                        functools.partial(
+                            monitor.configure_breakers, **config.breaker_options()
+                        ),
+                    )
+
+        if changed & RELOAD_KEYS:
+            if config.config_reload_interval > 0:
+                self.interval = config.config_reload_interval / 1000.0
+            else:
+                self.log("Configuration reloading disabled")
+                self.stop()
+
+        if changed & RESTART_KEYS:
+            restart = ", ".join(sorted(changed & RESTART_KEYS))
+            self.log(f"Warning: Restart to apply {restart}")
+        self.host.config = config
+        self.reloads += 1
+        self.log(f"Configuration reloaded: {', '.join(sorted(changed))}")
+        return changed
+
+    def _on_source_thread(self, name: str, fn: Callable[[], Any]):
+        """Call fn on a source's thread, after any read in flight."""
+        source = self.engine.sources.get(name)
+        try:
+            source.executor.submit(fn)
+        except (AttributeError, RuntimeError):
+            fn()  # no such source, or the engine has stopped
+
+    def _apply(
+        self,
+        config: Config,
+        changed: Set[str],
+        monitors: Dict[str, Any],
+        display: Any,
+    ) -> Dict[str, Any]:
+        """Swap in the new settings and components, on the engine's event loop.
+
+        Returns the components that were replaced.
+        """
+        host, engine = self.host, self.engine
+        replaced: Dict[str, Any] = {}
+
+        # Sources: the monitor they read, the metrics, their intervals
+        metrics = validate_metrics(config.snapshot_metrics)
+        display_interval_keys = ADAPTIVE_KEYS | {"polling_interval"}
+        for name, source in engine.sources.items():
+            monitor = monitors.get(name)
+            if monitor is not None:
+                replaced[name] = getattr(host, f"{name}_monitor")
+                setattr(host, f"{name}_monitor", monitor)
+            if monitor is not None or "snapshot_metrics" in changed:
+                monitor = getattr(host, f"{name}_monitor")
+                source.read = functools.partial(monitor.get_snapshot, metrics)
+
+            # The adaptive policy starts from the sample interval
+            interval_keys = ADAPTIVE_KEYS | {
+                "polling_interval",
+                f"{name}_sample_interval",
+                f"{name}_adaptive_polling",
+            }
+            display_interval_keys |= interval_keys
+            if changed & interval_keys:
+                source.adaptive = temperature_polling(config.adaptive_options(name))
+                source.scheduler.set_interval(
+                    source.adaptive.interval
+                    if source.adaptive is not None
+                    else config.sample_interval(name) / 1000.0
+                )
+
+        # Display loop: the polling interval, or the fastest adaptive source
+        if changed & display_interval_keys:
+            engine.scheduler.set_interval(
+                min(source.interval for source in engine.sources.values())
+                if engine.adaptive
+                else config.polling_interval / 1000.0
+            )
+        if "overrun_policy" in changed:
+            engine.scheduler.policy = config.overrun_policy
+        if engine.breaker is not None:
+            engine.breaker.backoff = config.breaker_backoff / 1000.0
+            engine.breaker.max_backoff = config.breaker_max_backoff / 1000.0
+
+        # Display
+        sink = engine.sink("display")
+        if display is not None:
+            if host.usb_device is not None:
+                replaced["display"] = host.usb_device
+            host.usb_device = display
+            if sink is not None:
+                sink.device = display
+            else:
+                engine.add_sink(DisplaySink(display))
+        elif host.usb_device is not None and changed & DISPLAY_OPTION_KEYS:
+            host.usb_device.configure(**config.display_options())
+        return replaced
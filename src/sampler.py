@@ -0,0 +1,57 @@
+"""
+Latest-value store for sampled sources.
+Each source is polled on its own thread and interval (see engine.py), and the
+display loop reads the most recent values from this store instead of blocking
+on reads.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class Sample:
+    """A value published by a sampler, with its monotonic capture time."""
+
+    __slots__ = ("value", "timestamp")
+
+    def __init__(self, value: Any, timestamp: float):
+        self.value = value
+        self.timestamp = timestamp
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the sample was captured."""
+        return (time.monotonic() if now is None else now) - self.timestamp
+
+
+class LatestValueStore:
+    """Thread-safe store keeping only the latest sample per source."""
+
+    def __init__(self):
+        self._samples: Dict[str, Sample] = {}
+        self._lock = threading.Lock()
+
+    def put(self, name: str, value: Any, timestamp: Optional[float] = None):
+        """Publish a new value for a source."""
+        sample = Sample(value, time.monotonic() if timestamp is None else timestamp)
+        with self._lock:
+            self._samples[name] = sample
+
+    def get(self, name: str) -> Optional[Sample]:
+        """Get the latest sample for a source, if any."""
+        with self._lock:
+            return self._samples.get(name)
+
+    def value(self, name: str, max_age: Optional[float] = None) -> Any:
+        """Get the latest value for a source, or None if missing or stale."""
+        sample = self.get(name)
+        if sample is None:
+            return None
+        if max_age is not None and sample.age() > max_age:
+            return None
+        return sample.value
+
+    def snapshot(self) -> Dict[str, Sample]:
+        """Copy of the latest sample of every source."""
+        with self._lock:
+            return dict(self._samples)
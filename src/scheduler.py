@@ -0,0 +1,136 @@
+"""
+Fixed-rate tick scheduling.
+Ticks fall on monotonic deadlines spaced one interval apart, so the time spent
+reading sensors and writing the display does not stretch the period. Ticks
+the loop overran are skipped or caught up. The caller does the waiting (the
+engine on its event loop), from delay() to tick().
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, Optional
+
+SKIP = "skip"
+CATCH_UP = "catch-up"
+POLICIES = (SKIP, CATCH_UP)
+
+
+def check_policy(policy: str) -> str:
+    """Validate an overrun policy name."""
+    if policy not in POLICIES:
+        raise ValueError(
+            f"Unknown overrun policy '{policy}', expected one of: "
+            + ", ".join(POLICIES)
+        )
+    return policy
+
+
+class TickScheduler:
+    """Monotonic-deadline ticks with missed-tick and jitter accounting.
+
+    After an overrun, the "skip" policy drops the ticks whose deadlines passed
+    and fires once for the latest one; "catch-up" fires the late ticks back to
+    back, up to max_catch_up of them, and counts the rest as missed.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        policy: str = SKIP,
+        max_catch_up: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval  # seconds
+        self.policy = check_policy(policy)
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self._deadline: Optional[float] = None
+        self._behind = False
+        self.ticks = 0
+        self.missed = 0
+        self.overruns = 0  # times the loop fell behind its schedule
+        # Lateness of each tick against its deadline, in seconds
+        self.jitter_last = 0.0
+        self.jitter_max = 0.0
+        self._jitter_mean = 0.0
+        self._jitter_m2 = 0.0
+
+    def delay(self) -> float:
+        """Seconds until the next tick is due, after accounting for overruns.
+
+        The caller waits that long, then calls tick().
+        """
+        now = self.clock()
+        if self._deadline is None:
+            self._deadline = now  # the first tick fires immediately
+        elif now > self._deadline:
+            # The last tick ran past this one's deadline
+            if not self._behind:
+                self.overruns += 1
+            if now - self._deadline >= self.interval:
+                self._drop_missed(now)
+        self._behind = now > self._deadline
+        return self._deadline - now
+
+    def tick(self):
+        """Record that the tick due now fired, and schedule the next one."""
+        if self._deadline is None:
+            self._deadline = self.clock()
+        lateness = max(0.0, self.clock() - self._deadline)
+        self._record(lateness)
+        self._deadline += self.interval
+
+    def _drop_missed(self, now: float):
+        """Account for deadlines that passed while the last tick was running."""
+        # Deadlines after the current one that are already in the past
+        late = int(math.floor((now - self._deadline) / self.interval))
+        if self.policy == SKIP:
+            dropped = late
+        else:
+            dropped = max(0, late - self.max_catch_up)
+        self.missed += dropped
+        self._deadline += dropped * self.interval
+
+    def _record(self, lateness: float):
+        self.ticks += 1
+        self.jitter_last = lateness
+        self.jitter_max = max(self.jitter_max, lateness)
+        delta = lateness - self._jitter_mean
+        self._jitter_mean += delta / self.ticks
+        self._jitter_m2 += delta * (lateness - self._jitter_mean)
+
+    def set_interval(self, interval: float):
+        """Change the period; the next tick is due one new interval after the last.
+
+        A shorter interval that moves the deadline into the past makes the
+        next tick due now rather than overrun.
+        """
+        if self._deadline is not None:
+            self._deadline += interval - self.interval
+            now = self.clock()
+            if interval < self.interval and self._deadline < now:
+                self._deadline = now
+                self._behind = True  # due now, which is not an overrun
+        self.interval = interval
+
+    def reset(self):
+        """Start a new schedule; the next tick fires immediately."""
+        self._deadline = None
+        self._behind = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Tick counts and jitter (lateness past each deadline) in milliseconds."""
+        deviation = (
+            math.sqrt(self._jitter_m2 / (self.ticks - 1)) if self.ticks > 1 else 0.0
+        )
+        return {
+            "policy": self.policy,
+            "interval_ms": round(self.interval * 1000, 3),
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "jitter_last_ms": round(self.jitter_last * 1000, 3),
+            "jitter_mean_ms": round(self._jitter_mean * 1000, 3),
+            "jitter_stdev_ms": round(deviation * 1000, 3),
+            "jitter_max_ms": round(self.jitter_max * 1000, 3),
+        }
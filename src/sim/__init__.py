@@ -0,0 +1,204 @@
+"""
+Hardware simulation: drop-in stand-ins for wmi, pynvml, the LibreHardwareMonitor
+Computer and pyusb, driven by scripted temperature curves, with configurable
+latency and failure injection. Installing a Simulation lets the monitors and
+the USB display run end-to-end on any machine.
+
+    simulation = Simulation.scenario("default").install()
+    cpu = CPUMonitor(**simulation.cpu_options())
+"""
+
+import sys
+from typing import Any, Dict, List, Optional
+
+from . import curves
+from .fake_lhm import SimComputer
+from .fake_nvml import SimNVML, build_module as build_nvml_module
+from .fake_usb import SimUSB, build_modules as build_usb_modules, build_usb1_module
+from .fake_wmi import SimWMI, build_module as build_wmi_module
+from .faults import FaultInjector
+from .hardware import SimClock, SimCPU, SimDisplay, SimGPU
+
+SCENARIOS = ("default", "hot", "flaky", "slow", "no-display", "replug", "burst")
+
+
+class Simulation:
+    """A simulated machine, installed in place of the real hardware libraries."""
+
+    # No simulated sysfs tree: hwmon discovery finds nothing here
+    sysfs_root = "/nonexistent/af-pro-display-sim"
+
+    def __init__(
+        self,
+        cpu: Optional[SimCPU] = None,
+        gpus: Optional[List[SimGPU]] = None,
+        display: Optional[SimDisplay] = None,
+        wmi_faults: Optional[FaultInjector] = None,
+        hardware_monitor: Optional[str] = "root\\LibreHardwareMonitor",
+        lhm: bool = True,
+        hotplug: bool = False,
+    ):
+        self.clock = SimClock()
+        self.cpu = cpu or SimCPU()
+        self.gpus = gpus if gpus is not None else [SimGPU()]
+        self.display = display or SimDisplay()
+        self.lhm = lhm  # whether the LibreHardwareMonitor DLL is "installed"
+        self.hotplug = hotplug  # whether usb1 hotplug notifications are available
+
+        for i, gpu in enumerate(self.gpus):
+            gpu.uuid = gpu.uuid or f"GPU-5133a7e0-0000-4000-8000-{i:012d}"
+            gpu.pci_bus_id = gpu.pci_bus_id or f"00000000:{i + 1:02x}:00.0"
+
+        nvidia = [gpu for gpu in self.gpus if gpu.vendor == "nvidia"]
+        self.nvml = SimNVML(nvidia, self.clock)
+        self.wmi = SimWMI(self.cpu, self.clock, hardware_monitor, wmi_faults)
+        self.usb = SimUSB(self.display, self.clock, hotplug)
+        self.computers: List[SimComputer] = []
+        self._saved_modules: Dict[str, Any] = {}
+        self._saved_factory = None
+        self.installed = False
+
+    @classmethod
+    def scenario(cls, name: str = "default") -> "Simulation":
+        """Build one of the preset scenarios (see SCENARIOS)."""
+        if name == "default":
+            # An NVIDIA card plus an AMD card read through LHM
+            return cls(
+                gpus=[
+                    SimGPU("nvidia", "NVIDIA GeForce RTX 4090 (simulated)"),
+                    SimGPU(
+                        "amd",
+                        "AMD Radeon RX 7900 XTX (simulated)",
+                        temperature=curves.sine(50.0, 10.0, 50.0),
+                    ),
+                ]
+            )
+        if name == "hot":
+            # Ramp both sources towards their limits over two minutes
+            return cls(
+                cpu=SimCPU(temperature=curves.ramp(40.0, 98.0, 120.0)),
+                gpus=[SimGPU(temperature=curves.ramp(35.0, 91.0, 120.0))],
+            )
+        if name == "flaky":
+            # Random failures everywhere plus scripted outages of each backend
+            return cls(
+                cpu=SimCPU(faults=FaultInjector(failure_rate=0.05, outages=[(20, 30)])),
+                gpus=[
+                    SimGPU(faults=FaultInjector(failure_rate=0.05, outages=[(10, 25)]))
+                ],
+                display=SimDisplay(faults=FaultInjector(outages=[(15, 20)])),
+                wmi_faults=FaultInjector(failure_rate=0.1),
+            )
+        if name == "slow":
+            # Slow sensor reads and USB writes, for latency measurements
+            return cls(
+                cpu=SimCPU(faults=FaultInjector(latency=0.05, jitter=0.03)),
+                gpus=[SimGPU(faults=FaultInjector(latency=0.02, jitter=0.01))],
+                display=SimDisplay(faults=FaultInjector(latency=0.01)),
+                wmi_faults=FaultInjector(latency=0.2),
+            )
+        if name == "no-display":
+            return cls(display=SimDisplay(present=False))
+        if name == "replug":
+            # The display cable is pulled twice; frames resume after each replug
+            return cls(display=SimDisplay(unplugged=[(5, 10), (20, 22)]))
+        if name == "burst":
+            # Idle, then a short burst of load, then idle again (adaptive polling)
+            load = [(0, 35.0), (8, 35.0), (9, 80.0), (16, 82.0), (18, 38.0), (60, 36.0)]
+            return cls(
+                cpu=SimCPU(temperature=curves.scripted(load)),
+                gpus=[SimGPU(temperature=curves.offset(curves.scripted(load), -3.0))],
+            )
+        raise ValueError(
+            f"Unknown simulation scenario '{name}' (available: {', '.join(SCENARIOS)})"
+        )
+
+    def create_computer(self) -> SimComputer:
+        """Computer factory for the LibreHardwareMonitor session."""
+        computer = SimComputer(self.cpu, self.gpus, self.clock)
+        self.computers.append(computer)
+        return computer
+
+    def modules(self) -> Dict[str, Any]:
+        """The fake modules to place in sys.modules."""
+        modules = {
+            "wmi": build_wmi_module(self.wmi),
+            "pynvml": build_nvml_module(self.nvml),
+        }
+        modules.update(build_usb_modules(self.usb))
+        # Without hotplug, hide any installed usb1 so the polling path is used
+        modules["usb1"] = build_usb1_module(self.usb) if self.hotplug else None
+        return modules
+
+    def install(self) -> "Simulation":
+        """Replace the hardware libraries; call before the backends are created."""
+        if self.installed:
+            return self
+
+        for name, module in self.modules().items():
+            self._saved_modules[name] = sys.modules.get(name)
+            sys.modules[name] = module  # None makes the import fail
+
+        from ..lhm import shared_session
+
+        session = shared_session()
+        self._saved_factory = session.computer_factory
+        session.computer_factory = (
+            self.create_computer if self.lhm else _missing_computer
+        )
+        self.installed = True
+        return self
+
+    def uninstall(self):
+        """Restore the real libraries."""
+        if not self.installed:
+            return
+        for name, module in self._saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        self._saved_modules = {}
+
+        from ..lhm import shared_session
+
+        shared_session().computer_factory = self._saved_factory
+        self.installed = False
+
+    def __enter__(self) -> "Simulation":
+        return self.install()
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def cpu_options(self) -> Dict[str, Any]:
+        """CPUMonitor keyword arguments that route WMI and hwmon to the simulation."""
+        from ..wmi_access import PyWMIBackend
+
+        return {"wmi_backend": PyWMIBackend(), "sysfs_root": self.sysfs_root}
+
+    def gpu_options(self) -> Dict[str, Any]:
+        """GPUMonitor keyword arguments that keep host hwmon GPUs out."""
+        return {"sysfs_root": self.sysfs_root}
+
+    def describe(self) -> str:
+        """One-line summary of the simulated machine."""
+        gpus = ", ".join(f"{gpu.name} [{gpu.vendor}]" for gpu in self.gpus) or "none"
+        display = "attached" if self.display.present else "detached"
+        return f"Simulated hardware: {self.cpu.name}; GPUs: {gpus}; display {display}"
+
+
+def _missing_computer():
+    """Computer factory for a machine without the LibreHardwareMonitor DLL."""
+    raise RuntimeError("LibreHardwareMonitorLib.dll is not installed (simulated)")
+
+
+__all__ = [
+    "FaultInjector",
+    "SCENARIOS",
+    "SimCPU",
+    "SimDisplay",
+    "SimGPU",
+    "Simulation",
+    "curves",
+]
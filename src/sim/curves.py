@@ -0,0 +1,64 @@
+"""
+Scripted value curves for simulated sensors.
+A curve maps the seconds elapsed since the simulation started to a reading.
+"""
+
+import math
+import random
+from typing import Callable, Optional, Sequence, Tuple
+
+Curve = Callable[[float], float]
+
+
+def constant(value: float) -> Curve:
+    """Always the same reading."""
+    return lambda elapsed: value
+
+
+def sine(mean: float, amplitude: float, period: float, phase: float = 0.0) -> Curve:
+    """Oscillate around `mean` with the given period in seconds."""
+    return lambda elapsed: mean + amplitude * math.sin(
+        2.0 * math.pi * (elapsed + phase) / period
+    )
+
+
+def ramp(start: float, end: float, duration: float) -> Curve:
+    """Move linearly from `start` to `end` over `duration` seconds, then hold."""
+
+    def curve(elapsed: float) -> float:
+        if elapsed >= duration:
+            return end
+        return start + (end - start) * max(0.0, elapsed) / duration
+
+    return curve
+
+
+def scripted(points: Sequence[Tuple[float, float]], loop: bool = False) -> Curve:
+    """Interpolate linearly between (seconds, value) points."""
+    points = sorted(points)
+    if not points:
+        raise ValueError("A scripted curve needs at least one point")
+    span = points[-1][0]
+
+    def curve(elapsed: float) -> float:
+        if loop and span > 0:
+            elapsed %= span
+        if elapsed <= points[0][0]:
+            return points[0][1]
+        for (t0, v0), (t1, v1) in zip(points, points[1:]):
+            if elapsed <= t1:
+                return v0 + (v1 - v0) * (elapsed - t0) / (t1 - t0)
+        return points[-1][1]
+
+    return curve
+
+
+def noisy(curve: Curve, stddev: float, seed: Optional[int] = None) -> Curve:
+    """Add gaussian noise to another curve."""
+    rng = random.Random(seed)
+    return lambda elapsed: curve(elapsed) + rng.gauss(0.0, stddev)
+
+
+def offset(curve: Curve, delta: float) -> Curve:
+    """Shift another curve by a constant."""
+    return lambda elapsed: curve(elapsed) + delta
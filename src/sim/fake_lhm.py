@@ -0,0 +1,128 @@
+"""
+Stand-in for the LibreHardwareMonitor Computer and its hardware/sensor tree.
+"""
+
+from typing import Callable, List, Optional
+
+from .hardware import SimClock, SimCPU, SimGPU
+
+GPU_HARDWARE_TYPES = {"nvidia": "GpuNvidia", "amd": "GpuAmd", "intel": "GpuIntel"}
+
+
+class SimSensor:
+    """An ISensor: type, name, identifier and the value of the last Update()."""
+
+    def __init__(self, sensor_type: str, name: str, identifier: str, read: Callable):
+        self.SensorType = sensor_type
+        self.Name = name
+        self.Identifier = identifier
+        self.Value: Optional[float] = None
+        self._read = read
+
+
+class SimHardware:
+    """An IHardware node whose sensors are refreshed by Update()."""
+
+    def __init__(self, hardware_type: str, name: str, clock: SimClock, faults):
+        self.HardwareType = hardware_type
+        self.Name = name
+        self.Sensors: List[SimSensor] = []
+        self.SubHardware: list = []
+        self.updates = 0
+        self._clock = clock
+        self._faults = faults
+
+    def add(self, sensor_type: str, name: str, identifier: str, read: Callable):
+        """Add a sensor whose value is read(elapsed)."""
+        self.Sensors.append(SimSensor(sensor_type, name, identifier, read))
+
+    def Update(self):
+        """Refresh every sensor value from the simulated model."""
+        elapsed = self._clock.elapsed()
+        self.updates += 1
+        self._faults.check(elapsed, RuntimeError)
+        for sensor in self.Sensors:
+            sensor.Value = sensor._read(elapsed)
+
+
+def cpu_node(cpu: SimCPU, clock: SimClock) -> SimHardware:
+    """Build the Cpu node: core and package temperatures, load, clocks, power."""
+    node = SimHardware("Cpu", cpu.name, clock, cpu.faults)
+    prefix = "/intelcpu/0"
+    for i in range(cpu.cores):
+        node.add(
+            "Temperature",
+            f"CPU Core #{i + 1}",
+            f"{prefix}/temperature/{i}",
+            lambda t, i=i: cpu.core_temperatures(t)[i],
+        )
+    node.add(
+        "Temperature",
+        "CPU Package",
+        f"{prefix}/temperature/{cpu.cores}",
+        lambda t: max(cpu.core_temperatures(t)),
+    )
+    node.add("Load", "CPU Total", f"{prefix}/load/0", cpu.load)
+    for i in range(cpu.cores):
+        node.add(
+            "Clock",
+            f"CPU Core #{i + 1}",
+            f"{prefix}/clock/{i + 1}",
+            lambda t, i=i: cpu.clock(t) - i * 10.0,
+        )
+    node.add("Power", "CPU Package", f"{prefix}/power/0", cpu.power)
+    return node
+
+
+def gpu_node(gpu: SimGPU, index: int, clock: SimClock) -> SimHardware:
+    """Build a GPU node with core/hot spot temperatures, load, clock and power."""
+    hardware_type = GPU_HARDWARE_TYPES[gpu.vendor]
+    node = SimHardware(hardware_type, gpu.name, clock, gpu.faults)
+    prefix = f"/{hardware_type.lower()}/{index}"
+    node.add("Temperature", "GPU Core", f"{prefix}/temperature/0", gpu.temperature)
+    node.add(
+        "Temperature",
+        "GPU Hot Spot",
+        f"{prefix}/temperature/2",
+        lambda t: gpu.temperature(t) + 12.0,
+    )
+    node.add("Load", "GPU Core", f"{prefix}/load/0", gpu.load)
+    node.add("Clock", "GPU Core", f"{prefix}/clock/0", gpu.clock)
+    node.add("Power", "GPU Package", f"{prefix}/power/0", gpu.power)
+    return node
+
+
+class SimComputer:
+    """The Computer: exposes the nodes of the enabled hardware classes."""
+
+    def __init__(self, cpu: Optional[SimCPU], gpus: List[SimGPU], clock: SimClock):
+        self.IsCpuEnabled = False
+        self.IsGpuEnabled = False
+        self.IsMemoryEnabled = False
+        self.IsMotherboardEnabled = False
+        self.IsControllerEnabled = False
+        self.IsNetworkEnabled = False
+        self.IsStorageEnabled = False
+        self.opened = False
+        self._cpu = [cpu_node(cpu, clock)] if cpu else []
+        self._gpus = [gpu_node(gpu, i, clock) for i, gpu in enumerate(gpus)]
+
+    @property
+    def Hardware(self) -> List[SimHardware]:
+        """Top-level nodes of the enabled hardware classes."""
+        if not self.opened:
+            return []
+        hardware = []
+        if self.IsCpuEnabled:
+            hardware.extend(self._cpu)
+        if self.IsGpuEnabled:
+            hardware.extend(self._gpus)
+        return hardware
+
+    def Open(self):
+        """Open the Computer."""
+        self.opened = True
+
+    def Close(self):
+        """Close the Computer."""
+        self.opened = False
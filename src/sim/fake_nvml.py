@@ -0,0 +1,113 @@
+"""
+Stand-in for the pynvml module, serving the simulated NVIDIA GPUs.
+"""
+
+import types
+from typing import List
+
+from .hardware import SimClock, SimGPU
+
+NVML_ERROR_UNINITIALIZED = 1
+NVML_ERROR_NOT_FOUND = 6
+NVML_ERROR_GPU_IS_LOST = 15
+
+
+class NVMLError(Exception):
+    """pynvml's error type, carrying the NVML return code in `value`."""
+
+    def __init__(self, value: int, message: str = ""):
+        super().__init__(message or f"NVML error {value}")
+        self.value = value
+
+
+class _Utilization:
+    def __init__(self, gpu: float):
+        self.gpu = gpu
+        self.memory = 0
+
+
+class _PciInfo:
+    def __init__(self, bus_id: str):
+        self.busId = bus_id.encode()
+
+
+class SimNVML:
+    """NVML over the simulated GPUs; device handles are the SimGPU objects."""
+
+    def __init__(self, gpus: List[SimGPU], clock: SimClock):
+        self.gpus = gpus
+        self.clock = clock
+        self.initialized = 0
+
+    def _check(self, gpu: SimGPU):
+        if not self.initialized:
+            raise NVMLError(NVML_ERROR_UNINITIALIZED)
+        gpu.faults.check(
+            self.clock.elapsed(),
+            lambda message: NVMLError(NVML_ERROR_GPU_IS_LOST, message),
+        )
+
+    def nvmlInit(self):
+        self.initialized += 1
+
+    def nvmlShutdown(self):
+        self.initialized = max(0, self.initialized - 1)
+
+    def nvmlDeviceGetCount(self) -> int:
+        if not self.initialized:
+            raise NVMLError(NVML_ERROR_UNINITIALIZED)
+        return len(self.gpus)
+
+    def nvmlDeviceGetHandleByIndex(self, index: int) -> SimGPU:
+        if not self.initialized:
+            raise NVMLError(NVML_ERROR_UNINITIALIZED)
+        if not 0 <= index < len(self.gpus):
+            raise NVMLError(NVML_ERROR_NOT_FOUND)
+        return self.gpus[index]
+
+    def nvmlDeviceGetHandleByUUID(self, uuid) -> SimGPU:
+        if isinstance(uuid, bytes):
+            uuid = uuid.decode()
+        for gpu in self.gpus:
+            if gpu.uuid == uuid and not gpu.faults.in_outage(self.clock.elapsed()):
+                return gpu
+        raise NVMLError(NVML_ERROR_NOT_FOUND)
+
+    def nvmlDeviceGetName(self, handle: SimGPU) -> str:
+        return handle.name
+
+    def nvmlDeviceGetUUID(self, handle: SimGPU) -> str:
+        return handle.uuid
+
+    def nvmlDeviceGetPciInfo(self, handle: SimGPU) -> _PciInfo:
+        return _PciInfo(handle.pci_bus_id)
+
+    def nvmlDeviceGetTemperature(self, handle: SimGPU, sensor: int) -> int:
+        self._check(handle)
+        return int(round(handle.temperature(self.clock.elapsed())))
+
+    def nvmlDeviceGetUtilizationRates(self, handle: SimGPU) -> _Utilization:
+        self._check(handle)
+        return _Utilization(int(handle.load(self.clock.elapsed())))
+
+    def nvmlDeviceGetClockInfo(self, handle: SimGPU, clock_type: int) -> int:
+        self._check(handle)
+        return int(handle.clock(self.clock.elapsed()))
+
+    def nvmlDeviceGetPowerUsage(self, handle: SimGPU) -> int:
+        self._check(handle)
+        return int(handle.power(self.clock.elapsed()) * 1000)  # milliwatts
+
+
+def build_module(nvml: SimNVML) -> types.ModuleType:
+    """A module object exposing the pynvml functions used by the GPU monitor."""
+    module = types.ModuleType("pynvml")
+    module.__doc__ = "Simulated pynvml"
+    module.NVMLError = NVMLError
+    module.NVML_ERROR_UNINITIALIZED = NVML_ERROR_UNINITIALIZED
+    module.NVML_ERROR_NOT_FOUND = NVML_ERROR_NOT_FOUND
+    module.NVML_ERROR_GPU_IS_LOST = NVML_ERROR_GPU_IS_LOST
+    for name in dir(nvml):
+        if name.startswith("nvml"):
+            setattr(module, name, getattr(nvml, name))
+    return module
@@ -0,0 +1,208 @@
+"""
+Stand-in for pyusb (usb.core, usb.util, usb.backend.libusb1) serving the
+simulated display, plus the hotplug part of the usb1 (libusb1) package.
+"""
+
+import errno
+import queue
+import types
+from typing import Dict, List, Optional
+
+from .hardware import SimClock, SimDisplay
+
+ENDPOINT_OUT = 0x00
+ENDPOINT_IN = 0x80
+ENDPOINT_TYPE_INTR = 0x03
+
+CAP_HAS_HOTPLUG = 0x0001
+HOTPLUG_ENUMERATE = 1
+HOTPLUG_EVENT_DEVICE_ARRIVED = 0x01
+HOTPLUG_EVENT_DEVICE_LEFT = 0x02
+
+
+class USBError(IOError):
+    """pyusb's error type."""
+
+    def __init__(self, strerror: str, error_code: Optional[int] = None, errno=None):
+        super().__init__(errno, strerror)
+        self.backend_error_code = error_code
+
+
+class SimEndpoint:
+    def __init__(self, address: int, attributes: int):
+        self.bEndpointAddress = address
+        self.bmAttributes = attributes
+
+
+class SimConfiguration:
+    """Configuration whose (0, 0) interface has one interrupt OUT endpoint."""
+
+    def __init__(self):
+        self.interfaces = {(0, 0): [SimEndpoint(0x03, ENDPOINT_TYPE_INTR)]}
+
+    def __getitem__(self, key):
+        return self.interfaces[key]
+
+
+class SimUSBDevice:
+    """The display as pyusb sees it; dead once the display is unplugged."""
+
+    def __init__(self, display: SimDisplay, clock: SimClock):
+        self.display = display
+        self.clock = clock
+        self.generation = display.generation
+        self.idVendor = display.VENDOR_ID
+        self.idProduct = display.PRODUCT_ID
+        self.bus = display.bus
+        self.port_numbers = display.port_numbers
+        self.configuration = SimConfiguration()
+        self.descriptor_reads = 0
+
+    def _check_attached(self):
+        self.display.update(self.clock.elapsed())
+        if not self.display.present or self.generation != self.display.generation:
+            raise USBError("No such device", errno=errno.ENODEV)
+
+    def set_configuration(self, configuration=None):
+        self._check_attached()
+
+    def get_active_configuration(self) -> SimConfiguration:
+        self._check_attached()
+        self.descriptor_reads += 1
+        return self.configuration
+
+    def write(self, endpoint: int, data, timeout: Optional[int] = None) -> int:
+        self._check_attached()
+        self.display.faults.check(
+            self.clock.elapsed(),
+            lambda message: USBError(message, errno=errno.ETIMEDOUT),
+            timeout / 1000.0 if timeout else None,
+        )
+        self.display.receive(bytes(data))
+        return len(data)
+
+
+class SimUSB:
+    """usb.core.find over the simulated display."""
+
+    def __init__(self, display: SimDisplay, clock: SimClock, hotplug: bool = False):
+        self.display = display
+        self.clock = clock
+        self.hotplug = hotplug  # whether usb1 reports hotplug support
+        self.finds = 0
+
+    def find(self, find_all: bool = False, backend=None, **match):
+        self.finds += 1
+        self.display.update(self.clock.elapsed())
+        device = None
+        if self.display.present and all(
+            match.get(name, value) == value
+            for name, value in (
+                ("idVendor", self.display.VENDOR_ID),
+                ("idProduct", self.display.PRODUCT_ID),
+            )
+        ):
+            device = SimUSBDevice(self.display, self.clock)
+        if find_all:
+            return iter([device] if device else [])
+        return device
+
+
+class SimUSBContext:
+    """usb1.USBContext, delivering display attach/detach as hotplug events."""
+
+    def __init__(self, usb: SimUSB):
+        self.usb = usb
+        self._events: "queue.Queue[str]" = queue.Queue()
+        self._callbacks: List[tuple] = []
+
+    def open(self) -> "SimUSBContext":
+        self.usb.display.listeners.append(self._events.put)
+        return self
+
+    def close(self):
+        if self._events.put in self.usb.display.listeners:
+            self.usb.display.listeners.remove(self._events.put)
+
+    def hasCapability(self, capability: int) -> bool:
+        return capability == CAP_HAS_HOTPLUG and self.usb.hotplug
+
+    def hotplugRegisterCallback(
+        self,
+        callback,
+        events: int = HOTPLUG_EVENT_DEVICE_ARRIVED | HOTPLUG_EVENT_DEVICE_LEFT,
+        flags: int = HOTPLUG_ENUMERATE,
+        vendor_id: int = -1,
+        product_id: int = -1,
+        dev_class: int = -1,
+    ) -> int:
+        self._callbacks.append((callback, events))
+        if flags & HOTPLUG_ENUMERATE and self.usb.display.present:
+            self._events.put("arrived")
+        return len(self._callbacks)
+
+    def handleEventsTimeout(self, tv: float = 0):
+        """Wait up to tv seconds for an event and run the matching callbacks."""
+        self.usb.display.update(self.usb.clock.elapsed())
+        try:
+            event = self._events.get(timeout=tv) if tv else self._events.get_nowait()
+        except queue.Empty:
+            return
+        code = (
+            HOTPLUG_EVENT_DEVICE_ARRIVED
+            if event == "arrived"
+            else HOTPLUG_EVENT_DEVICE_LEFT
+        )
+        for callback, events in list(self._callbacks):
+            if events & code:
+                callback(self, None, code)
+
+
+def build_usb1_module(usb: SimUSB) -> types.ModuleType:
+    """A module object exposing the usb1 hotplug API."""
+    module = types.ModuleType("usb1")
+    module.__doc__ = "Simulated usb1"
+    module.USBContext = lambda: SimUSBContext(usb)
+    module.CAP_HAS_HOTPLUG = CAP_HAS_HOTPLUG
+    module.HOTPLUG_ENUMERATE = HOTPLUG_ENUMERATE
+    module.HOTPLUG_EVENT_DEVICE_ARRIVED = HOTPLUG_EVENT_DEVICE_ARRIVED
+    module.HOTPLUG_EVENT_DEVICE_LEFT = HOTPLUG_EVENT_DEVICE_LEFT
+    return module
+
+
+def build_modules(usb: SimUSB) -> Dict[str, types.ModuleType]:
+    """Module objects for usb, usb.core, usb.util, usb.backend(.libusb1)."""
+    core = types.ModuleType("usb.core")
+    core.find = usb.find
+    core.USBError = USBError
+
+    util = types.ModuleType("usb.util")
+    util.ENDPOINT_OUT = ENDPOINT_OUT
+    util.ENDPOINT_IN = ENDPOINT_IN
+    util.ENDPOINT_TYPE_INTR = ENDPOINT_TYPE_INTR
+    util.endpoint_direction = lambda address: address & 0x80
+    util.endpoint_type = lambda attributes: attributes & 0x03
+    util.find_descriptor = lambda descriptors, custom_match=None, **kwargs: next(
+        (d for d in descriptors if custom_match is None or custom_match(d)), None
+    )
+    util.dispose_resources = lambda device: None
+
+    libusb1 = types.ModuleType("usb.backend.libusb1")
+    libusb1.get_backend = lambda find_library=None: object()
+
+    backend = types.ModuleType("usb.backend")
+    backend.libusb1 = libusb1
+
+    package = types.ModuleType("usb")
+    package.__path__ = []  # a package, so "import usb.core" resolves
+    package.core = core
+    package.util = util
+    package.backend = backend
+
+    return {
+        "usb": package,
+        "usb.core": core,
+        "usb.util": util,
+        "usb.backend": backend,
+        "usb.backend.libusb1": libusb1,
+    }
@@ -0,0 +1,120 @@
+"""
+Stand-in for the wmi package, answering the WQL queries the CPU monitor makes.
+"""
+
+import re
+import types
+from typing import Any, Callable, Dict, List, Optional
+
+from .faults import FaultInjector
+from .hardware import SimClock, SimCPU
+
+_WQL = re.compile(
+    r"^SELECT\s+(?P<properties>.+?)\s+FROM\s+(?P<wmi_class>\w+)"
+    r"(?:\s+WHERE\s+(?P<where>.+))?$",
+    re.IGNORECASE,
+)
+_CLAUSE = re.compile(r"(\w+)\s*=\s*'([^']*)'")
+
+
+class x_wmi(Exception):
+    """The wmi package's error type."""
+
+
+class SimWMIObject:
+    """A WMI instance exposing its properties as attributes."""
+
+    def __init__(self, properties: Dict[str, Any]):
+        self.__dict__.update(properties)
+
+
+class SimWMIConnection:
+    """A connection to one namespace; query() understands projected WQL."""
+
+    def __init__(self, wmi: "SimWMI", namespace: str):
+        self.wmi = wmi
+        self.namespace = namespace
+
+    def query(self, wql: str) -> List[SimWMIObject]:
+        match = _WQL.match(wql.strip())
+        if not match:
+            raise x_wmi(f"Invalid query: {wql}")
+
+        wmi = self.wmi
+        wmi.queries += 1
+        wmi.faults.check(wmi.clock.elapsed(), x_wmi)
+
+        provider = wmi.classes.get(self.namespace, {}).get(match["wmi_class"])
+        if provider is None:
+            raise x_wmi(f"Invalid class: {match['wmi_class']}")
+
+        where = dict(_CLAUSE.findall(match["where"] or ""))
+        rows = [
+            row
+            for row in provider(wmi.clock.elapsed())
+            if all(str(row.get(name)) == value for name, value in where.items())
+        ]
+        return [SimWMIObject(row) for row in rows]
+
+
+class SimWMI:
+    """The WMI service with the classes a Windows box would expose for the CPU."""
+
+    def __init__(
+        self,
+        cpu: Optional[SimCPU],
+        clock: SimClock,
+        hardware_monitor: Optional[str] = "root\\LibreHardwareMonitor",
+        faults: Optional[FaultInjector] = None,
+    ):
+        self.clock = clock
+        self.faults = faults or FaultInjector()
+        self.queries = 0
+        self.classes: Dict[str, Dict[str, Callable[[float], List[dict]]]] = {
+            "root\\cimv2": {},
+        }
+        if cpu is None:
+            return
+
+        def kelvin_tenths(elapsed: float) -> int:
+            return int(round((cpu.temperature(elapsed) + 273.15) * 10))
+
+        cimv2 = self.classes["root\\cimv2"]
+        cimv2["MSAcpi_ThermalZoneTemperature"] = lambda elapsed: [
+            {
+                "InstanceName": "ACPI\\ThermalZone\\TZ00_0",
+                "CurrentTemperature": kelvin_tenths(elapsed),
+            }
+        ]
+        cimv2["Win32_TemperatureProbe"] = lambda elapsed: []
+        cimv2["Win32_PerfRawData_Counters_ThermalZoneInformation"] = lambda elapsed: [
+            {"Name": "\\_TZ.TZ00", "Temperature": kelvin_tenths(elapsed)}
+        ]
+
+        if hardware_monitor:
+            # The sensor table of a running OHM/LHM application
+            self.classes[hardware_monitor] = {
+                "Sensor": lambda elapsed: [
+                    {
+                        "Name": f"CPU Core #{i + 1}",
+                        "Value": value,
+                        "SensorType": "Temperature",
+                    }
+                    for i, value in enumerate(cpu.core_temperatures(elapsed))
+                ]
+            }
+
+    def WMI(self, namespace: str = "root\\cimv2", **kwargs) -> SimWMIConnection:
+        """Connect to a namespace, failing like wmi does when it does not exist."""
+        if namespace not in self.classes:
+            raise x_wmi(f"Invalid namespace: {namespace}")
+        return SimWMIConnection(self, namespace)
+
+
+def build_module(wmi: SimWMI) -> types.ModuleType:
+    """A module object exposing wmi.WMI and wmi.x_wmi."""
+    module = types.ModuleType("wmi")
+    module.__doc__ = "Simulated wmi"
+    module.WMI = wmi.WMI
+    module.x_wmi = x_wmi
+    return module
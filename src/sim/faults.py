@@ -0,0 +1,64 @@
+"""
+Latency and failure injection for simulated hardware calls.
+"""
+
+import random
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+
+class FaultInjector:
+    """Delays and fails calls into one simulated device.
+
+    Failures are random (`failure_rate`) or scripted as outage windows of
+    (start, end) seconds since the simulation started, during which every call
+    fails, e.g. to model a driver reset or an unplugged cable.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        outages: Sequence[Tuple[float, float]] = (),
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency  # seconds added to every call
+        self.jitter = jitter  # +/- seconds of random extra latency
+        self.failure_rate = failure_rate  # probability that a call fails
+        self.outages: List[Tuple[float, float]] = list(outages)
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+
+    def in_outage(self, elapsed: float) -> bool:
+        """Whether a scripted outage covers this moment."""
+        return any(start <= elapsed < end for start, end in self.outages)
+
+    def check(
+        self,
+        elapsed: float,
+        make_error: Callable[[str], Exception],
+        timeout: Optional[float] = None,
+    ):
+        """Apply the latency, then raise `make_error(...)` if this call fails.
+
+        A call whose latency exceeds `timeout` seconds fails after the timeout.
+        """
+        self.calls += 1
+        delay = self.latency
+        if self.jitter:
+            delay += self._rng.uniform(-self.jitter, self.jitter)
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            self.failures += 1
+            raise make_error("simulated timeout")
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.in_outage(elapsed):
+            self.failures += 1
+            raise make_error("simulated outage")
+        if self.failure_rate and self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise make_error("simulated failure")
@@ -0,0 +1,148 @@
+"""
+Simulated CPU, GPU and display models shared by the fake backends.
+"""
+
+import collections
+import time
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+from . import curves
+from .curves import Curve
+from .faults import FaultInjector
+
+
+class SimClock:
+    """Seconds elapsed since the simulation started."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds since the start."""
+        return time.monotonic() - self.started
+
+
+class SimCPU:
+    """A CPU whose cores follow the temperature curve with fixed offsets."""
+
+    def __init__(
+        self,
+        name: str = "Simulated CPU",
+        cores: int = 8,
+        temperature: Curve = curves.sine(60.0, 12.0, 60.0),
+        load: Curve = curves.sine(35.0, 30.0, 45.0),
+        clock: Curve = curves.sine(4200.0, 400.0, 30.0),
+        power: Curve = curves.sine(65.0, 40.0, 45.0),
+        faults: Optional[FaultInjector] = None,
+    ):
+        self.name = name
+        self.cores = cores
+        self.temperature = temperature
+        self.load = load
+        self.clock = clock
+        self.power = power
+        self.faults = faults or FaultInjector()
+
+    def core_temperatures(self, elapsed: float) -> List[float]:
+        """Per-core temperatures; the package reads the hottest core."""
+        base = self.temperature(elapsed)
+        return [base + (i % 4) * 1.5 - 2.0 for i in range(self.cores)]
+
+
+class SimGPU:
+    """A GPU of a given vendor ("nvidia", "amd", "intel")."""
+
+    def __init__(
+        self,
+        vendor: str = "nvidia",
+        name: str = "Simulated GPU",
+        temperature: Curve = curves.sine(55.0, 15.0, 40.0),
+        load: Curve = curves.sine(50.0, 45.0, 40.0),
+        clock: Curve = curves.constant(1800.0),
+        power: Curve = curves.sine(180.0, 100.0, 40.0),
+        uuid: Optional[str] = None,
+        pci_bus_id: Optional[str] = None,
+        faults: Optional[FaultInjector] = None,
+    ):
+        self.vendor = vendor
+        self.name = name
+        self.temperature = temperature
+        self.load = load
+        self.clock = clock
+        self.power = power
+        self.uuid = uuid
+        self.pci_bus_id = pci_bus_id
+        self.faults = faults or FaultInjector()
+
+
+class SimDisplay:
+    """The Antec Flux Pro display: records every frame written to it.
+
+    `unplugged` lists (start, end) windows in seconds since the simulation
+    started during which the cable is pulled. Every attach is a new device
+    generation, so handles opened before a replug stay dead, as with libusb.
+    """
+
+    VENDOR_ID = 0x2022
+    PRODUCT_ID = 0x0522
+
+    def __init__(
+        self,
+        present: bool = True,
+        faults: Optional[FaultInjector] = None,
+        history: int = 1000,
+        unplugged: Sequence[Tuple[float, float]] = (),
+        bus: int = 1,
+        port_numbers: Tuple[int, ...] = (3,),
+    ):
+        self.present = present
+        self.bus = bus
+        self.port_numbers = port_numbers
+        self.faults = faults or FaultInjector()
+        self.unplugged: List[Tuple[float, float]] = list(unplugged)
+        # (monotonic arrival time, frame bytes), newest last
+        self.frames: Deque[Tuple[float, bytes]] = collections.deque(maxlen=history)
+        self.writes = 0
+        self.generation = 0
+        # Called with "arrived" or "left" on every attach/detach (hotplug)
+        self.listeners: List[Callable[[str], None]] = []
+        self._scheduled_out = False
+
+    def attach(self, port_numbers: Optional[Tuple[int, ...]] = None):
+        """Plug the display in, optionally into another port."""
+        if self.present:
+            return
+        if port_numbers is not None:
+            self.port_numbers = port_numbers
+        self.present = True
+        self.generation += 1
+        for listener in list(self.listeners):
+            listener("arrived")
+
+    def detach(self):
+        """Unplug the display; writes fail until it is attached again."""
+        if not self.present:
+            return
+        self.present = False
+        for listener in list(self.listeners):
+            listener("left")
+
+    def update(self, elapsed: float):
+        """Apply the scheduled unplug windows at this moment."""
+        out = any(start <= elapsed < end for start, end in self.unplugged)
+        if out and not self._scheduled_out:
+            self._scheduled_out = True
+            self.detach()
+        elif not out and self._scheduled_out:
+            self._scheduled_out = False
+            self.attach()
+
+    def receive(self, frame: bytes):
+        """Record a frame written by the host."""
+        self.writes += 1
+        self.frames.append((time.monotonic(), bytes(frame)))
+
+    @property
+    def last_frame(self) -> Optional[bytes]:
+        """The most recent frame, if any."""
+        return self.frames[-1][1] if self.frames else None
@@ -0,0 +1,83 @@
+"""
+Sinks for the monitoring engine: the display, the console log and the sample
+history.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from .engine import Sink, Update
+
+if TYPE_CHECKING:
+    from .history import History  # imports NumPy, so only when the history is on
+
+
+class DisplaySink(Sink):
+    """Shows the CPU and GPU temperatures on a display backend."""
+
+    name = "display"
+
+    def __init__(self, device, log: Optional[Callable[[str], None]] = None):
+        self.device = device  # USBDevice or VirtualDisplay
+        self.log = log
+
+    def update(self, update: Update):
+        # Display backends write from their own thread, so this never blocks
+        self.device.send_temperatures(
+            update.temperature("cpu"),
+            update.temperature("gpu"),
+            captured=update.captured(),
+        )
+
+    def close(self):
+        """Clear the display, then close it."""
+        if self.log is not None:
+            self.log("Clearing display...")
+        try:
+            self.device.send_temperatures(0.0, 0.0, force=True)
+        finally:
+            self.device.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.device.stats() if hasattr(self.device, "stats") else {}
+
+
+class ConsoleSink(Sink):
+    """Prints one line per update with each source's temperature and metrics."""
+
+    name = "console"
+
+    def __init__(self, write: Callable[[str], None] = print):
+        self.write = write
+
+    def update(self, update: Update):
+        parts = []
+        for name in ("cpu", "gpu"):
+            snapshot = update.get(name)
+            temperature = update.temperature(name)
+            part = f"{name.upper()}: "
+            part += f"{temperature:.1f}°C" if temperature is not None else "--°C"
+            if snapshot is not None and snapshot.format():
+                part += f" ({snapshot.format()})"
+            parts.append(part)
+        self.write(" | ".join(parts))
+
+
+class HistorySink(Sink):
+    """Records every new snapshot in the in-memory sample history."""
+
+    name = "history"
+
+    def __init__(self, history: "History"):
+        self.history = history
+        self._recorded: Dict[str, float] = {}  # last recorded timestamp per source
+
+    def update(self, update: Update):
+        for name, snapshot in update.snapshots.items():
+            # A snapshot stays the latest for several ticks when sampled slower
+            if snapshot is None or self._recorded.get(name) == snapshot.timestamp:
+                continue
+            self._recorded[name] = snapshot.timestamp
+            self.history.record(name, snapshot)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.history.stats()
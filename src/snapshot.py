@@ -0,0 +1,69 @@
+"""
+Compact multi-metric hardware snapshots.
+A snapshot is captured with a single hardware update pass and shared by every
+consumer (display, logs, exporters) instead of each one reading the hardware.
+"""
+
+import time
+from typing import Dict, Iterable, Optional
+
+# Metrics a snapshot can carry, with their units
+METRICS = ("temperature", "load", "clock", "power")
+UNITS = {"temperature": "°C", "load": "%", "clock": "MHz", "power": "W"}
+
+
+class HardwareSnapshot:
+    """One capture of the requested metrics; unread metrics stay None."""
+
+    __slots__ = ("timestamp",) + METRICS
+
+    def __init__(self, timestamp: Optional[float] = None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.temperature: Optional[float] = None
+        self.load: Optional[float] = None
+        self.clock: Optional[float] = None
+        self.power: Optional[float] = None
+
+    def get(self, metric: str) -> Optional[float]:
+        """Value of a metric by name."""
+        return getattr(self, metric)
+
+    def set(self, metric: str, value: Optional[float]):
+        """Set a metric by name."""
+        setattr(self, metric, value)
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        """Metrics as a dictionary, for exporters and logs."""
+        return {metric: getattr(self, metric) for metric in METRICS}
+
+    def format(self, metrics: Iterable[str] = METRICS) -> str:
+        """Human readable summary of the non-temperature metrics that were read."""
+        parts = []
+        for metric in metrics:
+            value = getattr(self, metric)
+            if metric != "temperature" and value is not None:
+                parts.append(f"{value:.0f}{UNITS[metric]}")
+        return " ".join(parts)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{m}={getattr(self, m)}" for m in METRICS)
+        return f"HardwareSnapshot({values})"
+
+
+def validate_metrics(metrics: Iterable[str]) -> tuple:
+    """Check requested metric names, always including temperature."""
+    metrics = tuple(metrics)
+    unknown = [metric for metric in metrics if metric not in METRICS]
+    if unknown:
+        raise ValueError(
+            f"Unknown metrics: {', '.join(unknown)} (available: {', '.join(METRICS)})"
+        )
+    if "temperature" not in metrics:
+        metrics = ("temperature",) + metrics
+    return metrics
+
+
+def captured(*snapshots: Optional[HardwareSnapshot]) -> Optional[float]:
+    """Capture time of the oldest snapshot present, for latency measurements."""
+    timestamps = [s.timestamp for s in snapshots if s is not None]
+    return min(timestamps) if timestamps else None
@@ -3,52 +3,209 @@ USB communication with Antec Flux Pro display.
 Uses pyusb for cross-platform USB communication.
 """
 
+import errno
+import os
+import time
 import usb.core
 import usb.util
 import usb.backend.libusb1
-from typing import Optional
+from typing import Any, Callable, List, Optional, Tuple
+
+from .breaker import OPEN, CircuitBreaker
+from .frame import ChangeFilter, FrameEncoder
+from .hotplug import HotplugMonitor
+from .usb_cache import USBResolutionCache
+from .writer import FrameWriter, LatencyTracker
+
+# Write errors meaning the device is gone (unplugged, driver reset)
+DISCONNECT_ERRNOS = (errno.ENODEV, errno.ENOENT, errno.EIO, errno.EPIPE)
+# libusb LIBUSB_ERROR_IO and LIBUSB_ERROR_NO_DEVICE
+DISCONNECT_LIBUSB_ERRORS = (-1, -4)
+LIBUSB_ERROR_TIMEOUT = -7
 
 
 class USBDevice:
-    """USB communication with Antec Flux Pro display."""
+    """USB communication with Antec Flux Pro display.
+
+    When the display disappears, writes stop and the device is looked for
+    again: on libusb hotplug events where available, otherwise by enumerating
+    the bus at most every `probe_interval` seconds (as after write failures,
+    which leave the display enumerated). Failed attempts to open a
+    display that is present back off exponentially.
+
+    Frames are written by a writer thread: send_temperatures() only posts the
+    newest temperatures, and the write timeout adapts to the observed write
+    latency, so a stalled endpoint never blocks the caller.
+
+    The resolved backend, the display's bus/port location and its endpoint are
+    kept in `cache_path` (when given), so later connects load the known
+    backend directly and skip the descriptor search while the display stays
+    on the same port.
+    """
 
     VENDOR_ID = 0x2022
     PRODUCT_ID = 0x0522
+    # Consecutive failed writes (of any kind) before the device is reopened
+    MAX_WRITE_ERRORS = 3
 
-    def __init__(self):
+    def __init__(
+        self,
+        hysteresis: float = 0.0,
+        keepalive: float = 5.0,
+        wait_for_device: bool = False,
+        probe_interval: float = 1.0,
+        reconnect_backoff: float = 1.0,
+        reconnect_max_backoff: float = 30.0,
+        write_timeout: float = 1.0,
+        min_write_timeout: float = 0.1,
+        threaded: bool = True,
+        cache_path: Optional[str] = None,
+        started: Optional[float] = None,
+        log: Callable[[str], None] = print,
+    ):
+        # Monotonic start of the program, for the time to the first frame
+        self.started = time.monotonic() if started is None else started
         self.device = None
         self.endpoint = None
-        self._connect()
+        self.backend = None
+        self.backend_name: Optional[str] = None
+        self.backend_library: Optional[str] = None
+        self._backend_resolved = False
+        self.cache = USBResolutionCache(cache_path, self.VENDOR_ID, self.PRODUCT_ID)
+        self.resolution: Optional[str] = None  # "cached" or "scan"
+        self.connect_time: Optional[float] = None  # seconds the last connect took
+        self.first_frame_time: Optional[float] = None  # seconds after start
+        self._unverified = False  # opened, but no frame written yet
+        self.encoder = FrameEncoder()
+        # Skip frames the display is already showing
+        self.filter = ChangeFilter(hysteresis, keepalive)
+        self.latency = LatencyTracker(min_write_timeout, write_timeout)
+        self.probe_interval = probe_interval
+        self.log = log
+        self.breaker = CircuitBreaker(
+            "Display connection",
+            failure_threshold=1,
+            backoff=reconnect_backoff,
+            max_backoff=reconnect_max_backoff,
+            log=log,
+        )
+        self.connects = 0
+        self.disconnects = 0
+        self.write_errors = 0  # consecutive failed writes
+        self.failed_writes = 0
+        self._next_probe = 0.0
+        self._unplugged = False  # the last disconnect was a hotplug departure
+        self._closed = False
+
+        try:
+            self._connect()
+        except RuntimeError as e:
+            if not wait_for_device:
+                raise
+            log(f"Warning: {e}")
+            log("Waiting for the display to be connected...")
+        except usb.core.USBError as e:
+            # Present, but failed to open (busy, access denied, reset): retried
+            # with the reconnect backoff
+            if not wait_for_device:
+                raise
+            self.device = None
+            self.breaker.failure(e)
+        self.hotplug = HotplugMonitor.start(self.VENDOR_ID, self.PRODUCT_ID)
+
+        # Owns the device from here on: writes and reconnects run on it
+        self.writer: Optional[FrameWriter] = None
+        if threaded:
+            self.writer = FrameWriter("usb-writer", self._deliver)
+            self.writer.start()
+
+    @property
+    def connected(self) -> bool:
+        """Whether the display is currently open."""
+        return self.device is not None
 
     def _connect(self):
         """Connect to the USB device."""
+        started = time.monotonic()
+        device = self._find()
+        if device is None:
+            raise RuntimeError(
+                f"USB device not found (VID:{self.VENDOR_ID:04x}, PID:{self.PRODUCT_ID:04x}).\n"
+                "Make sure:\n"
+                "1. Antec Flux Pro case is connected via USB\n"
+                "2. Device appears in Windows Device Manager\n"
+                "3. WinUSB driver is installed (use Zadig tool)"
+            )
+        self._open(device)
+        self.connects += 1
+        self.connect_time = time.monotonic() - started
+
+    def _find_backend(self):
+        """Pick the libusb backend."""
+        # Try multiple backends for Windows compatibility
+        backend = None
+
+        # First try libusb-package (includes Windows binaries)
         try:
-            # Try multiple backends for Windows compatibility
-            backend = None
+            import libusb_package
 
-            # First try libusb-package (includes Windows binaries)
+            backend = usb.backend.libusb1.get_backend(
+                find_library=libusb_package.find_library
+            )
+            if backend is not None:
+                self.backend_name = "libusb-package"
+                get_library_path = getattr(libusb_package, "get_library_path", None)
+                library = get_library_path() if get_library_path else None
+                self.backend_library = str(library) if library else None
+            print("Using libusb-package backend")
+        except Exception as e:
+            print(f"libusb-package backend failed: {e}")
+
+        # Fallback to other backends
+        if backend is None:
             try:
-                import libusb_package
-                import usb.backend.libusb1
+                backend = usb.backend.libusb1.get_backend()
+                self.backend_name = "system"
+                print("Using system libusb1 backend")
+            except Exception:
+                self.backend_name = "default"
+                print("No libusb1 backend available, using default")
+        return backend
 
+    def _cached_backend(self) -> bool:
+        """Load the backend that worked last time; False if it is unusable."""
+        name = self.cache.get("backend")
+        library = self.cache.get("library")
+        try:
+            if name == "libusb-package" and library and os.path.exists(library):
                 backend = usb.backend.libusb1.get_backend(
-                    find_library=libusb_package.find_library
+                    find_library=lambda candidate: library
                 )
-                print("Using libusb-package backend")
-            except Exception as e:
-                print(f"libusb-package backend failed: {e}")
-
-            # Fallback to other backends
-            if backend is None:
-                try:
-                    backend = usb.backend.libusb1.get_backend()
-                    print("Using system libusb1 backend")
-                except Exception:
-                    print("No libusb1 backend available, using default")
+            elif name == "system":
+                backend = usb.backend.libusb1.get_backend()
+            else:
+                return False
+        except Exception:
+            return False
+        if backend is None:
+            return False
+        self.backend = backend
+        self.backend_name = name
+        self.backend_library = library
+        return True
+
+    def _find(self):
+        """Look for the display on the bus; None if it is not connected."""
+        try:
+            # The backend is resolved once, so re-enumerating the bus is cheap
+            if not self._backend_resolved:
+                if not self._cached_backend():
+                    self.backend = self._find_backend()
+                self._backend_resolved = True
 
             # Find the device
-            self.device = usb.core.find(
-                idVendor=self.VENDOR_ID, idProduct=self.PRODUCT_ID, backend=backend
+            return usb.core.find(
+                idVendor=self.VENDOR_ID, idProduct=self.PRODUCT_ID, backend=self.backend
             )
 
         except Exception as e:
@@ -67,95 +224,253 @@ class USBDevice:
             else:
                 raise RuntimeError(f"USB error: {e}")
 
-        if self.device is None:
-            raise RuntimeError(
-                f"USB device not found (VID:{self.VENDOR_ID:04x}, PID:{self.PRODUCT_ID:04x}).\n"
-                "Make sure:\n"
-                "1. Antec Flux Pro case is connected via USB\n"
-                "2. Device appears in Windows Device Manager\n"
-                "3. WinUSB driver is installed (use Zadig tool)"
-            )
+    def _open(self, device):
+        """Configure the device and find its interrupt OUT endpoint."""
+        bus, ports = _location(device)
+        endpoint = self.cache.endpoint_for(bus, ports)
 
         # On Windows, we don't need to detach kernel drivers
         # Set the active configuration
         try:
-            self.device.set_configuration()
+            device.set_configuration()
         except usb.core.USBError as e:
             print(f"Warning: Could not set USB configuration: {e}")
 
+        if endpoint is not None:
+            # Same device on the same port: reuse the endpoint found last time
+            self.endpoint = endpoint
+            self.resolution = "cached"
+        else:
+            self.endpoint = self._find_endpoint(device)
+            self.resolution = "scan"
+        self._unverified = True
+        self.device = device
+        self.write_errors = 0
+
+    def _find_endpoint(self, device) -> int:
+        """Search the descriptors for the interrupt OUT endpoint."""
         # Find the interrupt OUT endpoint
-        cfg = self.device.get_active_configuration()
+        cfg = device.get_active_configuration()
         intf = cfg[(0, 0)]
 
-        self.endpoint = usb.util.find_descriptor(
+        endpoint = usb.util.find_descriptor(
             intf,
             custom_match=lambda e: usb.util.endpoint_direction(e.bEndpointAddress)
             == usb.util.ENDPOINT_OUT
             and usb.util.endpoint_type(e.bmAttributes) == usb.util.ENDPOINT_TYPE_INTR,
         )
 
-        if self.endpoint is None:
+        if endpoint is None:
             # Fallback to default endpoint
-            self.endpoint = 0x03
+            return 0x03
+        return endpoint.bEndpointAddress
+
+    def _remember(self):
+        """Persist the resolution once a frame went through."""
+        bus, ports = _location(self.device)
+        self.cache.update(
+            backend=self.backend_name,
+            library=self.backend_library,
+            bus=bus,
+            ports=ports,
+            endpoint=self.endpoint,
+        )
+
+    def _reconnect_due(self) -> bool:
+        """Whether to look for the display on this tick."""
+        if self.breaker.state == OPEN:
+            # A present display failed to open: wait out the backoff
+            return self.breaker.retry_in() == 0
+        if self.hotplug is not None and self.hotplug.running:
+            if self.hotplug.take_departure():
+                self._unplugged = True  # reported after a failed write
+            if self._unplugged:
+                return self.hotplug.take_arrival()
+            # Still enumerated (a driver reset, a stalled endpoint): no arrival
+            # event will come, so enumerate the bus below
+            self.hotplug.take_arrival()
+        # Probes are made on ticks one probe_interval apart; a tick that comes
+        # a little early must not wait for the next one
+        now = time.monotonic()
+        if now < self._next_probe - self.probe_interval / 2:
+            return False
+        self._next_probe = now + self.probe_interval
+        return True
+
+    def _reconnect(self) -> bool:
+        """Reopen the display if it has come back."""
+        if self._closed or not self._reconnect_due() or not self.breaker.allow():
+            return False
+        started = time.monotonic()
+        try:
+            device = self._find()
+            if device is None:
+                return False
+            self._open(device)
+        except Exception as e:
+            self.device = None
+            self.breaker.failure(e)
+            return False
+
+        self.breaker.success()
+        self.connects += 1
+        self.connect_time = time.monotonic() - started
+        if self.hotplug is not None:
+            # A departure reported after a failed write already noticed it
+            self.hotplug.take_departure()
+        # Repaint at once instead of waiting for a change or the keepalive
+        self.filter.reset()
+        self.log("Display connected")
+        return True
+
+    def _disconnect(self, reason, unplugged: bool = False):
+        """Drop the device after it went away; it is looked for again."""
+        self.log(f"Warning: Display disconnected ({reason}), waiting for it to return")
+        self._release()
+        self.disconnects += 1
+        self._unplugged = unplugged
+        self._next_probe = 0.0  # a driver reset may bring it back at once
+
+    def _release(self):
+        """Free the pyusb device."""
+        if self.device:
+            try:
+                usb.util.dispose_resources(self.device)
+            except:
+                pass
+            self.device = None
+
+    def configure(
+        self,
+        hysteresis: float,
+        keepalive: float,
+        probe_interval: float,
+        reconnect_backoff: float,
+        reconnect_max_backoff: float,
+        **options: Any,
+    ):
+        """Apply new frame filtering and reconnect settings to the open device."""
+        self.filter.hysteresis = max(0.0, hysteresis)
+        self.filter.keepalive = keepalive
+        self.probe_interval = probe_interval
+        self.breaker.backoff = reconnect_backoff
+        self.breaker.max_backoff = reconnect_max_backoff
+
+    def send_temperatures(
+        self,
+        cpu_temp: Optional[float],
+        gpu_temp: Optional[float],
+        force: bool = False,
+        captured: Optional[float] = None,
+    ):
+        """Send temperature data to the display; never blocks when threaded.
+
+        `captured` (when the readings were taken) is only used by sinks that
+        measure latency.
+        """
+        if self.writer is not None:
+            self.writer.post(cpu_temp, gpu_temp, force)
         else:
-            self.endpoint = self.endpoint.bEndpointAddress
+            self._deliver(cpu_temp, gpu_temp, force)
 
-    def send_temperatures(self, cpu_temp: Optional[float], gpu_temp: Optional[float]):
-        """Send temperature data to the display."""
-        if not self.device:
+    def _deliver(
+        self, cpu_temp: Optional[float], gpu_temp: Optional[float], force: bool
+    ):
+        """Write one frame, unless the display shows these temperatures already."""
+        if self.device and self.hotplug is not None and self.hotplug.take_departure():
+            self._disconnect("unplugged", unplugged=True)
+        if not self.device and not self._reconnect():
             return
 
         payload = self._generate_payload(cpu_temp, gpu_temp)
+        if not force and not self.filter.should_send(cpu_temp, gpu_temp, payload):
+            return
 
         try:
             # Use interrupt transfer for better compatibility
+            started = time.monotonic()
             bytes_written = self.device.write(
-                self.endpoint, payload, 1000
-            )  # 1 second timeout
+                self.endpoint, payload, self.latency.timeout_ms()
+            )
+            self.latency.record(time.monotonic() - started)
 
             if bytes_written != len(payload):
                 print(f"Warning: Only wrote {bytes_written} of {len(payload)} bytes")
+            self.filter.record(cpu_temp, gpu_temp, payload)
+            self.write_errors = 0
+            if self.first_frame_time is None:
+                self.first_frame_time = time.monotonic() - self.started
+            if self._unverified:
+                self._unverified = False
+                self._remember()
 
         except usb.core.USBError as e:
-            print(f"USB communication error: {e}")
+            if _is_timeout(e):
+                self.latency.timed_out()
+            if self._unverified and self.resolution == "cached":
+                # The cached endpoint may be stale: resolve in full next time
+                self.cache.clear()
+            self.write_errors += 1
+            self.failed_writes += 1
+            if _is_disconnect(e) or self.write_errors >= self.MAX_WRITE_ERRORS:
+                self._disconnect(e)
+            elif self.write_errors == 1:
+                print(f"USB communication error: {e}")
             # Don't raise exception to keep the program running
 
     def _generate_payload(
         self, cpu_temp: Optional[float], gpu_temp: Optional[float]
-    ) -> bytes:
-        """Generate the USB payload for temperature data."""
-        payload = bytearray([85, 170, 1, 1, 6])  # Header
+    ) -> memoryview:
+        """Generate the USB payload for temperature data (reuses one buffer)."""
+        return self.encoder.encode(cpu_temp, gpu_temp)
 
-        # Encode CPU temperature
-        cpu_encoded = self._encode_temperature(cpu_temp)
-        payload.extend(cpu_encoded)
+    def stats(self) -> dict:
+        """Frame, connection and write latency counters."""
+        stats = self.filter.stats()
+        stats["dropped"] = self.writer.mailbox.dropped if self.writer else 0
+        stats["connects"] = self.connects
+        stats["disconnects"] = self.disconnects
+        stats["failed_writes"] = self.failed_writes
+        stats["latency"] = self.latency.stats()
+        stats["resolution"] = self.resolution
+        stats["connect_ms"] = _ms(self.connect_time)
+        stats["time_to_first_frame_ms"] = _ms(self.first_frame_time)
+        return stats
 
-        # Encode GPU temperature
-        gpu_encoded = self._encode_temperature(gpu_temp)
-        payload.extend(gpu_encoded)
+    def close(self):
+        """Close the USB connection, after writing the last posted frame."""
+        if self.writer is not None:
+            self.writer.stop()
+        self._closed = True
+        if self.hotplug is not None:
+            self.hotplug.stop()
+        self._release()
 
-        # Calculate checksum
-        checksum = sum(payload) & 0xFF
-        payload.append(checksum)
 
-        return bytes(payload)
+def _is_disconnect(error: usb.core.USBError) -> bool:
+    """Whether a USB error means the device has gone away."""
+    return (
+        getattr(error, "errno", None) in DISCONNECT_ERRNOS
+        or getattr(error, "backend_error_code", None) in DISCONNECT_LIBUSB_ERRORS
+    )
 
-    def _encode_temperature(self, temp: Optional[float]) -> bytes:
-        """Encode temperature value for the display protocol."""
-        if temp is None:
-            return bytes([238, 238, 238])  # No data marker
 
-        ones = int(temp / 10.0)
-        tens = int(temp % 10.0)
-        tenths = int((temp * 10.0) % 10.0)
+def _is_timeout(error: usb.core.USBError) -> bool:
+    """Whether a USB error is a write timeout."""
+    timeout_error = getattr(usb.core, "USBTimeoutError", None)
+    return (
+        (timeout_error is not None and isinstance(error, timeout_error))
+        or getattr(error, "errno", None) == errno.ETIMEDOUT
+        or getattr(error, "backend_error_code", None) == LIBUSB_ERROR_TIMEOUT
+    )
 
-        return bytes([ones, tens, tenths])
 
-    def close(self):
-        """Close the USB connection."""
-        if self.device:
-            try:
-                usb.util.dispose_resources(self.device)
-            except:
-                pass
-            self.device = None
+def _location(device) -> Tuple[Optional[int], List[int]]:
+    """Bus number and port path of a pyusb device."""
+    ports = getattr(device, "port_numbers", None) or ()
+    return getattr(device, "bus", None), list(ports)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    """Seconds as rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
@@ -0,0 +1,93 @@
+"""
+Persisted USB resolution for the display.
+Remembers the libusb backend that worked, where the display sits on the bus
+and its interrupt OUT endpoint, so a reconnect or restart can skip backend
+discovery and the descriptor search.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+VERSION = 1
+
+
+class USBResolutionCache:
+    """Backend, bus/port location and endpoint of one device, as a JSON file.
+
+    With no path the cache only lives in memory.
+    """
+
+    def __init__(self, path: Optional[str], vendor_id: int, product_id: int):
+        self.path = path
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.data: Dict[str, Any] = {}
+        self.load()
+
+    def load(self):
+        """Read the cache file; an unreadable or foreign cache is ignored."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring USB cache {self.path}: {e}")
+            return
+        if (
+            isinstance(data, dict)
+            and data.get("version") == VERSION
+            and data.get("vendor_id") == self.vendor_id
+            and data.get("product_id") == self.product_id
+        ):
+            self.data = data
+
+    def get(self, key: str) -> Any:
+        """A cached value, or None."""
+        return self.data.get(key)
+
+    def endpoint_for(self, bus: Optional[int], ports: List[int]) -> Optional[int]:
+        """The cached endpoint if the device is where it was last time."""
+        if not self.data or self.data.get("bus") != bus:
+            return None
+        if self.data.get("ports") != list(ports):
+            return None
+        return self.data.get("endpoint")
+
+    def update(self, **values: Any):
+        """Store values, writing the file only when something changed."""
+        data = dict(
+            self.data,
+            version=VERSION,
+            vendor_id=self.vendor_id,
+            product_id=self.product_id,
+            **values,
+        )
+        if data != self.data:
+            self.data = data
+            self.save()
+
+    def save(self):
+        """Write the cache atomically."""
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save USB cache {self.path}: {e}")
+
+    def clear(self):
+        """Forget the resolution, so the next connect does a full discovery."""
+        self.data = {}
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,245 @@
+"""
+Virtual Antec Flux Pro display.
+A display backend that builds frames exactly like the USB display, then
+decodes and validates them on arrival and records when each one arrived, so
+what the display would show, the frame rate and the sensor-to-display
+latency can be observed without the hardware (e.g. in Linux benchmarks).
+
+Frames can also be streamed as JSON lines to a file ("file:PATH" or a plain
+path) or as UDP datagrams ("udp://HOST:PORT").
+"""
+
+import collections
+import json
+import socket
+import time
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .frame import ChangeFilter, FrameEncoder, decode_frame
+from .writer import FrameWriter
+
+
+class VirtualFrame:
+    """A frame as received by the virtual display."""
+
+    __slots__ = ("arrived", "wall_time", "cpu", "gpu", "raw", "latency")
+
+    def __init__(
+        self,
+        arrived: float,
+        wall_time: float,
+        cpu: Optional[float],
+        gpu: Optional[float],
+        raw: bytes,
+        latency: Optional[float],
+    ):
+        self.arrived = arrived  # monotonic arrival time
+        self.wall_time = wall_time
+        self.cpu = cpu
+        self.gpu = gpu
+        self.raw = raw
+        self.latency = latency  # seconds from sensor capture to arrival
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-friendly form of the frame."""
+        return {
+            "time": round(self.wall_time, 6),
+            "cpu": self.cpu,
+            "gpu": self.gpu,
+            "frame": self.raw.hex(),
+            "latency_ms": (
+                None if self.latency is None else round(self.latency * 1000, 3)
+            ),
+        }
+
+
+class VirtualDisplay:
+    """Drop-in display sink that decodes, validates and logs every frame."""
+
+    def __init__(
+        self,
+        hysteresis: float = 0.0,
+        keepalive: float = 5.0,
+        output: Optional[str] = None,
+        history: int = 10000,
+        threaded: bool = True,
+        started: Optional[float] = None,
+        log: Callable[[str], None] = print,
+        **usb_options: Any,  # USB connection options do not apply
+    ):
+        self.started = time.monotonic() if started is None else started
+        self.encoder = FrameEncoder()
+        self.filter = ChangeFilter(hysteresis, keepalive)
+        self.log = log
+        self.frames: Deque[VirtualFrame] = collections.deque(maxlen=history)
+        self.received = 0
+        self.invalid = 0
+        self.first_frame_time: Optional[float] = None  # seconds after start
+        self.output = open_output(output) if output else None
+        self.writer: Optional[FrameWriter] = None
+        if threaded:
+            self.writer = FrameWriter("virtual-display", self._deliver)
+            self.writer.start()
+
+    @property
+    def connected(self) -> bool:
+        """The virtual display is always there."""
+        return True
+
+    def configure(self, hysteresis: float, keepalive: float, **options: Any):
+        """Apply new frame filtering settings."""
+        self.filter.hysteresis = max(0.0, hysteresis)
+        self.filter.keepalive = keepalive
+
+    def send_temperatures(
+        self,
+        cpu_temp: Optional[float],
+        gpu_temp: Optional[float],
+        force: bool = False,
+        captured: Optional[float] = None,
+    ):
+        """Send temperatures; `captured` is the wall-clock time they were read."""
+        if self.writer is not None:
+            self.writer.post(cpu_temp, gpu_temp, force, captured)
+        else:
+            self._deliver(cpu_temp, gpu_temp, force, captured)
+
+    def _deliver(
+        self,
+        cpu_temp: Optional[float],
+        gpu_temp: Optional[float],
+        force: bool,
+        captured: Optional[float],
+    ):
+        """Encode and 'transmit' one frame, like USBDevice does."""
+        payload = self.encoder.encode(cpu_temp, gpu_temp)
+        if not force and not self.filter.should_send(cpu_temp, gpu_temp, payload):
+            return
+        self.receive(payload, captured)
+        self.filter.record(cpu_temp, gpu_temp, payload)
+
+    def receive(
+        self, frame, captured: Optional[float] = None
+    ) -> Optional[VirtualFrame]:
+        """Validate and record a frame arriving at the display."""
+        arrived = time.monotonic()
+        wall_time = time.time()
+        raw = bytes(frame)
+        try:
+            cpu, gpu = decode_frame(raw)
+        except ValueError as e:
+            self.invalid += 1
+            self.log(f"Warning: Virtual display rejected frame {raw.hex()}: {e}")
+            return None
+
+        latency = None if captured is None else max(0.0, wall_time - captured)
+        record = VirtualFrame(arrived, wall_time, cpu, gpu, raw, latency)
+        self.frames.append(record)
+        self.received += 1
+        if self.first_frame_time is None:
+            self.first_frame_time = arrived - self.started
+
+        if self.output is not None:
+            try:
+                self.output.write(record.as_dict())
+            except OSError as e:
+                self.log(f"Warning: Virtual display output failed: {e}")
+                self.output.close()
+                self.output = None
+        return record
+
+    @property
+    def last_frame(self) -> Optional[VirtualFrame]:
+        """The most recent valid frame."""
+        return self.frames[-1] if self.frames else None
+
+    def frame_rate(self) -> float:
+        """Frames per second over the recorded frames."""
+        if len(self.frames) < 2:
+            return 0.0
+        span = self.frames[-1].arrived - self.frames[0].arrived
+        return (len(self.frames) - 1) / span if span > 0 else 0.0
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """Sensor-to-display latency over the recorded frames, in milliseconds."""
+        latencies = sorted(
+            frame.latency for frame in self.frames if frame.latency is not None
+        )
+        if not latencies:
+            return {"count": 0}
+
+        def percentile(p: float) -> float:
+            index = int(round(p / 100 * (len(latencies) - 1)))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "count": len(latencies),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "max_ms": round(latencies[-1] * 1000, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame counters, frame rate and latency."""
+        stats = self.filter.stats()
+        stats["dropped"] = self.writer.mailbox.dropped if self.writer else 0
+        stats["received"] = self.received
+        stats["invalid"] = self.invalid
+        stats["fps"] = round(self.frame_rate(), 2)
+        stats["sensor_latency"] = self.latency_stats()
+        stats["time_to_first_frame_ms"] = (
+            None
+            if self.first_frame_time is None
+            else round(self.first_frame_time * 1000, 1)
+        )
+        return stats
+
+    def close(self):
+        """Deliver the last posted frame and close the output."""
+        if self.writer is not None:
+            self.writer.stop()
+        if self.output is not None:
+            self.output.close()
+            self.output = None
+
+
+class FileOutput:
+    """Appends frames to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class UDPOutput:
+    """Sends each frame as one JSON datagram."""
+
+    def __init__(self, host: str, port: int):
+        self.address = (host, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, record: Dict[str, Any]):
+        self._socket.sendto(json.dumps(record).encode("utf-8"), self.address)
+
+    def close(self):
+        self._socket.close()
+
+
+def open_output(spec: str):
+    """Open an output from "udp://HOST:PORT", "file:PATH" or a plain path."""
+    if spec.startswith("udp://"):
+        host, _, port = spec[len("udp://") :].rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Invalid UDP output '{spec}', expected udp://HOST:PORT")
+        return UDPOutput(host, int(port))
+    if spec.startswith("file:"):
+        spec = spec[len("file:") :]
+    return FileOutput(spec)
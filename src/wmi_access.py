@@ -0,0 +1,252 @@
+"""
+WMI access layer with property projection, in-place refreshes and TTL caching.
+Backends are swappable so the same code paths run against real WMI on Windows
+or an in-memory stand-in elsewhere.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Row = Dict[str, Any]
+
+
+class WMIQuery:
+    """A projected WMI class query with optional equality filters."""
+
+    __slots__ = ("namespace", "wmi_class", "properties", "where", "key")
+
+    def __init__(
+        self,
+        namespace: str,
+        wmi_class: str,
+        properties: Tuple[str, ...],
+        where: Optional[Dict[str, Any]] = None,
+    ):
+        self.namespace = namespace
+        self.wmi_class = wmi_class
+        self.properties = tuple(properties)
+        self.where = dict(where or {})
+        self.key = (
+            namespace,
+            wmi_class,
+            self.properties,
+            tuple(sorted(self.where.items())),
+        )
+
+    def wql(self) -> str:
+        """Render the query as WQL selecting only the projected properties."""
+        wql = f"SELECT {', '.join(self.properties)} FROM {self.wmi_class}"
+        if self.where:
+            clauses = [f"{name}='{value}'" for name, value in self.where.items()]
+            wql += " WHERE " + " AND ".join(clauses)
+        return wql
+
+    def matches(self, row: Row) -> bool:
+        """Check whether a row satisfies the equality filters."""
+        return all(row.get(name) == value for name, value in self.where.items())
+
+    def matches_object(self, obj: Any) -> bool:
+        """Check whether a WMI object satisfies the equality filters."""
+        return all(
+            getattr(obj, name, None) == value for name, value in self.where.items()
+        )
+
+
+class WMIBackend:
+    """Interface for the system that actually answers WMI queries."""
+
+    def connect(self, namespace: str) -> Any:
+        """Open a connection to a namespace, raising if it is unavailable."""
+        raise NotImplementedError
+
+    def execute(self, connection: Any, query: WMIQuery) -> List[Row]:
+        """Run a projected query and return the rows as plain dictionaries."""
+        raise NotImplementedError
+
+    def create_refresher(
+        self, connection: Any, query: WMIQuery
+    ) -> Optional[Callable[[], List[Row]]]:
+        """Return a callable refreshing the query in place, or None if unsupported."""
+        return None
+
+
+class PyWMIBackend(WMIBackend):
+    """Backend using the wmi package, with SWbemRefresher where the class allows it."""
+
+    def __init__(self, wmi_module=None):
+        self._wmi = wmi_module
+
+    def connect(self, namespace: str) -> Any:
+        if self._wmi is None:
+            import wmi
+
+            self._wmi = wmi
+        # COM must be initialized on every thread that talks to WMI
+        try:
+            import pythoncom
+
+            pythoncom.CoInitialize()
+        except ImportError:
+            pass
+        return self._wmi.WMI(namespace=namespace)
+
+    def execute(self, connection: Any, query: WMIQuery) -> List[Row]:
+        objects = connection.query(query.wql())
+        return [_project(obj, query.properties) for obj in objects]
+
+    def create_refresher(
+        self, connection: Any, query: WMIQuery
+    ) -> Optional[Callable[[], List[Row]]]:
+        services = getattr(connection, "_namespace", None)
+        if services is None:
+            return None
+
+        try:
+            import win32com.client
+
+            refresher = win32com.client.Dispatch("WbemScripting.SWbemRefresher")
+            object_set = refresher.AddEnum(services, query.wmi_class).ObjectSet
+        except Exception:
+            # Classes without a refreshable provider fall back to projected queries
+            return None
+
+        def refresh() -> List[Row]:
+            refresher.Refresh()
+            # The enumeration holds whole objects: filter on them, since the
+            # where columns need not be among the projected properties
+            return [
+                _project(obj, query.properties)
+                for obj in object_set
+                if query.matches_object(obj)
+            ]
+
+        return refresh
+
+
+class MemoryWMIBackend(WMIBackend):
+    """In-memory backend serving rows from a namespace -> class -> rows mapping."""
+
+    def __init__(self, namespaces: Optional[Dict[str, Dict[str, List[Row]]]] = None):
+        self.namespaces = namespaces if namespaces is not None else {}
+        self.queries = 0
+
+    def connect(self, namespace: str) -> Any:
+        if namespace not in self.namespaces:
+            raise RuntimeError(f"Invalid namespace: {namespace}")
+        return self.namespaces[namespace]
+
+    def execute(self, connection: Any, query: WMIQuery) -> List[Row]:
+        self.queries += 1
+        if query.wmi_class not in connection:
+            raise RuntimeError(f"Invalid class: {query.wmi_class}")
+        return [
+            {name: row.get(name) for name in query.properties}
+            for row in connection[query.wmi_class]
+            if query.matches(row)
+        ]
+
+    def create_refresher(
+        self, connection: Any, query: WMIQuery
+    ) -> Optional[Callable[[], List[Row]]]:
+        if query.wmi_class not in connection:
+            return None
+        return lambda: self.execute(connection, query)
+
+
+class _QueryState:
+    """Cached rows and the refresh strategy for one query."""
+
+    __slots__ = ("refresh", "rows", "fetched_at")
+
+    def __init__(self, refresh: Callable[[], List[Row]]):
+        self.refresh = refresh
+        self.rows: List[Row] = []
+        self.fetched_at: Optional[float] = None
+
+
+class WMIReader:
+    """Read projected WMI properties through refreshers and a per-class TTL cache.
+
+    COM objects cannot be shared between apartments, so connections and cached
+    queries are kept per thread.
+    """
+
+    def __init__(self, backend: Optional[WMIBackend] = None, ttl: float = 0.0):
+        self.backend = backend or PyWMIBackend()
+        self.ttl = ttl  # seconds
+        self.class_ttl: Dict[str, float] = {}
+        self._local = threading.local()
+
+    @property
+    def _connections(self) -> Dict[str, Any]:
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    @property
+    def _queries(self) -> Dict[tuple, _QueryState]:
+        if not hasattr(self._local, "queries"):
+            self._local.queries = {}
+        return self._local.queries
+
+    def connect(self, namespace: str) -> Any:
+        """Get a cached connection to a namespace, raising if it is unavailable."""
+        connections = self._connections
+        connection = connections.get(namespace)
+        if connection is None:
+            connection = self.backend.connect(namespace)
+            connections[namespace] = connection
+        return connection
+
+    def set_ttl(self, wmi_class: str, ttl: float):
+        """Override the cache lifetime (seconds) for one WMI class."""
+        self.class_ttl[wmi_class] = ttl
+
+    def read(
+        self,
+        namespace: str,
+        wmi_class: str,
+        properties: Tuple[str, ...],
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[Row]:
+        """Return projected rows of a class, refreshing them once the TTL expires."""
+        query = WMIQuery(namespace, wmi_class, properties, where)
+        queries = self._queries
+        state = queries.get(query.key)
+        if state is None:
+            state = _QueryState(self._create_refresh(query))
+            queries[query.key] = state
+
+        now = time.monotonic()
+        ttl = self.class_ttl.get(wmi_class, self.ttl)
+        if state.fetched_at is None or now - state.fetched_at >= ttl:
+            state.rows = state.refresh()
+            state.fetched_at = now
+
+        return state.rows
+
+    def invalidate(self):
+        """Drop this thread's cached rows so the next read goes back to WMI."""
+        for state in self._queries.values():
+            state.fetched_at = None
+
+    def reset(self, namespace: str):
+        """Drop this thread's connection and queries for a namespace, to reconnect."""
+        self._connections.pop(namespace, None)
+        queries = self._queries
+        for key in [key for key in queries if key[0] == namespace]:
+            del queries[key]
+
+    def _create_refresh(self, query: WMIQuery) -> Callable[[], List[Row]]:
+        """Prefer an in-place refresher, falling back to a projected query."""
+        connection = self.connect(query.namespace)
+        refresh = self.backend.create_refresher(connection, query)
+        if refresh is None:
+            refresh = lambda: self.backend.execute(connection, query)
+        return refresh
+
+
+def _project(obj: Any, properties: Tuple[str, ...]) -> Row:
+    """Copy the projected properties out of a WMI object."""
+    return {name: getattr(obj, name, None) for name in properties}
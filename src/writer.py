@@ -0,0 +1,151 @@
+"""
+Asynchronous frame delivery for display sinks.
+The display loop posts frames into a single-slot mailbox and a writer thread
+delivers them, so a slow or stalled device never blocks sampling: frames that
+arrive while a write is in flight replace each other and only the newest one
+is written.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class Mailbox:
+    """Single-slot, latest-wins handoff from one producer to one consumer."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item: Any = None
+        self._full = False
+        self._closed = False
+        self.posted = 0
+        self.dropped = 0  # items replaced before they were taken
+
+    def post(self, item: Any) -> bool:
+        """Offer an item, replacing one not taken yet; False once closed."""
+        with self._condition:
+            if self._closed:
+                return False
+            if self._full:
+                self.dropped += 1
+            self._item = item
+            self._full = True
+            self.posted += 1
+            self._condition.notify()
+            return True
+
+    def take(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the next item; None on timeout or once closed and empty."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._full or self._closed, timeout)
+            if not self._full:
+                return None
+            item, self._item, self._full = self._item, None, False
+            return item
+
+    def close(self):
+        """Refuse new items; a pending item can still be taken."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class LatencyTracker:
+    """Write latency statistics and a timeout adapted to them.
+
+    The timeout follows the smoothed latency plus four mean deviations (as TCP
+    retransmission timers do), clamped to [min_timeout, max_timeout], and
+    doubles after every write that timed out.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float = 0.1,
+        max_timeout: float = 1.0,
+        alpha: float = 0.125,
+        beta: float = 0.25,
+    ):
+        self.min_timeout = min_timeout  # seconds
+        self.max_timeout = max_timeout  # seconds
+        self.alpha = alpha
+        self.beta = beta
+        self.timeout = max_timeout  # until the first write completes
+        self.mean: Optional[float] = None  # smoothed latency, seconds
+        self.deviation = 0.0
+        self.last: Optional[float] = None
+        self.min: Optional[float] = None
+        self.max = 0.0
+        self.count = 0
+        self.timeouts = 0
+
+    def record(self, latency: float):
+        """Account for a completed write taking `latency` seconds."""
+        if self.mean is None:
+            self.mean = latency
+            self.deviation = latency / 2
+        else:
+            self.deviation += self.beta * (abs(self.mean - latency) - self.deviation)
+            self.mean += self.alpha * (latency - self.mean)
+        self.timeout = min(
+            self.max_timeout, max(self.min_timeout, self.mean + 4 * self.deviation)
+        )
+        self.last = latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = max(self.max, latency)
+        self.count += 1
+
+    def timed_out(self):
+        """Account for a write that hit the timeout."""
+        self.timeouts += 1
+        self.timeout = min(self.max_timeout, self.timeout * 2)
+
+    def timeout_ms(self) -> int:
+        """The current timeout in whole milliseconds (as pyusb takes it)."""
+        return max(1, int(self.timeout * 1000))
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency figures in milliseconds."""
+
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "writes": self.count,
+            "timeouts": self.timeouts,
+            "last_ms": ms(self.last),
+            "mean_ms": ms(self.mean),
+            "min_ms": ms(self.min),
+            "max_ms": ms(self.max) if self.count else None,
+            "timeout_ms": self.timeout_ms(),
+        }
+
+
+class FrameWriter(threading.Thread):
+    """Calls deliver(*item) on its own thread for the newest posted item."""
+
+    def __init__(self, name: str, deliver: Callable[..., None]):
+        super().__init__(name=name, daemon=True)
+        self.deliver = deliver
+        self.mailbox = Mailbox()
+        self.delivered = 0
+
+    def post(self, *item: Any) -> bool:
+        """Hand an item (the deliver arguments) to the writer."""
+        return self.mailbox.post(item)
+
+    def run(self):
+        while True:
+            item = self.mailbox.take()
+            if item is None:
+                return
+            try:
+                self.deliver(*item)
+            except Exception as e:
+                print(f"Warning: {self.name} error: {e}")
+            self.delivered += 1
+
+    def stop(self, timeout: float = 2.0):
+        """Deliver the pending item, then exit."""
+        self.mailbox.close()
+        if self.is_alive():
+            self.join(timeout)
@@ -0,0 +1,135 @@
+"""
+Shared fixtures: the monitors and display of a simulated machine, run by the
+same monitoring engine as the command line monitor and the service.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.backends import create_backend
+from src.config import Config
+from src.engine import monitoring_engine
+from src.sim import Simulation
+from src.sinks import DisplaySink
+
+
+class FakeClock:
+    """A monotonic clock that only moves when `now` is set."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A fake clock for components that take a `clock` callable."""
+    return FakeClock()
+
+
+@pytest.fixture
+def simulation():
+    """The default simulated machine, installed for the test."""
+    with Simulation.scenario("default") as installed:
+        yield installed
+
+
+class Rig:
+    """A simulated machine with its monitors, display and monitoring engine.
+
+    Simulated time can be moved forward with advance(), so scenarios scripted
+    over tens of seconds run in about a second.
+    """
+
+    def __init__(self, simulation: Simulation, config: Config):
+        self.simulation = simulation.install()
+        # src.usb binds the usb package when first imported; point it at the
+        # modules of this simulation
+        if "src.usb" in sys.modules:
+            sys.modules["src.usb"].usb = sys.modules["usb"]
+        self.config = config
+        self.cpu = create_backend(
+            "cpu",
+            config.cpu_device,
+            config.cpu_device,
+            probe_timeout=config.probe_timeout / 1000.0,
+            **config.breaker_options(),
+            **simulation.cpu_options(),
+        )
+        self.gpu = create_backend(
+            "gpu",
+            config.gpu_device,
+            config.gpu_device,
+            **config.breaker_options(),
+            **simulation.gpu_options(),
+        )
+        self.display = create_backend(
+            "display",
+            config.display_device,
+            wait_for_device=True,
+            cache_path=None,
+            log=lambda message: None,
+            **config.display_options(),
+        )
+        self.engine = monitoring_engine(
+            config, self.cpu, self.gpu, log=lambda message: None
+        )
+        self.engine.add_sink(DisplaySink(self.display, log=lambda message: None))
+
+    def advance(self, seconds: float):
+        """Move simulated time forward."""
+        self.simulation.clock.started -= seconds
+
+    def run(self, seconds: float, steps: List[Tuple[float, Callable[[], Any]]] = ()):
+        """Run the engine for `seconds`, calling each step `delay` seconds in."""
+        timers = [threading.Timer(delay, step) for delay, step in steps]
+        timers.append(threading.Timer(seconds, self.engine.stop))
+        for timer in timers:
+            timer.start()
+        try:
+            self.engine.run()
+        finally:
+            for timer in timers:
+                timer.cancel()
+
+    def close(self):
+        self.engine.stop()
+        self.cpu.close()
+        self.gpu.close()
+        self.simulation.uninstall()
+
+
+@pytest.fixture
+def rig():
+    """Factory for Rigs, closed after the test."""
+    rigs: List[Rig] = []
+
+    def build(simulation: Simulation, **options: Any) -> Rig:
+        defaults = {
+            "polling_interval": 50,
+            "display_device": "virtual",
+            "display_keepalive": 0,
+            "display_reconnect_backoff": 50,
+            "display_reconnect_max_backoff": 200,
+            "breaker_backoff": 100,
+            "breaker_max_backoff": 200,
+            "config_reload_interval": 0,
+            "history_capacity": 0,
+        }
+        defaults.update(options)
+        rigs.append(Rig(simulation, Config(**defaults)))
+        return rigs[-1]
+
+    yield build
+    for built in rigs:
+        built.close()
+
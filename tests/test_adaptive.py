@@ -0,0 +1,45 @@
+"""Adaptive polling intervals from the change between readings."""
+
+import pytest
+
+from src.adaptive import AdaptivePolling
+
+
+def polling(**options) -> AdaptivePolling:
+    options.setdefault("min_interval", 0.05)
+    options.setdefault("max_interval", 1.0)
+    return AdaptivePolling(**options)
+
+
+def feed(adaptive: AdaptivePolling, values, start: float = 0.0) -> float:
+    """Read `values` one interval apart; returns the time of the last reading."""
+    now = start
+    for value in values:
+        adaptive.update(value, now)
+        now += adaptive.interval
+    return now - adaptive.interval
+
+
+def test_one_degree_flicker_backs_off():
+    adaptive = polling()
+    # 45/46 flickering 50 ms apart is 20 °C/s, but only sensor noise
+    feed(adaptive, [45.0, 46.0] * 20)
+    assert adaptive.interval == pytest.approx(1.0)
+    assert adaptive.speedups == 0
+
+
+def test_fast_rise_speeds_up():
+    adaptive = polling()
+    now = feed(adaptive, [45.0] * 12)
+    assert adaptive.interval == pytest.approx(1.0)
+    # 1.5 °C over a 50 ms gap is above the noise and the rate threshold
+    adaptive.update(46.5, now + 0.05)
+    assert adaptive.interval == pytest.approx(0.05)
+    assert adaptive.speedups == 1
+
+
+def test_large_step_speeds_up_at_any_rate():
+    adaptive = polling()
+    now = feed(adaptive, [45.0] * 12)
+    adaptive.update(48.0, now + 10.0)  # 0.3 °C/s, but a 3 °C step
+    assert adaptive.interval == pytest.approx(0.05)
@@ -0,0 +1,103 @@
+"""Circuit breaker state transitions against an injected clock."""
+
+import pytest
+
+from src.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def breaker(clock, **options) -> CircuitBreaker:
+    """A breaker without jitter, logging into breaker.messages."""
+    messages = []
+    options.setdefault("failure_threshold", 3)
+    options.setdefault("backoff", 2.0)
+    options.setdefault("max_backoff", 10.0)
+    tested = CircuitBreaker(
+        "sensor", jitter=0.0, log=messages.append, clock=clock, **options
+    )
+    tested.messages = messages
+    return tested
+
+
+def test_opens_after_threshold(clock):
+    tested = breaker(clock)
+    tested.failure(RuntimeError("read failed"))
+    tested.failure()
+    assert tested.state == CLOSED
+    tested.failure()
+    assert tested.state == OPEN
+    assert tested.trips == 1
+    assert tested.retry_in() == pytest.approx(2.0)
+    assert not tested.allow()
+    assert tested.messages == ["Warning: sensor failing: read failed, retrying in 2.0s"]
+
+
+def test_half_open_trial_read(clock):
+    tested = breaker(clock, failure_threshold=1)
+    tested.failure()
+    clock.now = 2.0
+    assert tested.allow()
+    assert tested.state == HALF_OPEN
+    tested.success()
+    assert tested.state == CLOSED
+    assert tested.failures == 0
+    assert tested.messages[-1] == "sensor recovered"
+
+
+def test_failed_trials_back_off_exponentially_up_to_max(clock):
+    tested = breaker(clock, failure_threshold=1)
+    delays = []
+    for _ in range(5):
+        tested.failure()
+        delays.append(tested.retry_in())
+        clock.now += tested.retry_in()
+        assert tested.allow()
+    assert delays == pytest.approx([2.0, 4.0, 8.0, 10.0, 10.0])
+    # Retries that fail again are neither new trips nor logged
+    assert tested.trips == 1
+    assert len(tested.messages) == 1
+
+
+def test_recovery_resets_backoff(clock):
+    tested = breaker(clock, failure_threshold=1)
+    tested.failure()
+    clock.now = 2.0
+    tested.allow()
+    tested.failure()
+    assert tested.retry_in() == pytest.approx(4.0)
+    clock.now += 4.0
+    tested.allow()
+    tested.success()
+    tested.failure()
+    assert tested.retry_in() == pytest.approx(2.0)
+    assert tested.trips == 2
+
+
+def test_failed_reinit_stays_open(clock):
+    attempts = []
+
+    def reinit() -> bool:
+        attempts.append(True)
+        return len(attempts) > 1
+
+    tested = breaker(clock, failure_threshold=1, reinit=reinit)
+    tested.failure()
+    clock.now = 2.0
+    assert not tested.allow()
+    assert tested.state == OPEN
+    assert tested.retry_in() == pytest.approx(4.0)
+    clock.now = 6.0
+    assert tested.allow()
+    assert tested.state == HALF_OPEN
+
+
+def test_call_counts_errors_and_missing_values(clock):
+    tested = breaker(clock, failure_threshold=2)
+    assert tested.call(lambda: None) is None
+    assert tested.call(lambda: 1 / 0) is None
+    assert tested.state == OPEN
+    assert tested.last_error == "division by zero"
+    assert tested.call(lambda: 42.0) is None  # skipped while open
+    clock.now = 2.0
+    assert tested.call(lambda: 42.0) == 42.0
+    assert tested.closed
+    assert tested.status()["trips"] == 1
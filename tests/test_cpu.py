@@ -0,0 +1,134 @@
+"""CPUMonitor source selection against simulated hardware."""
+
+import threading
+import time
+import types
+
+import pytest
+
+from src.cpu import HARDWARE_MONITOR_NAMESPACES, CPUMonitor
+
+WMI_PROBES = set(HARDWARE_MONITOR_NAMESPACES) | {
+    "MSAcpi_ThermalZoneTemperature",
+    "Win32_TemperatureProbe",
+    "Win32_PerfRawData_Counters_ThermalZoneInformation",
+}
+LHM_PROBE = "LibreHardwareMonitor DLL"
+
+
+def cpu_monitor(simulation, device=None, **options) -> CPUMonitor:
+    options.setdefault("probe_timeout", 1.0)
+    return CPUMonitor(device, **options, **simulation.cpu_options())
+
+
+@pytest.mark.parametrize(
+    "device, expected",
+    [
+        ("auto", WMI_PROBES | {LHM_PROBE, "psutil"}),
+        ("WMI", WMI_PROBES | {LHM_PROBE, "psutil"}),  # the old default
+        ("wmi-only", WMI_PROBES),
+        ("lhm", {LHM_PROBE}),
+    ],
+)
+def test_cpu_device_selects_probed_sources(simulation, monkeypatch, device, expected):
+    monkeypatch.setattr("sys.platform", "win32")  # no hwmon probe
+    monitor = cpu_monitor(simulation, device)
+    try:
+        assert set(monitor.probe_report) == expected
+        assert monitor.get_temperature() is not None
+    finally:
+        monitor.close()
+
+
+def wait_until(condition, timeout: float = 2.0):
+    """Poll for something a probe thread does."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def slow_lhm(monkeypatch):
+    """Holds the LibreHardwareMonitor probe until the event is set."""
+    release = threading.Event()
+    initialize = CPUMonitor._initialize_libre_hardware_monitor
+
+    def held(monitor):
+        release.wait(5.0)
+        return initialize(monitor)
+
+    monkeypatch.setattr(CPUMonitor, "_initialize_libre_hardware_monitor", held)
+    yield release
+    release.set()
+
+
+def test_late_probe_answer_is_kept(simulation, slow_lhm):
+    started = time.monotonic()
+    monitor = cpu_monitor(simulation, "lhm", probe_timeout=0.1)
+    try:
+        # Usable at the deadline, with the probe reported as timed out
+        assert time.monotonic() - started < 1.0
+        assert monitor.probe_report[LHM_PROBE]["status"] == "timeout"
+        assert monitor.get_temperature() is None
+
+        slow_lhm.set()
+        wait_until(lambda: monitor.probe_report[LHM_PROBE]["available"])
+        assert monitor.probe_report[LHM_PROBE]["status"] == "late"
+        assert monitor.get_temperature() is not None
+    finally:
+        monitor.close()
+
+
+def test_first_answer_ends_the_wait(simulation, monkeypatch, slow_lhm):
+    monkeypatch.setattr("sys.platform", "win32")
+    started = time.monotonic()
+    monitor = cpu_monitor(simulation, "auto", probe_timeout=0.3)
+    try:
+        assert time.monotonic() - started < 0.3
+        assert monitor.get_temperature() is not None
+        assert monitor.methods_tried[-1] != "LibreHardwareMonitor DLL"
+        # Still running at the deadline: reported as timed out then
+        wait_until(lambda: monitor.probe_report[LHM_PROBE]["status"] == "timeout")
+
+        # The late answer takes over as the preferred source
+        slow_lhm.set()
+        wait_until(lambda: monitor.probe_report[LHM_PROBE]["available"])
+        monitor.get_temperature()
+        assert monitor.methods_tried == ["LibreHardwareMonitor DLL"]
+    finally:
+        monitor.close()
+
+
+def test_source_stays_sticky_until_reprobe(simulation, monkeypatch, clock):
+    monkeypatch.setattr("sys.platform", "win32")
+    monitor = cpu_monitor(simulation, "auto", reprobe_interval=60.0)
+    try:
+        wait_until(lambda: not monitor._pending_probes)
+        monkeypatch.setattr("src.cpu.time", types.SimpleNamespace(monotonic=clock))
+        clock.now = 1000.0
+        names = [name for name, _ in monitor._sources]
+        assert names[0] == "LibreHardwareMonitor DLL"
+
+        # The DLL stops reading: the next source takes over and stays in use
+        lhm_up = [True]
+        read_lhm = monitor._sources[0][1]
+        monitor._sources[0] = (names[0], lambda: read_lhm() if lhm_up[0] else None)
+        monitor.get_temperature()
+        assert monitor.methods_tried == [names[0]]
+        lhm_up[0] = False
+        assert monitor.get_temperature() is not None
+        assert monitor.methods_tried == names[:2]
+        lhm_up[0] = True
+        clock.now += 59.0
+        monitor.get_temperature()
+        assert monitor.methods_tried == [names[1]]
+
+        # Re-probed once the interval is up, and the DLL takes over again
+        clock.now += 1.0
+        monitor.get_temperature()
+        assert monitor.methods_tried == [names[0]]
+        assert monitor.active_source == 0
+        assert monitor.source_stats[names[0]]["misses"] == 1
+    finally:
+        monitor.close()
@@ -0,0 +1,83 @@
+"""Prometheus exposition text served by the metrics endpoint."""
+
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.exporter import CONTENT_TYPE, MetricsExporter, _Exposition, _format
+from src.sim import Simulation
+
+LABEL = r'[a-z_]+="[^"]*"'
+SAMPLE = re.compile(rf"^(afpro_[a-z_]+)(\{{{LABEL}(,{LABEL})*\}})? (\S+)$")
+
+
+@pytest.mark.parametrize(
+    "value, text",
+    [
+        (61.0, "61"),
+        (0.525, "0.525"),
+        (1.8e9, "1800000000"),
+        (float("nan"), "NaN"),
+        (float("inf"), "+Inf"),
+    ],
+)
+def test_value_formatting(value, text):
+    assert _format(value) == text
+
+
+def test_metrics_without_values_are_left_out():
+    out = _Exposition()
+    out.add("empty", "gauge", "Nothing read", [({"source": "cpu"}, None)])
+    out.gauge("reading", "One reading", 42.5, source='say "hi"\n')
+    assert out.text() == (
+        "# HELP afpro_reading One reading\n"
+        "# TYPE afpro_reading gauge\n"
+        'afpro_reading{source="say \\"hi\\"\\n"} 42.5\n'
+    )
+
+
+def scrape(exporter, path="/metrics"):
+    host, port = exporter.address
+    with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=2) as reply:
+        return reply.headers["Content-Type"], reply.read().decode("utf-8")
+
+
+def test_scrape_serves_the_latest_update(rig):
+    setup = rig(Simulation(), snapshot_metrics=["temperature", "load"])
+    exporter = MetricsExporter(setup.engine, port=0, log=lambda message: None)
+    setup.engine.add_sink(exporter)
+    scrapes = {}
+
+    def get():
+        scrapes["metrics"] = scrape(exporter)
+        with pytest.raises(urllib.error.HTTPError):
+            scrape(exporter, "/")
+
+    setup.run(0.6, [(0.4, get)])
+
+    content_type, body = scrapes["metrics"]
+    assert content_type == CONTENT_TYPE
+    samples = {}
+    declared = set()
+    for line in body.splitlines():
+        if line.startswith("# TYPE "):
+            name, kind = line.split()[2:]
+            assert kind in ("gauge", "counter")
+            declared.add(name)
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, line
+        assert match.group(1) in declared  # TYPE comes before the samples
+        samples[match.group(1) + (match.group(2) or "")] = float(match.group(4))
+
+    assert 0 < samples['afpro_temperature_celsius{source="cpu"}'] < 150
+    assert 0 <= samples['afpro_load_ratio{source="cpu"}'] <= 1
+    assert samples["afpro_ticks_total"] >= 1
+    assert samples["afpro_tick_interval_seconds"] == pytest.approx(0.05)
+    assert samples['afpro_source_reads_total{source="gpu"}'] >= 1
+    assert samples["afpro_display_frames_sent_total"] >= 1
+    assert exporter.stats()["scrapes"] == 1
@@ -0,0 +1,90 @@
+"""Frame encoding and change filtering."""
+
+import random
+
+import pytest
+
+from src.frame import (
+    HEADER,
+    ChangeFilter,
+    FrameEncoder,
+    checksum,
+    decode_frame,
+    encode_temperature,
+)
+
+
+def legacy_frame(cpu_temp, gpu_temp) -> bytes:
+    """A frame built with the protocol's digit arithmetic, byte by byte."""
+    body = HEADER + encode_temperature(cpu_temp) + encode_temperature(gpu_temp)
+    return body + bytes([checksum(body)])
+
+
+TEMPERATURES = [k / 10.0 for k in range(1000)] + [None, 99.95, 100.0, 123.4, 150.0]
+
+
+def test_encoder_matches_legacy_encoding():
+    rng = random.Random(1)
+    encoder = FrameEncoder()
+    values = TEMPERATURES + [rng.uniform(0.0, 99.99) for _ in range(2000)]
+    for cpu_temp in values:
+        gpu_temp = rng.choice(values)
+        assert bytes(encoder.encode(cpu_temp, gpu_temp)) == legacy_frame(
+            cpu_temp, gpu_temp
+        )
+
+
+@pytest.mark.parametrize(
+    "cpu_temp, gpu_temp", [(45.6, 38.2), (None, 50.0), (0.0, None), (99.9, 0.1)]
+)
+def test_encoded_frames_decode(cpu_temp, gpu_temp):
+    frame = FrameEncoder().encode(cpu_temp, gpu_temp)
+    assert decode_frame(frame) == (cpu_temp, gpu_temp)
+
+
+def test_decode_rejects_bad_checksum():
+    frame = bytearray(legacy_frame(45.6, 38.2))
+    frame[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        decode_frame(frame)
+
+
+def send(change_filter, cpu_temp, gpu_temp) -> bool:
+    """Offer a frame to a filter, recording it if it is sent."""
+    frame = legacy_frame(cpu_temp, gpu_temp)
+    if not change_filter.should_send(cpu_temp, gpu_temp, frame):
+        return False
+    change_filter.record(cpu_temp, gpu_temp, frame)
+    return True
+
+
+def test_filter_suppresses_identical_frames_until_keepalive(clock):
+    change_filter = ChangeFilter(keepalive=5.0, clock=clock)
+    assert send(change_filter, 45.6, 38.2)  # the first frame is always sent
+    clock.now = 4.9
+    assert not send(change_filter, 45.6, 38.2)
+    assert send(change_filter, 45.7, 38.2)
+    clock.now = 9.9
+    assert send(change_filter, 45.7, 38.2)  # keepalive due
+    assert change_filter.stats() == {"sent": 3, "suppressed": 1, "keepalives": 1}
+
+
+def test_filter_hysteresis(clock):
+    change_filter = ChangeFilter(hysteresis=0.5, keepalive=5.0, clock=clock)
+    assert send(change_filter, 60.0, 50.0)
+    assert not send(change_filter, 60.5, 49.5)  # within 0.5 of what was sent
+    assert send(change_filter, 60.6, 50.0)
+    assert not send(change_filter, 60.2, 50.0)
+    assert send(change_filter, 60.2, None)  # losing a reading is a change
+
+
+def test_filter_without_keepalive_sends_everything():
+    change_filter = ChangeFilter(hysteresis=1.0, keepalive=0)
+    assert all(send(change_filter, 45.6, 38.2) for _ in range(3))
+
+
+def test_filter_reset_sends_next_frame(clock):
+    change_filter = ChangeFilter(keepalive=5.0, clock=clock)
+    assert send(change_filter, 45.6, 38.2)
+    change_filter.reset()
+    assert send(change_filter, 45.6, 38.2)
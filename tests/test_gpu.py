@@ -0,0 +1,59 @@
+"""GPU selection and NVML handle recovery, on the simulated GPUs."""
+
+import sys
+
+import pytest
+
+from src.gpu import GPUMonitor
+from src.lhm import shared_session
+from src.sim import SimGPU
+from src.sim.fake_nvml import NVML_ERROR_NOT_FOUND, NVMLError
+
+
+@pytest.fixture
+def gpu_monitor(simulation):
+    """Factory for GPU monitors over the default simulation, closed afterwards."""
+    monitors = []
+
+    def build(**options) -> GPUMonitor:
+        monitors.append(GPUMonitor(**simulation.gpu_options(), **options))
+        return monitors[-1]
+
+    yield build
+    for monitor in monitors:
+        monitor.close()
+
+
+def test_selecting_away_lhm_gpus_releases_the_session(simulation, gpu_monitor):
+    nvidia = simulation.gpus[0]
+    monitor = gpu_monitor(select=[nvidia.uuid])
+    assert [gpu.uuid for gpu in monitor.gpus] == [nvidia.uuid]
+    assert not monitor._lhm_acquired
+    assert "gpu" not in shared_session().users
+
+
+def test_selected_lhm_gpu_keeps_the_session(simulation, gpu_monitor):
+    monitor = gpu_monitor(select=[1])
+    assert [gpu.backend for gpu in monitor.gpus] == ["LibreHardwareMonitor"]
+    assert shared_session().users.get("gpu") == 1
+
+
+def test_reconnect_finds_a_gpu_under_a_new_index(simulation, gpu_monitor, monkeypatch):
+    monitor = gpu_monitor(device="nvidia")
+    gpu = monitor.nvidia_gpu
+    original = simulation.gpus[0]
+    # After a driver reset the card comes back second, and its UUID lookup fails
+    simulation.nvml.gpus.insert(0, SimGPU("nvidia", uuid="GPU-another-card"))
+
+    def not_found(uuid):
+        raise NVMLError(NVML_ERROR_NOT_FOUND)
+
+    monkeypatch.setattr(sys.modules["pynvml"], "nvmlDeviceGetHandleByUUID", not_found)
+    gpu.handle = None
+    assert gpu.reconnect()
+    assert gpu.handle is original
+    assert gpu.read_temperature() is not None
+
+    simulation.nvml.gpus.remove(original)
+    assert not gpu.reconnect()
+    assert gpu.handle is None
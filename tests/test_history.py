@@ -0,0 +1,123 @@
+"""Sample history ring buffers and window queries."""
+
+import pytest
+
+from src import history as history_module
+from src.history import INT32_MAX, History, MetricHistory
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_mode(request, monkeypatch):
+    """Run a test with the NumPy queries and with the pure-Python ones."""
+    if request.param == "numpy":
+        if not history_module.NUMPY_AVAILABLE:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(history_module, "NUMPY_AVAILABLE", False)
+    return request.param
+
+
+def filled(capacity: int, count: int, start: float = 1000.0) -> MetricHistory:
+    """A history holding values 0..count-1 taken one second apart."""
+    metric = MetricHistory(capacity)
+    for i in range(count):
+        metric.append(float(i), start + i)
+    return metric
+
+
+def test_wraparound_keeps_newest_in_order(numpy_mode):
+    metric = filled(4, 6)
+    assert len(metric) == 4
+    assert metric.nbytes == 32
+    window = metric.window()
+    assert list(window.values) == [2.0, 3.0, 4.0, 5.0]
+    assert list(window.times) == [2000, 3000, 4000, 5000]
+
+
+@pytest.mark.parametrize("count", [5, 7, 10])
+def test_window_by_time_across_wraparound(numpy_mode, count):
+    metric = filled(5, count)
+    newest = 1000.0 + count - 1
+    window = metric.window(2.0, now=newest)
+    assert list(window.values) == [count - 3.0, count - 2.0, count - 1.0]
+    assert len(metric.window(0.5, now=newest + 1.0)) == 0
+
+
+def test_window_statistics(numpy_mode):
+    metric = filled(200, 101)
+    summary = metric.window().summary(threshold=89.5)
+    assert summary["count"] == 101
+    assert summary["min"] == 0.0 and summary["max"] == 100.0
+    assert summary["mean"] == pytest.approx(50.0)
+    assert summary["p50"] == pytest.approx(50.0)
+    assert summary["p95"] == pytest.approx(95.0)
+    # Samples 90-99 each hold for a second until the next one
+    assert summary["seconds_above"] == pytest.approx(10.0)
+
+
+def test_empty_window(numpy_mode):
+    window = MetricHistory(4).window(10.0)
+    assert len(window) == 0
+    assert window.summary()["max"] is None
+    assert window.time_above(0.0) == 0.0
+
+
+def test_rebase_moves_epoch_to_oldest_sample():
+    metric = MetricHistory(2)
+    for timestamp in (0.0, 1000.0, 2000.0):
+        metric.append(timestamp, timestamp)
+    # Past the int32 millisecond range of the epoch at 0
+    late = INT32_MAX / 1000.0 + 500.0
+    metric.append(late, late)
+    # The oldest sample held when the new one arrived, which it then replaced
+    assert metric.epoch == pytest.approx(1000.0)
+    window = metric.window()
+    assert list(window.values) == [2000.0, pytest.approx(late)]
+    assert list(window.times) == [1000000, round((late - 1000.0) * 1000)]
+    assert len(metric.window(1.0, now=late)) == 1
+
+
+def test_span_beyond_int32_starts_over():
+    metric = MetricHistory(4)
+    metric.append(1.0, 0.0)
+    metric.append(2.0, 10.0)
+    metric.append(3.0, 3e6)  # ~35 days after the oldest sample kept
+    assert metric.epoch == 3e6
+    assert list(metric.window().values) == [3.0]
+
+
+def test_clock_stepping_back_keeps_times_monotonic():
+    metric = MetricHistory(8)
+    metric.append(1.0, 100.0)
+    metric.append(2.0, 105.0)
+    metric.append(3.0, 95.0)  # wall clock stepped back
+    metric.append(4.0, 106.0)
+    assert list(metric.window().times) == [0, 5000, 5000, 6000]
+    assert list(metric.window(1.5, now=106.0).values) == [2.0, 3.0, 4.0]
+
+
+def test_missing_values_are_skipped():
+    metric = MetricHistory(4)
+    metric.append(None, 1.0)
+    metric.append(float("nan"), 2.0)
+    assert len(metric) == 0
+
+
+def test_history_records_snapshots():
+    class Snapshot:
+        timestamp = 1000.0
+
+        def as_dict(self):
+            return {"temperature": 61.5, "load": None}
+
+    store = History(16)
+    store.record("cpu", Snapshot())
+    assert list(store.window("cpu.temperature").values) == [61.5]
+    assert "cpu.load" not in store.metrics
+    assert len(store.window("gpu.temperature")) == 0
+    assert store.stats() == {"metrics": 1, "samples": 1, "bytes": 8}
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        MetricHistory(0)
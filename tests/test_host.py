@@ -0,0 +1,51 @@
+"""Building and tearing down the pipeline shared by the application hosts."""
+
+import pytest
+
+toml = pytest.importorskip("toml")
+
+from src.config import Config
+from src.host import MonitorHost
+
+
+def record_close(monitor, name, closed):
+    """Note when a monitor is closed, still releasing its shared sessions."""
+    close = monitor.close
+
+    def recorded():
+        closed.append(name)
+        close()
+
+    monitor.close = recorded
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.toml"
+    config = Config(history_capacity=60, config_reload_interval=0)
+    with open(path, "w") as f:
+        toml.dump(config.to_dict(), f)
+    return str(path)
+
+
+def test_close_closes_both_monitors(simulation, config_path):
+    host = MonitorHost(config_path, simulation, log=lambda message: None)
+    closed = []
+    for name in ("cpu", "gpu"):
+        record_close(getattr(host, f"{name}_monitor"), name, closed)
+    assert host.history is not None and host.reloader is None
+    host.close()
+    assert closed == ["cpu", "gpu"]
+
+
+def test_failed_build_closes_what_was_built(simulation, config_path, monkeypatch):
+    closed = []
+
+    def create_gpu_monitor(self, config):
+        record_close(self.cpu_monitor, "cpu", closed)
+        raise RuntimeError("no GPU backend")
+
+    monkeypatch.setattr(MonitorHost, "create_gpu_monitor", create_gpu_monitor)
+    with pytest.raises(RuntimeError, match="no GPU backend"):
+        MonitorHost(config_path, simulation, log=lambda message: None)
+    assert closed == ["cpu"]
@@ -0,0 +1,131 @@
+"""hwmon and thermal zone discovery and reads, against a fake sysfs tree."""
+
+import os
+
+import pytest
+
+from src.hwmon import HwmonCPUSource, discover_gpus, discover_sensors
+from src.metrics import MetricExpression
+
+
+def write(path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text + "\n")
+
+
+def add_chip(root, number: int, chip: str, sensors, device=None):
+    """An hwmon<number> directory with (label, millidegrees) temp inputs."""
+    hwmon = root / "class" / "hwmon" / f"hwmon{number}"
+    write(hwmon / "name", chip)
+    for index, (label, millidegrees) in sensors.items():
+        write(hwmon / f"temp{index}_input", str(millidegrees))
+        if label:
+            write(hwmon / f"temp{index}_label", label)
+    if device:
+        target = root / "devices" / device
+        target.mkdir(parents=True)
+        os.symlink(target, hwmon / "device")
+    return hwmon
+
+
+def add_zone(root, number: int, zone_type: str, millidegrees: int):
+    zone = root / "class" / "thermal" / f"thermal_zone{number}"
+    write(zone / "type", zone_type)
+    write(zone / "temp", str(millidegrees))
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """A machine with an ACPI zone chip, a coretemp CPU and an amdgpu card."""
+    add_chip(tmp_path, 0, "acpitz", {1: (None, 27800)})
+    add_chip(
+        tmp_path,
+        2,
+        "coretemp",
+        {
+            1: ("Package id 0", 61000),
+            2: ("Core 0", 55000),
+            3: ("Core 1", 57000),
+            10: ("Core 8", 58000),
+        },
+    )
+    add_chip(
+        tmp_path,
+        10,
+        "amdgpu",
+        {1: ("edge", 50000), 2: ("junction", 60000)},
+        device="pci0000:00/0000:03:00.0",
+    )
+    add_zone(tmp_path, 0, "x86_pkg_temp", 48000)
+    return tmp_path
+
+
+@pytest.fixture
+def cpu_source(sysfs):
+    sources = []
+
+    def build(metric=None) -> HwmonCPUSource:
+        expression = MetricExpression(metric) if metric else None
+        sources.append(HwmonCPUSource(str(sysfs), expression))
+        return sources[-1]
+
+    yield build
+    for source in sources:
+        source.close()
+
+
+def test_discovery_keeps_chip_and_numeric_order(sysfs):
+    sensors = discover_sensors(str(sysfs))
+    try:
+        assert [sensor.label for sensor in sensors] == [
+            "Package id 0",
+            "Core 0",
+            "Core 1",
+            "Core 8",
+        ]
+        assert {sensor.chip for sensor in sensors} == {"coretemp"}
+    finally:
+        for sensor in sensors:
+            sensor.close()
+
+
+def test_cpu_reads_first_sensor_and_rereads_the_open_file(sysfs, cpu_source):
+    source = cpu_source()
+    assert source.chips == ["coretemp"]
+    assert source.read() == 61.0
+    write(sysfs / "class/hwmon/hwmon2/temp1_input", "64500")
+    assert source.read() == 64.5
+
+
+def test_cpu_skips_implausible_readings(sysfs, cpu_source):
+    source = cpu_source()
+    write(sysfs / "class/hwmon/hwmon2/temp1_input", "0")
+    assert source.read() == 55.0
+
+
+def test_cpu_metric_over_labelled_cores(cpu_source):
+    assert cpu_source("max(core*)").read() == 58.0
+    assert cpu_source("mean(core*)").read() == pytest.approx(170.0 / 3)
+    assert cpu_source("package").read() == 61.0
+
+
+def test_cpu_falls_back_to_thermal_zones(sysfs, cpu_source):
+    write(sysfs / "class/hwmon/hwmon2/name", "nct6775")  # not a CPU chip
+    source = cpu_source()
+    assert source.chips == ["x86_pkg_temp"]
+    assert source.read() == 48.0
+
+
+def test_gpu_uses_edge_sensor_and_pci_address(sysfs):
+    gpus = discover_gpus(str(sysfs), first_index=1)
+    try:
+        assert len(gpus) == 1
+        gpu = gpus[0]
+        assert gpu.device_index == 1
+        assert gpu.pci_bus_id == "0000:03:00.0"
+        assert gpu.sensor.label == "edge"
+        assert gpu.read_temperature() == 50.0
+        assert gpu.read_metric("load") is None
+    finally:
+        for gpu in gpus:
+            gpu.close()
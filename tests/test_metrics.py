@@ -0,0 +1,102 @@
+"""Metric expressions: parsing, sensor name matching and evaluation."""
+
+import pytest
+
+from src import metrics as metrics_module
+from src.metrics import NAN, MetricArray, MetricExpression, canonical_name
+
+LABELS = [
+    "CPU Package",
+    "CPU Core #1",
+    "CPU Core #2",
+    "CPU Core #3",
+    "CPU Core #4",
+    "Core (Tctl/Tdie)",
+]
+READINGS = [62.0, 50.0, 58.0, 54.0, 66.0, 63.5]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_mode(request, monkeypatch):
+    """Evaluate with the NumPy reductions and with the pure-Python ones."""
+    if request.param == "numpy":
+        monkeypatch.setattr(metrics_module, "_numpy", None)
+        if metrics_module._load_numpy() is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(metrics_module, "_numpy", False)
+    return request.param
+
+
+def evaluate(text: str, readings=READINGS):
+    layout = MetricArray(LABELS)
+    bound = layout.bind(text)
+    for i, value in enumerate(readings):
+        layout.values[i] = value
+    return bound.evaluate(layout.values)
+
+
+@pytest.mark.parametrize(
+    "label, name",
+    [
+        ("CPU Core #3", "core3"),
+        ("Core 0", "core0"),
+        ("Package id 0", "package"),
+        ("Package id 1", "package1"),
+        ("Core (Tctl/Tdie)", "tctl"),
+        ("Tccd1", "ccd1"),
+        ("GPU 2", "gpu2"),
+        ("CPU Total", "cpu_total"),
+    ],
+)
+def test_canonical_names(label, name):
+    assert canonical_name(label) == name
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("max(core*)", 66.0),
+        ("min(core*)", 50.0),
+        ("mean(core*)", 57.0),
+        ("avg(core*)", 57.0),
+        ("p50(core*)", 56.0),
+        ("p90(core*)", 63.6),
+        ("package", 62.0),
+        ("first(core*)", 50.0),
+        ("tctl", 63.5),
+        ("max(*)", 66.0),
+    ],
+)
+def test_expressions(numpy_mode, text, expected):
+    assert evaluate(text) == pytest.approx(expected)
+
+
+def test_missing_readings_are_ignored(numpy_mode):
+    readings = [62.0, NAN, 58.0, NAN, 66.0, 63.5]
+    assert evaluate("mean(core*)", readings) == pytest.approx(62.0)
+    assert evaluate("min(core*)", [NAN] * len(LABELS)) is None
+
+
+def test_fractional_percentile():
+    expression = MetricExpression("p99_5(core*)")
+    assert expression.function == "percentile"
+    assert expression.q == 99.5
+
+
+def test_unmatched_pattern_binds_nothing():
+    bound = MetricArray(LABELS).bind("max(ccd*)")
+    assert not bound
+    assert bound.evaluate(READINGS) is None
+
+
+@pytest.mark.parametrize("text", ["", "max(", "max(core*) + 1", "median(core*)"])
+def test_invalid_expressions(text):
+    with pytest.raises(ValueError):
+        MetricExpression(text)
+
+
+def test_single_sensor_metrics_do_not_import_numpy(monkeypatch):
+    monkeypatch.setattr(metrics_module, "_numpy", None)
+    MetricArray(LABELS).bind("package")
+    assert metrics_module._numpy is None
@@ -0,0 +1,117 @@
+"""Which parts of a running host a config change rebuilds, changes or defers."""
+
+import dataclasses
+
+import pytest
+
+from src.reload import ConfigReloader
+from src.sim import Simulation
+
+
+class StubMonitor:
+    """A rebuilt hardware monitor that reports nothing."""
+
+    def __init__(self, config):
+        self.config = config
+        self.closed = False
+
+    def get_snapshot(self, metrics=None):
+        return None
+
+    def configure_breakers(self, **options):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class Host:
+    """The parts of MonitorHost a ConfigReloader uses, over a Rig."""
+
+    def __init__(self, setup):
+        self.config = setup.config
+        self.engine = setup.engine
+        self.cpu_monitor = setup.cpu
+        self.gpu_monitor = setup.gpu
+        self.usb_device = setup.display
+        self.next_config = setup.config
+        self.built = []
+
+    def read_config(self):
+        return self.next_config
+
+    def create_cpu_monitor(self, config):
+        self.built.append("cpu")
+        return StubMonitor(config)
+
+    def create_gpu_monitor(self, config):
+        self.built.append("gpu")
+        return StubMonitor(config)
+
+    def create_display(self, config):
+        self.built.append("display")
+        return StubMonitor(config)
+
+
+@pytest.fixture
+def reloader(rig, tmp_path):
+    """A reloader over a simulated host; its log is in reloader.messages."""
+    setup = rig(Simulation(), config_reload_interval=2000)
+    messages = []
+    tested = ConfigReloader(
+        Host(setup), str(tmp_path / "config.toml"), 2.0, log=messages.append
+    )
+    tested.messages = messages
+    return tested
+
+
+def reload(reloader, **changes):
+    host = reloader.host
+    host.next_config = dataclasses.replace(host.config, **changes)
+    return reloader.reload()
+
+
+def test_monitor_settings_rebuild_only_that_monitor(reloader):
+    cpu, gpu = reloader.host.cpu_monitor, reloader.host.gpu_monitor
+    assert reload(reloader, cpu_sensor="CPU Core #1") == {"cpu_sensor"}
+    assert reloader.host.built == ["cpu"]
+    assert isinstance(reloader.host.cpu_monitor, StubMonitor)
+    assert reloader.host.cpu_monitor is not cpu
+    assert reloader.host.gpu_monitor is gpu
+
+
+def test_breaker_settings_change_in_place(reloader):
+    assert reload(reloader, breaker_threshold=7) == {"breaker_threshold"}
+    assert reloader.host.built == []
+
+
+def test_display_options_do_not_rebuild_the_display(reloader):
+    display = reloader.host.usb_device
+    reload(reloader, display_hysteresis=1.5)
+    assert reloader.host.built == []
+    assert reloader.host.usb_device is display
+    assert display.filter.hysteresis == 1.5
+
+
+def test_restart_settings_are_reported(reloader):
+    assert reload(reloader, exporter_port=9200) == {"exporter_port"}
+    assert reloader.host.built == []
+    assert "Warning: Restart to apply exporter_port" in reloader.messages
+    assert reloader.host.config.exporter_port == 9200
+
+
+def test_reload_interval_applies_live(reloader):
+    assert reload(reloader, config_reload_interval=500) == {"config_reload_interval"}
+    assert reloader.interval == pytest.approx(0.5)
+    assert not any("Restart" in message for message in reloader.messages)
+    reload(reloader, config_reload_interval=0)
+    assert "Configuration reloading disabled" in reloader.messages
+    # Stopped: later changes are left alone
+    assert reload(reloader, cpu_sensor="CPU Core #1") == set()
+
+
+def test_invalid_config_is_ignored(reloader):
+    config = reloader.host.config
+    assert reload(reloader, overrun_policy="drop") == set()
+    assert reloader.host.config is config
+    assert reloader.messages[0].startswith("Warning: Ignoring invalid configuration")
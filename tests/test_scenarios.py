@@ -0,0 +1,155 @@
+"""
+End-to-end runs of the simulation scenarios through the monitoring engine.
+Simulated time is moved forward past each scripted event, so the scenarios'
+outage and replug windows are reached within a second or two.
+"""
+
+import time
+
+import pytest
+
+from src.sim import SimDisplay, Simulation
+
+
+def frames_between(display, start: float, end: float):
+    """Virtual display frames that arrived in a monotonic time range."""
+    return [frame for frame in display.frames if start <= frame.arrived < end]
+
+
+@pytest.mark.parametrize("hotplug", [False, True], ids=["polling", "hotplug"])
+def test_replug_resumes_frames(rig, hotplug):
+    # The "replug" scenario, with and without hotplug notifications
+    simulation = Simulation(
+        display=SimDisplay(unplugged=[(5, 10), (20, 22)]), hotplug=hotplug
+    )
+    setup = rig(simulation, display_device="usb")
+    display = simulation.display
+    counts = {}
+
+    def count(name):
+        counts[name] = (len(display.frames), display.present, setup.display.connected)
+
+    setup.run(
+        2.4,
+        [
+            (0.5, lambda: count("attached")),
+            (0.55, lambda: setup.advance(5)),  # cable pulled
+            (1.2, lambda: count("unplugged")),
+            (1.25, lambda: setup.advance(5)),  # plugged back in
+            (2.3, lambda: count("replugged")),
+        ],
+    )
+
+    frames, present, connected = counts["attached"]
+    assert frames > 0 and present and connected
+    unplugged_frames, present, connected = counts["unplugged"]
+    assert not present and not connected
+    replugged_frames, present, connected = counts["replugged"]
+    assert present and connected
+    assert replugged_frames > unplugged_frames
+    stats = setup.display.stats()
+    assert stats["disconnects"] >= 1
+    assert stats["connects"] >= 2
+
+
+def test_no_display_keeps_sampling_until_attached(rig):
+    simulation = Simulation.scenario("no-display")
+    setup = rig(simulation, display_device="usb")
+    display = simulation.display
+    counts = {}
+
+    def count(name):
+        reads = setup.engine.stats()["sources"]["cpu"]["reads"]
+        counts[name] = (len(display.frames), setup.display.connected, reads)
+
+    setup.run(
+        1.5,
+        [
+            (0.5, lambda: count("missing")),
+            (0.55, display.attach),
+            (1.4, lambda: count("attached")),
+        ],
+    )
+
+    frames, connected, reads = counts["missing"]
+    assert frames == 0 and not connected
+    assert reads > 0  # sampling does not wait for the display
+    frames, connected, later_reads = counts["attached"]
+    assert frames > 0 and connected
+    assert later_reads > reads
+
+
+def test_flaky_sources_fall_back_and_recover(rig):
+    # GPU outage 10-25 s, CPU (LibreHardwareMonitor) outage 20-30 s, plus
+    # random failures of every source
+    setup = rig(Simulation.scenario("flaky"))
+    display = setup.display
+    marks = {}
+
+    def mark(name):
+        marks[name] = time.monotonic()
+
+    setup.run(
+        2.5,
+        [
+            (0.45, lambda: (mark("outages"), setup.advance(21))),
+            (1.2, lambda: marks.setdefault("gpu", setup.gpu.breaker_status())),
+            (1.45, lambda: (mark("recovered"), setup.advance(10))),
+            (2.4, lambda: mark("end")),
+        ],
+    )
+
+    assert display.invalid == 0
+    # The CPU falls back to another source while the GPU shows no data
+    during = frames_between(display, marks["outages"] + 0.3, marks["recovered"])
+    assert during
+    assert any(frame.cpu is not None and frame.gpu is None for frame in during)
+    assert any(status["trips"] for status in marks["gpu"].values())
+    # Both come back once the outages are over
+    after = frames_between(display, marks["recovered"] + 0.3, marks["end"])
+    assert any(frame.cpu is not None and frame.gpu is not None for frame in after)
+
+
+def test_burst_brings_display_forward(rig):
+    # Idle until 8 s, then a load burst: adaptive polling has backed the
+    # display off to a slow interval, and the first reading of the burst must
+    # not wait for it
+    setup = rig(
+        Simulation.scenario("burst"),
+        adaptive_polling=True,
+        min_polling_interval=50,
+        max_polling_interval=1000,
+    )
+    display = setup.display
+    source = setup.engine.sources["cpu"]
+    read = source.read
+    reads = []
+    marks = {}
+
+    def timed_read():
+        snapshot = read()
+        reads.append((time.monotonic(), snapshot))
+        return snapshot
+
+    def jump():
+        marks["interval"] = setup.engine.scheduler.interval
+        marks["burst"] = time.monotonic()
+        setup.advance(9)
+
+    source.read = timed_read
+    setup.run(4.0, [(2.0, jump)])
+
+    assert marks["interval"] > 0.3  # backed off while idle
+    first_read = next(
+        started
+        for started, snapshot in reads
+        if snapshot is not None and snapshot.temperature > 70
+    )
+    first_frame = next(
+        frame
+        for frame in frames_between(display, marks["burst"], marks["burst"] + 2.0)
+        if frame.cpu is not None and frame.cpu > 70
+    )
+    # Shown right after the reading, not up to a display interval later
+    assert first_frame.arrived - first_read < 0.15
+    assert setup.engine.stats()["sources"]["cpu"]["adaptive"]["speedups"] >= 1
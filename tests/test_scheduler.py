@@ -0,0 +1,81 @@
+"""Fixed-rate tick scheduling against an injected clock."""
+
+import pytest
+
+from src.scheduler import CATCH_UP, SKIP, TickScheduler, check_policy
+
+
+def scheduler(
+    clock, policy: str = SKIP, interval: float = 1.0, **options
+) -> TickScheduler:
+    return TickScheduler(interval, policy, clock=clock, **options)
+
+
+def due_ticks(ticks: TickScheduler) -> int:
+    """Fire every tick that is due now."""
+    fired = 0
+    while ticks.delay() <= 0:
+        ticks.tick()
+        fired += 1
+    return fired
+
+
+def test_ticks_fall_one_interval_apart(clock):
+    ticks = scheduler(clock)
+    assert due_ticks(ticks) == 1  # the first tick fires immediately
+    clock.now = 0.3  # time spent in the tick does not stretch the period
+    assert ticks.delay() == pytest.approx(0.7)
+    clock.now = 1.0
+    assert due_ticks(ticks) == 1
+    assert ticks.missed == 0 and ticks.overruns == 0
+
+
+def test_skip_drops_missed_ticks(clock):
+    ticks = scheduler(clock, SKIP)
+    due_ticks(ticks)
+    clock.now = 3.5  # overran the deadlines at 1, 2 and 3
+    assert due_ticks(ticks) == 1
+    assert ticks.missed == 2
+    assert ticks.overruns == 1
+    assert ticks.jitter_last == pytest.approx(0.5)
+    assert ticks.delay() == pytest.approx(0.5)  # back on the 1 s grid
+
+
+def test_catch_up_fires_late_ticks_back_to_back(clock):
+    ticks = scheduler(clock, CATCH_UP)
+    due_ticks(ticks)
+    clock.now = 3.5
+    assert due_ticks(ticks) == 3
+    assert ticks.missed == 0
+    assert ticks.overruns == 1
+
+
+def test_catch_up_is_bounded(clock):
+    ticks = scheduler(clock, CATCH_UP, max_catch_up=5)
+    due_ticks(ticks)
+    clock.now = 10.5  # nine deadlines passed
+    assert due_ticks(ticks) == 6  # the five latest late ones plus the current one
+    assert ticks.missed == 4
+
+
+def test_shorter_interval_pulls_deadline_forward(clock):
+    ticks = scheduler(clock, interval=2.0)
+    due_ticks(ticks)
+    clock.now = 0.1
+    ticks.set_interval(0.5)
+    assert ticks.delay() == pytest.approx(0.4)
+    clock.now = 0.5
+    due_ticks(ticks)
+    clock.now = 0.9
+    ticks.set_interval(2.0)
+    assert ticks.delay() == pytest.approx(1.6)
+    # Shortened past a deadline already gone: due now, not an overrun
+    clock.now = 1.5
+    ticks.set_interval(0.25)
+    assert due_ticks(ticks) == 1
+    assert ticks.overruns == 0 and ticks.missed == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError, match="overrun policy"):
+        check_policy("drop")
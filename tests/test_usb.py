@@ -0,0 +1,47 @@
+"""Opening and reconnecting the USB display, on the simulated bus."""
+
+import errno
+import sys
+import types
+
+from src.sim import Simulation, fake_usb
+
+
+def test_display_that_fails_to_open_is_retried(rig, monkeypatch):
+    configuration = fake_usb.SimUSBDevice.get_active_configuration
+    failures = []
+
+    def get_active_configuration(device):
+        if not failures:
+            failures.append(True)
+            raise fake_usb.USBError("Access denied", errno=errno.EACCES)
+        return configuration(device)
+
+    monkeypatch.setattr(
+        fake_usb.SimUSBDevice, "get_active_configuration", get_active_configuration
+    )
+    simulation = Simulation()
+    setup = rig(simulation, display_device="usb")
+    assert not setup.display.connected
+    assert setup.display.breaker.trips == 1
+
+    setup.run(0.5)
+    assert setup.display.connects == 1
+    assert simulation.display.frames
+
+
+def test_disconnected_display_is_probed_on_early_ticks(rig, clock, monkeypatch):
+    setup = rig(Simulation(), display_device="usb", polling_interval=1000)
+    display = setup.display
+    usb_module = sys.modules["src.usb"]
+    monkeypatch.setattr(usb_module, "time", types.SimpleNamespace(monotonic=clock))
+    display.hotplug = None
+    display._disconnect("test")
+
+    assert display._reconnect_due()
+    # Ticks a second apart, but each one up to a few hundred ms early
+    for now in (0.8, 1.7, 2.9, 3.6):
+        clock.now = now
+        assert display._reconnect_due()
+    clock.now = 3.9  # a second probe within the same tick
+    assert not display._reconnect_due()
@@ -0,0 +1,142 @@
+"""The persisted USB resolution, and when the display stops trusting it."""
+
+import errno
+import json
+import sys
+
+import pytest
+
+from src.backends import create_backend
+from src.sim import fake_usb
+from src.usb_cache import VERSION, USBResolutionCache
+
+VENDOR_ID = 0x2022
+PRODUCT_ID = 0x0522
+
+
+def cache(path) -> USBResolutionCache:
+    return USBResolutionCache(str(path), VENDOR_ID, PRODUCT_ID)
+
+
+def test_resolution_is_reused_only_on_the_same_port(tmp_path):
+    path = tmp_path / "cache" / "usb.json"
+    cache(path).update(backend="system", bus=1, ports=[3, 2], endpoint=0x03)
+
+    loaded = cache(path)
+    assert loaded.get("backend") == "system"
+    assert loaded.endpoint_for(1, [3, 2]) == 0x03
+    assert loaded.endpoint_for(1, [3]) is None
+    assert loaded.endpoint_for(2, [3, 2]) is None
+
+
+RESOLUTION = {
+    "version": VERSION,
+    "vendor_id": VENDOR_ID,
+    "product_id": PRODUCT_ID,
+    "bus": 1,
+    "ports": [3],
+    "endpoint": 3,
+}
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        dict(RESOLUTION, vendor_id=0x1234),
+        dict(RESOLUTION, version=VERSION + 1),
+        list(RESOLUTION),
+    ],
+)
+def test_foreign_caches_are_ignored(tmp_path, contents):
+    path = tmp_path / "usb.json"
+    path.write_text(json.dumps(contents))
+    assert cache(path).endpoint_for(1, [3]) is None
+
+
+def test_own_cache_is_loaded(tmp_path):
+    path = tmp_path / "usb.json"
+    path.write_text(json.dumps(RESOLUTION))
+    assert cache(path).endpoint_for(1, [3]) == 3
+
+
+def test_corrupt_cache_is_ignored(tmp_path, capsys):
+    path = tmp_path / "usb.json"
+    path.write_text("{")
+    assert cache(path).data == {}
+    assert "Warning: Ignoring USB cache" in capsys.readouterr().out
+
+
+def test_clear_removes_the_file(tmp_path):
+    path = tmp_path / "usb.json"
+    resolution = cache(path)
+    resolution.update(bus=1, ports=[3], endpoint=3)
+    resolution.clear()
+    assert not path.exists()
+    assert cache(path).endpoint_for(1, [3]) is None
+
+
+def test_without_a_path_nothing_is_written(tmp_path):
+    resolution = USBResolutionCache(None, VENDOR_ID, PRODUCT_ID)
+    resolution.update(bus=1, ports=[3], endpoint=3)
+    assert resolution.endpoint_for(1, [3]) == 3
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def display(simulation, tmp_path):
+    """Factory for unthreaded USB displays sharing one cache file."""
+    # As in Rig: src.usb may still hold an earlier simulation's usb package
+    if "src.usb" in sys.modules:
+        sys.modules["src.usb"].usb = sys.modules["usb"]
+    displays = []
+
+    def build():
+        displays.append(
+            create_backend(
+                "display",
+                "usb",
+                threaded=False,
+                cache_path=str(tmp_path / "usb.json"),
+                log=lambda message: None,
+            )
+        )
+        return displays[-1]
+
+    yield build
+    for device in displays:
+        device.close()
+
+
+def test_display_skips_the_descriptor_search_while_on_the_same_port(
+    simulation, display
+):
+    first = display()
+    assert first.resolution == "scan"
+    first.send_temperatures(50.0, 40.0)
+    first.close()
+
+    second = display()
+    assert second.resolution == "cached"
+    assert second.device.descriptor_reads == 0
+    second.close()
+
+    simulation.display.detach()
+    simulation.display.attach(port_numbers=(4,))
+    assert display().resolution == "scan"
+
+
+def test_failed_first_write_invalidates_the_cached_endpoint(
+    simulation, display, monkeypatch, tmp_path
+):
+    first = display()
+    first.send_temperatures(50.0, 40.0)
+    first.close()
+
+    def write(device, endpoint, data, timeout=None):
+        raise fake_usb.USBError("Pipe error", errno=errno.EPIPE)
+
+    monkeypatch.setattr(fake_usb.SimUSBDevice, "write", write)
+    second = display()
+    assert second.resolution == "cached"
+    second.send_temperatures(51.0, 40.0)
+    assert not (tmp_path / "usb.json").exists()
@@ -0,0 +1,122 @@
+"""WMI reads through refreshers, projected queries and the TTL cache."""
+
+import sys
+import types
+
+import pytest
+
+from src.wmi_access import MemoryWMIBackend, PyWMIBackend, WMIReader
+
+NAMESPACE = "root\\LibreHardwareMonitor"
+
+
+class FakeRefresher:
+    """SWbemRefresher stand-in: AddEnum returns a live set of whole objects."""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.refreshes = 0
+
+    def AddEnum(self, services, wmi_class):
+        return types.SimpleNamespace(ObjectSet=self.objects)
+
+    def Refresh(self):
+        self.refreshes += 1
+
+
+class FakeConnection:
+    """A wmi.WMI connection; `_namespace` is the SWbemServices object."""
+
+    def __init__(self, objects):
+        self._namespace = object()
+        self.objects = objects
+        self.queries = []
+
+    def query(self, wql):
+        self.queries.append(wql)
+        return self.objects
+
+
+def sensor(name, sensor_type, value):
+    return types.SimpleNamespace(
+        Name=name, SensorType=sensor_type, Value=value, Identifier=f"/{name}"
+    )
+
+
+@pytest.fixture
+def sensors():
+    return [
+        sensor("CPU Package", "Temperature", 61.0),
+        sensor("CPU Total", "Load", 12.0),
+        sensor("CPU Core #1", "Temperature", 58.0),
+    ]
+
+
+def reader(monkeypatch, objects, refresher=None):
+    """A WMIReader over the wmi package, with win32com answering Dispatch."""
+    connection = FakeConnection(objects)
+    client = types.ModuleType("win32com.client")
+    if refresher is None:
+
+        def dispatch(name):
+            raise RuntimeError("refresher unavailable")
+
+    else:
+
+        def dispatch(name):
+            return refresher
+
+    client.Dispatch = dispatch
+    package = types.ModuleType("win32com")
+    package.client = client
+    monkeypatch.setitem(sys.modules, "win32com", package)
+    monkeypatch.setitem(sys.modules, "win32com.client", client)
+    wmi = types.SimpleNamespace(WMI=lambda namespace: connection)
+    return WMIReader(PyWMIBackend(wmi)), connection
+
+
+def test_refresher_filters_on_unprojected_columns(monkeypatch, sensors):
+    refresher = FakeRefresher(sensors)
+    wmi_reader, connection = reader(monkeypatch, sensors, refresher)
+    where = {"SensorType": "Temperature"}
+    rows = wmi_reader.read(NAMESPACE, "Sensor", ("Name", "Value"), where)
+    assert rows == [
+        {"Name": "CPU Package", "Value": 61.0},
+        {"Name": "CPU Core #1", "Value": 58.0},
+    ]
+    # Refreshed in place: new values without another query
+    sensors[0].Value = 63.0
+    rows = wmi_reader.read(NAMESPACE, "Sensor", ("Name", "Value"), where)
+    assert rows[0] == {"Name": "CPU Package", "Value": 63.0}
+    assert refresher.refreshes == 2
+    assert connection.queries == []
+
+
+def test_projected_query_without_refresher(monkeypatch, sensors):
+    wmi_reader, connection = reader(monkeypatch, sensors)
+    wmi_reader.read(NAMESPACE, "Sensor", ("Name", "Value"), {"SensorType": "Load"})
+    assert connection.queries == [
+        "SELECT Name, Value FROM Sensor WHERE SensorType='Load'"
+    ]
+
+
+def test_ttl_caches_rows_until_invalidated():
+    backend = MemoryWMIBackend(
+        {NAMESPACE: {"Sensor": [{"Name": "CPU Package", "Value": 61.0}]}}
+    )
+    wmi_reader = WMIReader(backend, ttl=60.0)
+    for _ in range(3):
+        assert wmi_reader.read(NAMESPACE, "Sensor", ("Value",)) == [{"Value": 61.0}]
+    assert backend.queries == 1
+    wmi_reader.invalidate()
+    wmi_reader.read(NAMESPACE, "Sensor", ("Value",))
+    assert backend.queries == 2
+    # A per-class TTL of 0 reads through every time
+    wmi_reader.set_ttl("Sensor", 0.0)
+    wmi_reader.read(NAMESPACE, "Sensor", ("Value",))
+    assert backend.queries == 3
+
+
+def test_unknown_namespace_raises():
+    with pytest.raises(RuntimeError, match="Invalid namespace"):
+        WMIReader(MemoryWMIBackend()).read(NAMESPACE, "Sensor", ("Value",))
@@ -0,0 +1,49 @@
+"""The latest-wins mailbox between the display loop and the writer thread."""
+
+import threading
+import time
+
+from src.writer import Mailbox
+
+
+def test_latest_item_wins():
+    mailbox = Mailbox()
+    for item in ("a", "b", "c"):
+        assert mailbox.post(item)
+    assert mailbox.take() == "c"
+    assert mailbox.posted == 3
+    assert mailbox.dropped == 2
+    assert mailbox.take(timeout=0.01) is None
+
+
+def test_take_waits_for_post():
+    mailbox = Mailbox()
+    timer = threading.Timer(0.05, mailbox.post, args=("frame",))
+    timer.start()
+    try:
+        assert mailbox.take(timeout=2.0) == "frame"
+    finally:
+        timer.cancel()
+    assert mailbox.dropped == 0
+
+
+def test_close_keeps_pending_item():
+    mailbox = Mailbox()
+    mailbox.post("last")
+    mailbox.close()
+    assert not mailbox.post("late")
+    assert mailbox.take() == "last"
+    # Closed and empty: returns at once rather than blocking
+    assert mailbox.take() is None
+
+
+def test_close_wakes_waiting_taker():
+    mailbox = Mailbox()
+    timer = threading.Timer(0.05, mailbox.close)
+    started = time.monotonic()
+    timer.start()
+    try:
+        assert mailbox.take(timeout=2.0) is None
+    finally:
+        timer.cancel()
+    assert time.monotonic() - started < 1.0